@@ -0,0 +1,271 @@
+"""
+Задержка попадания в кэш БД: прежнее чтение из дочерних таблиц (проверка актуальности
+и три SELECT, сборка результата в Python) против одного запроса `get_database_info`.
+
+Запуск из корня проекта (нужны `.env` и доступная PostgreSQL с примененными миграциями):
+
+    python -m benchmarks.bench_cache_read [--items 36 360] [--characteristics 30] [--repeat 200]
+
+Для каждого размера в БД записывается синтетическая выгрузка (`upload_products`) с уникальным
+именем, а ее копия — в таблицы прежней схемы (`bench_ozon_*`, создаются на время замера).
+Каждый способ выполняется `--repeat` раз поочередно: прежний путь (4 запроса), полное
+чтение (`get_database_info`, 1 запрос) и выборка документа без декодирования JSONB
+(доля драйвера и сети). После замера выгрузки и таблицы прежней схемы удаляются.
+"""
+import argparse
+import ast
+import asyncio
+import json
+import random
+import statistics
+import time
+import uuid
+
+from typing import Any, Awaitable, Callable
+from sqlalchemy import (
+    Column, INT, MetaData, String, Table, Text, UUID,
+    select, delete, cast, func, insert
+)
+
+from src.database import async_session_maker, engine
+from src.models.ozon import SearchMatchOrm
+from src.schemas.ozon import Tile, PriceSummary, ProductDetails, SearchResult, parse_number
+from src.repositories.ozon.aggregation import TileColumns, compute_stats
+from src.repositories.ozon.cache_ttl import get_cache_ttl
+from src.repositories.ozon.database import get_database_info, upload_products
+
+
+SORTING_TYPE = 'score'
+
+# Дочерние таблицы прежней схемы (до документа `result`), только для базового замера
+legacy_metadata = MetaData()
+legacy_urls = Table(
+    'bench_ozon_url_products', legacy_metadata,
+    Column('unique_id', UUID(as_uuid=True), primary_key=True),
+    Column('sorting_type', String(50), primary_key=True),
+    Column('index', INT, primary_key=True),
+    Column('product_url', Text),
+    Column('product_price', INT, nullable=True),
+    Column('product_rating', String(50), nullable=True),
+    Column('product_reviews', String(50), nullable=True),
+)
+legacy_top = Table(
+    'bench_ozon_product_top', legacy_metadata,
+    Column('unique_id', UUID(as_uuid=True), primary_key=True),
+    Column('attribute_name', String(150), primary_key=True),
+    Column('value', Text),
+)
+legacy_characteristics = Table(
+    'bench_ozon_product_characteristics', legacy_metadata,
+    Column('unique_id', UUID(as_uuid=True), primary_key=True),
+    Column('characteristics_name', String(250), primary_key=True),
+    Column('value', Text),
+)
+
+
+def make_result(
+        items: int,
+        characteristics: int,
+        rng: random.Random
+) -> SearchResult:
+    tiles = [
+        Tile(
+            sku=100000 + index,
+            url=f'https://www.ozon.ru/product/tovar-{index}-{100000 + index}/',
+            name=f'Товар {index}',
+            price=rng.randint(500, 90000),
+            rating=round(rng.uniform(3.5, 5), 1),
+            reviews=rng.randint(0, 20000),
+        )
+        for index in range(items)
+    ]
+    top = ProductDetails(
+        sku=tiles[0].sku,
+        url=tiles[0].url,
+        name=tiles[0].name,
+        image='https://cdn1.ozone.ru/s3/multimedia/100000.jpg',
+        description='Описание товара\n' * 40,
+        characteristics={f'Характеристика {index}': [f'значение {index}', 'еще'] for index in range(characteristics)},
+    )
+    return SearchResult(
+        sorting_type=SORTING_TYPE,
+        tiles=tiles,
+        prices=PriceSummary(min_price=490.0, max_price=119990.0, avg_price=60240.0),
+        top=[top],
+    )
+
+
+async def write_legacy(
+        product_name: str,
+        products: SearchResult
+) -> None:
+    """
+    Копирует выгрузку в таблицы прежней схемы в том виде, в каком ее писал прежний `upload_products`.
+    """
+    async with async_session_maker() as db_session:
+        unique_id = await db_session.scalar(
+            select(SearchMatchOrm.unique_id).filter_by(concat_name=product_name, sorting_type=SORTING_TYPE)
+        )
+        await db_session.execute(insert(legacy_urls), [
+            dict(
+                unique_id=unique_id,
+                sorting_type=SORTING_TYPE,
+                index=index,
+                product_url=tile.url,
+                product_price=tile.price,
+                product_rating=None if tile.rating is None else str(tile.rating),
+                product_reviews=None if tile.reviews is None else str(tile.reviews),
+            )
+            for index, tile in enumerate(products.tiles, start=1)
+        ])
+        top = products.top[0]
+        attributes = dict(
+            min_price=products.prices.min_price,
+            max_price=products.prices.max_price,
+            avg_price=products.prices.avg_price,
+            product_name=top.name,
+            main_image=top.image,
+            description=top.description,
+        )
+        await db_session.execute(insert(legacy_top), [
+            dict(unique_id=unique_id, attribute_name=name, value=str(value))
+            for name, value in attributes.items()
+            if value is not None
+        ])
+        await db_session.execute(insert(legacy_characteristics), [
+            dict(unique_id=unique_id, characteristics_name=name, value=str(value))
+            for name, value in top.characteristics.items()
+        ])
+        await db_session.commit()
+
+
+async def legacy_read(
+        product_name: str
+) -> dict[str, Any]:
+    """
+    Прежний путь попадания в кэш: проверка актуальности, три SELECT по дочерним таблицам
+    и сборка `SearchResult` в Python (4 запроса).
+    """
+    async with async_session_maker() as db_session:
+        unique_id = await db_session.scalar(
+            select(SearchMatchOrm.unique_id)
+            .filter_by(concat_name=product_name, sorting_type=SORTING_TYPE)
+            .where(SearchMatchOrm.update_time >= func.localtimestamp() - get_cache_ttl(SORTING_TYPE))
+        )
+        urls = (await db_session.execute(
+            select(legacy_urls)
+            .filter_by(unique_id=unique_id, sorting_type=SORTING_TYPE)
+            .order_by(legacy_urls.c.index)
+        )).fetchall()
+        attributes = dict((await db_session.execute(
+            select(legacy_top.c.attribute_name, legacy_top.c.value).filter_by(unique_id=unique_id)
+        )).fetchall())
+        characteristics = (await db_session.execute(
+            select(legacy_characteristics.c.characteristics_name, legacy_characteristics.c.value)
+            .filter_by(unique_id=unique_id)
+        )).fetchall()
+
+    result = SearchResult(
+        sorting_type=SORTING_TYPE,
+        message="Выгрузка с базы данных",
+        tiles=[
+            Tile(
+                sku=None,
+                url=url.product_url,
+                name=None,
+                price=url.product_price,
+                rating=parse_number(url.product_rating, float),
+                reviews=parse_number(url.product_reviews, int),
+            )
+            for url in urls
+        ],
+        prices=PriceSummary(**{
+            name: float(attributes.pop(name)) for name in ('min_price', 'max_price', 'avg_price') if name in attributes
+        }),
+    )
+    result.stats = compute_stats(TileColumns.from_tiles(result.tiles))
+    if attributes or characteristics:
+        result.top.append(ProductDetails(
+            sku=None,
+            url=result.tiles[0].url if result.tiles else None,
+            name=attributes.get('product_name'),
+            image=attributes.get('main_image'),
+            description=attributes.get('description'),
+            characteristics={name: ast.literal_eval(value) for name, value in characteristics},
+        ))
+    return result.to_response()
+
+
+async def raw_read(
+        product_name: str
+) -> None:
+    """
+    Та же выборка, что в `get_database_info`, но документ возвращается текстом без декодирования.
+    """
+    async with async_session_maker() as db_session:
+        await db_session.scalar(
+            select(cast(SearchMatchOrm.result, Text))
+            .filter_by(concat_name=product_name, sorting_type=SORTING_TYPE)
+        )
+
+
+async def measure(
+        function: Callable[[], Awaitable[Any]],
+        timings: list[float]
+) -> None:
+    started = time.perf_counter()
+    await function()
+    timings.append(time.perf_counter() - started)
+
+
+def summary(timings: list[float]) -> str:
+    timings = sorted(timings)
+    p99 = timings[min(int(len(timings) * 0.99), len(timings) - 1)]
+    return f"p50 {statistics.median(timings) * 1000:>8.3f} мс   p99 {p99 * 1000:>8.3f} мс"
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[36, 360], help='карточек в выгрузке')
+    parser.add_argument('--characteristics', type=int, default=30, help='характеристик топ-товара')
+    parser.add_argument('--repeat', type=int, default=200, help='чтений каждым способом')
+    args = parser.parse_args()
+
+    names = list()
+    async with engine.begin() as connection:
+        await connection.run_sync(legacy_metadata.create_all)
+    try:
+        for items in args.items:
+            product_name = f'bench-cache-read-{uuid.uuid4()}'
+            products = make_result(items, args.characteristics, random.Random(0))
+            await upload_products('https://www.ozon.ru/product/bench/', product_name, 0, products)
+            names.append(product_name)
+            await write_legacy(product_name, products)
+
+            # прогрев пула соединений и кэша подготовленных выражений
+            await raw_read(product_name)
+            assert await legacy_read(product_name), 'нет выгрузки в таблицах прежней схемы'
+            assert await get_database_info(product_name, SORTING_TYPE), f'выгрузка старше {get_cache_ttl(SORTING_TYPE)}?'
+
+            legacy, raw, full = list(), list(), list()
+            for _ in range(args.repeat):
+                await measure(lambda: legacy_read(product_name), legacy)
+                await measure(lambda: raw_read(product_name), raw)
+                await measure(lambda: get_database_info(product_name, SORTING_TYPE), full)
+
+            size = len(json.dumps(products.to_document(), ensure_ascii=False).encode())
+            print(f"Карточек: {items}, характеристик: {args.characteristics}, документ: {size / 1024:.0f} КБ")
+            print(f"{'  прежний путь (4 запроса)':<32} {summary(legacy)}")
+            print(f"{'  get_database_info (1 запрос)':<32} {summary(full)}")
+            print(f"{'  выборка без декодирования':<32} {summary(raw)}")
+    finally:
+        async with async_session_maker() as db_session:
+            await db_session.execute(delete(SearchMatchOrm).where(SearchMatchOrm.concat_name.in_(names)))
+            await db_session.commit()
+        async with engine.begin() as connection:
+            await connection.run_sync(legacy_metadata.drop_all)
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,91 @@
+"""
+Задержка event loop при одновременном разборе страниц выдачи в разных режимах
+`ParseExecutor` (`inline`, `thread`, `process`).
+
+Запуск из корня проекта:
+
+    python -m benchmarks.bench_event_loop [--concurrency 16] [--rounds 5] [--workers 2]
+
+Пока идут разборы, фоновая задача каждые `--tick` мс засыпает и измеряет, насколько позже
+запланированного она просыпается: это задержка, которую увидят все остальные запросы
+воркера uvicorn (и polling бота).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.bench_page_states import make_search_page
+from src.repositories.ozon.extractors import parse_search_page
+from src.utils.parse_executor import ParseExecutor, EXECUTOR_MODES
+
+
+async def monitor_lag(
+        tick: float,
+        stop: asyncio.Event,
+        lags: list[float]
+) -> None:
+    """
+    Измеряет опоздание пробуждений event loop относительно `tick`, сек.
+    """
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(tick)
+        lags.append(max(time.perf_counter() - started - tick, 0))
+
+
+async def run_mode(
+        mode: str,
+        page: str,
+        concurrency: int,
+        rounds: int,
+        workers: int,
+        tick: float
+) -> dict[str, float]:
+    executor = ParseExecutor(mode, workers)
+    await executor.start()
+    lags, stop = list(), asyncio.Event()
+    monitor = asyncio.create_task(monitor_lag(tick, stop, lags))
+    started = time.perf_counter()
+    try:
+        for _ in range(rounds):
+            results = await asyncio.gather(*(
+                executor.run(parse_search_page, page, 'score') for _ in range(concurrency)
+            ))
+            assert all(result and result.tiles for result in results)
+    finally:
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await monitor
+        await executor.close()
+    lags.sort()
+    return dict(
+        total=elapsed,
+        p50=statistics.median(lags),
+        p99=lags[min(int(len(lags) * 0.99), len(lags) - 1)],
+        max=lags[-1],
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=16, help='одновременных разборов в раунде')
+    parser.add_argument('--rounds', type=int, default=5, help='количество раундов')
+    parser.add_argument('--workers', type=int, default=2, help='размер пула потоков/процессов')
+    parser.add_argument('--tick', type=float, default=1.0, help='период пробуждений монитора, мс')
+    parser.add_argument('--modes', nargs='*', default=EXECUTOR_MODES, choices=EXECUTOR_MODES)
+    args = parser.parse_args()
+
+    page = make_search_page()
+    print(f"страница {len(page.encode()) / 1024:.0f} КБ, {args.concurrency} x {args.rounds} разборов")
+    print(f"{'режим':<10} {'всего, с':>10} {'lag p50, мс':>12} {'lag p99, мс':>12} {'lag max, мс':>12}")
+    for mode in args.modes:
+        result = await run_mode(mode, page, args.concurrency, args.rounds, args.workers, args.tick / 1000)
+        print(
+            f"{mode:<10} {result['total']:>10.2f} {result['p50'] * 1000:>12.2f} "
+            f"{result['p99'] * 1000:>12.2f} {result['max'] * 1000:>12.2f}"
+        )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Сравнение скорости извлечения блоков `data-state` из HTML выдачи Ozon:
+`extract_states` (прямой поиск по тексту) против `extract_states_soup` (BeautifulSoup).
+
+Запуск из корня проекта:
+
+    python -m benchmarks.bench_page_states [страница.html ...]
+
+Без аргументов используется синтетическая страница, близкая по структуре и размеру
+к реальной выдаче; для точных цифр передайте сохраненные страницы поиска.
+"""
+import argparse
+import html
+import json
+import statistics
+import time
+
+from pathlib import Path
+from typing import Callable
+
+from src.repositories.ozon.page_states import extract_states, extract_states_soup
+
+
+def make_search_page(
+        items: int = 36,
+        padding: int = 400_000
+) -> str:
+    """
+    Строит синтетическую страницу выдачи: разметка и скрипты вокруг `div.client-state`
+    с блоками `state-tileGridDesktop-*` и `state-filtersDesktop-*`.
+    """
+    tiles = [
+        {
+            'sku': 100000 + index,
+            'action': {'link': f'/product/tovar-{index}-{100000 + index}/'},
+            'mainState': [
+                {'textAtom': {'text': f'Товар <b>{index}</b> "с кавычками"', 'testInfo': {'automatizationId': 'tile-name'}}},
+                {'priceV2': {'price': [{'text': f'{1000 + index * 10} ₽', 'textStyle': 'PRICE'}]}},
+            ],
+            'tileImage': {'items': [{'image': {'link': f'https://cdn1.ozone.ru/s3/{index}.jpg'}}]},
+        }
+        for index in range(items)
+    ]
+    filters = {'sections': [{'filters': [{'key': 'currency_price', 'multipleRangesFilter': {
+        'rangeFilter': {'minValue': '990', 'maxValue': '5990'}}}]}]}
+    noise = '<div class="tile"><span>реклама</span><a href="/x">ссылка</a></div>\n'
+    body = noise * (padding // len(noise))
+    return (
+        '<!DOCTYPE html><html><head><script>window.__NUXT__={}</script></head><body>'
+        f'{body[:len(body) // 2]}'
+        '<div class="client-state">'
+        f'<div id="state-tileGridDesktop-3201208-default-1" data-state=\'{html.escape(json.dumps({"items": tiles}, ensure_ascii=False))}\'></div>'
+        f'<div id="state-filtersDesktop-1930785-default-1" data-state=\'{html.escape(json.dumps(filters))}\'></div>'
+        '</div>'
+        f'{body[len(body) // 2:]}</body></html>'
+    )
+
+
+def measure(
+        function: Callable,
+        page: str,
+        repeat: int
+) -> float:
+    """
+    Возвращает медианное время одного вызова `function(page)`, сек.
+    """
+    timings = list()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(page)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('pages', nargs='*', type=Path, help='сохраненные HTML-страницы выдачи')
+    parser.add_argument('--repeat', type=int, default=20, help='количество повторов на страницу')
+    args = parser.parse_args()
+
+    pages = {path.name: path.read_text(encoding='utf-8') for path in args.pages} or {'synthetic': make_search_page()}
+    print(f"{'страница':<30} {'размер, КБ':>10} {'fast, мс':>10} {'soup, мс':>10} {'ускорение':>10}")
+    for name, page in pages.items():
+        if extract_states(page) != extract_states_soup(page):
+            print(f"{name}: результаты extract_states и extract_states_soup различаются")
+        fast = measure(extract_states, page, args.repeat)
+        soup = measure(extract_states_soup, page, max(args.repeat // 4, 1))
+        print(f"{name:<30} {len(page.encode()) / 1024:>10.0f} {fast * 1000:>10.3f} {soup * 1000:>10.1f} {soup / fast:>9.0f}x")
+
+
+if __name__ == '__main__':
+    main()
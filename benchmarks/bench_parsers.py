@@ -0,0 +1,164 @@
+"""
+Бенчмарк функций разбора ответов Ozon на корпусе фикстур (`benchmarks/fixtures.py`).
+
+Запуск из корня проекта:
+
+    python -m benchmarks.bench_parsers [--save baseline.json] [--compare baseline.json]
+
+Для каждой пары (функция, фикстура) выводятся пропускная способность (вызовов/с, МБ/с),
+задержка p50/p99 и пиковая память одного вызова (tracemalloc). `--save` сохраняет
+результаты в JSON; `--compare` сравнивает с сохраненным базовым замером и завершается
+с кодом 1, если p50 или пиковая память выросли больше чем на `--threshold`.
+
+Функции соответствуют стадиям разбора конвейера:
+- `parse_search_page` — `get_page_data` + разбор выдачи в `get_products` (HTML);
+- `parse_search_payload` — `get_search_states` + разбор выдачи в `get_products` (JSON API);
+- `parse_product_name` — `format_product_name`;
+- `parse_product_details` — `get_product_top_data` (один товар);
+- `get_characteristics` — разбор виджета характеристик.
+"""
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from pathlib import Path
+from typing import Any, Callable
+
+from benchmarks.fixtures import Fixture, FIXTURES_DIR, load_corpus
+from src.utils import fast_json
+from src.schemas.ozon import Tile
+from src.repositories.ozon.widgets import WidgetStates
+from src.repositories.ozon.extractors import (
+    parse_search_page,
+    parse_search_payload,
+    parse_product_name,
+    parse_product_details,
+    get_characteristics
+)
+
+
+TILE = Tile(sku=1234567890, url='https://www.ozon.ru/product/1234567890/', name='Товар', price=1990, rating=4.7, reviews=12)
+
+
+def get_cases(
+        fixture: Fixture
+) -> list[tuple[str, Callable[[], Any]]]:
+    """
+    Возвращает пары (имя функции, вызов без аргументов) для фикстуры.
+    """
+    match fixture.kind:
+        case 'search_html':
+            return [('parse_search_page', lambda: parse_search_page(fixture.payload, 'score'))]
+        case 'search_json':
+            return [('parse_search_payload', lambda: parse_search_payload(fixture.payload, 'score'))]
+        case 'product':
+            return [('parse_product_name', lambda: parse_product_name(fixture.payload))]
+        case 'details':
+            widgets = WidgetStates.from_payload(fixture.payload).get_all('webCharacteristics-')
+            return [
+                ('parse_product_details', lambda: parse_product_details(fixture.payload, TILE)),
+                ('get_characteristics', lambda: [get_characteristics(data) for data in widgets]),
+            ]
+    return list()
+
+
+def measure(
+        function: Callable[[], Any],
+        size: int,
+        min_time: float,
+        min_repeat: int
+) -> dict[str, float]:
+    """
+    Замеряет задержки вызова (не меньше `min_repeat` раз и `min_time` секунд) и пиковую память.
+    """
+    function()  # прогрев
+    timings, started = list(), time.perf_counter()
+    while len(timings) < min_repeat or time.perf_counter() - started < min_time:
+        call_started = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - call_started)
+
+    tracemalloc.start()
+    function()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    timings.sort()
+    p50 = statistics.median(timings)
+    return dict(
+        calls=len(timings),
+        ops=round(1 / p50, 1),
+        mb_s=round(size / p50 / 1024 / 1024, 2),
+        p50_ms=round(p50 * 1000, 4),
+        p99_ms=round(timings[min(int(len(timings) * 0.99), len(timings) - 1)] * 1000, 4),
+        peak_kb=round(peak / 1024, 1),
+    )
+
+
+def compare(
+        results: dict[str, dict[str, float]],
+        baseline: dict[str, dict[str, float]],
+        threshold: float
+) -> list[str]:
+    """
+    Возвращает описания регрессий p50 и пиковой памяти относительно базового замера.
+    """
+    regressions = list()
+    for key, result in results.items():
+        if (base := baseline.get(key)) is None:
+            continue
+        for metric in ('p50_ms', 'peak_kb'):
+            if base[metric] and result[metric] > base[metric] * (1 + threshold):
+                regressions.append(f"{key}: {metric} {base[metric]} -> {result[metric]} (+{result[metric] / base[metric] - 1:.0%})")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--fixtures', type=Path, default=FIXTURES_DIR, help='каталог записанных ответов')
+    parser.add_argument('--synthetic', action='store_true', help='использовать синтетический корпус')
+    parser.add_argument('--min-time', type=float, default=0.5, help='минимальное время замера одной пары, сек')
+    parser.add_argument('--min-repeat', type=int, default=20, help='минимальное количество вызовов')
+    parser.add_argument('--filter', default='', help='замерять только пары, содержащие подстроку')
+    parser.add_argument('--save', type=Path, help='сохранить результаты в JSON')
+    parser.add_argument('--compare', type=Path, help='сравнить с сохраненными результатами')
+    parser.add_argument('--threshold', type=float, default=0.25, help='допустимый рост p50/памяти (доля)')
+    args = parser.parse_args()
+
+    results = dict()
+    print(f"{'функция / фикстура':<50} {'КБ':>8} {'выз/с':>10} {'МБ/с':>8} {'p50, мс':>10} {'p99, мс':>10} {'пик, КБ':>10}")
+    for fixture in load_corpus(args.fixtures, args.synthetic):
+        for name, function in get_cases(fixture):
+            key = f'{name}/{fixture.kind}--{fixture.name}'
+            if args.filter not in key:
+                continue
+            result = results[key] = measure(function, fixture.size, args.min_time, args.min_repeat)
+            print(
+                f"{key:<50} {fixture.size / 1024:>8.0f} {result['ops']:>10.1f} {result['mb_s']:>8.1f} "
+                f"{result['p50_ms']:>10.3f} {result['p99_ms']:>10.3f} {result['peak_kb']:>10.1f}"
+            )
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps(dict(
+            meta=dict(python=platform.python_version(), machine=platform.machine(), json_backend=fast_json.BACKEND),
+            results=results,
+        ), ensure_ascii=False, indent=2), encoding='utf-8')
+        print(f"Результаты сохранены в {args.save}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding='utf-8'))
+        if regressions := compare(results, baseline.get('results', dict()), args.threshold):
+            print(f"Регрессии относительно {args.compare}:")
+            print('\n'.join(f'  {regression}' for regression in regressions))
+            return 1
+        print(f"Регрессий относительно {args.compare} нет (порог {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,153 @@
+"""
+Разбор карточек сетки товаров: по одной карточке (прежний `Tile.from_state`), словарь полей
+на карточку + пакетный разбор чисел (прежний `tiles_from_states`) и текущий `tiles_from_states`
+(сбор колонок за один проход + пакетный разбор чисел).
+
+Запуск из корня проекта:
+
+    python -m benchmarks.bench_tiles [--items 36 360 5000] [--repeat 50]
+
+Карточки строятся синтетически (`fixtures.make_tile`); перед замером проверяется,
+что все способы дают одинаковые карточки.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from typing import Any, Callable
+
+from benchmarks.fixtures import make_tile
+from src.schemas.ozon import Tile, parse_number
+from src.repositories.ozon.aggregation import (
+    FLOAT_PATTERN,
+    TileColumns,
+    parse_numbers,
+    tiles_from_states
+)
+
+
+def read_fields(
+        tile: dict[str, Any]
+) -> dict[str, Any]:
+    """
+    Все значения `mainState` карточки по `automatizationId`/`textStyle` (как до сбора колонок).
+    """
+    result = dict()
+    for state in tile.get('mainState', list()):
+        for key, value in state.items():
+            if key == 'labelList':
+                for item in value.get('items', list()):
+                    result[item.get('testInfo', dict()).get('automatizationId')] = item.get('title')
+            elif key == 'textAtom':
+                result[value.get('testInfo', dict()).get('automatizationId')] = value.get('text')
+            elif key == 'priceV2':
+                for price in value.get('price', list()):
+                    result[price.get('textStyle')] = price.get('text')
+    return result
+
+
+def to_int(value: float) -> Any:
+    return None if value != value else int(value)
+
+
+def first_image(tile: dict[str, Any]) -> Any:
+    for item in tile.get('tileImage', dict()).get('items', list()):
+        return item.get('image', dict()).get('link')
+    return None
+
+
+def per_tile(
+        items: list[dict[str, Any]]
+) -> list[Tile]:
+    """
+    Разбор по одной карточке с `parse_number` на каждое поле.
+    """
+    tiles = list()
+    for item in items:
+        fields = read_fields(item)
+        tiles.append(Tile(
+            sku=parse_number(item.get('sku'), int),
+            url='https://www.ozon.ru' + (item.get('action', dict()).get('link') or ''),
+            name=str(fields.get('tile-name') or '').strip() or None,
+            price=parse_number(fields.get('PRICE'), int),
+            rating=parse_number(fields.get('tile-list-rating'), float),
+            reviews=parse_number(fields.get('tile-list-comments'), int),
+            image=first_image(item),
+        ))
+    return tiles
+
+
+def fields_then_columns(
+        items: list[dict[str, Any]]
+) -> list[Tile]:
+    """
+    Словарь полей на каждую карточку, затем пакетный разбор чисел и второй проход по карточкам.
+    """
+    fields = [read_fields(item) for item in items]
+    columns = TileColumns(
+        price=parse_numbers([field.get('PRICE') for field in fields]),
+        rating=parse_numbers([field.get('tile-list-rating') for field in fields], FLOAT_PATTERN),
+        reviews=parse_numbers([field.get('tile-list-comments') for field in fields]),
+    )
+    skus = parse_numbers([item.get('sku') for item in items]).tolist()
+    prices, ratings, reviews = columns.price.tolist(), columns.rating.tolist(), columns.reviews.tolist()
+    tiles = list()
+    for index, (item, field) in enumerate(zip(items, fields)):
+        rating = ratings[index]
+        tiles.append(Tile(
+            sku=to_int(skus[index]),
+            url='https://www.ozon.ru' + (item.get('action', dict()).get('link') or ''),
+            name=str(field.get('tile-name') or '').strip() or None,
+            price=to_int(prices[index]),
+            rating=None if rating != rating else rating,
+            reviews=to_int(reviews[index]),
+            image=first_image(item),
+        ))
+    return tiles
+
+
+def measure(
+        function: Callable[[list[dict[str, Any]]], Any],
+        items: list[dict[str, Any]],
+        repeat: int
+) -> float:
+    """
+    Возвращает медианное время одного вызова `function(items)`, сек.
+    """
+    function(items)  # прогрев
+    timings = list()
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(items)
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, nargs='+', default=[36, 360, 5000], help='карточек в сетке')
+    parser.add_argument('--repeat', type=int, default=50, help='количество повторов')
+    args = parser.parse_args()
+
+    methods = dict(
+        per_tile=per_tile,
+        fields_then_columns=fields_then_columns,
+        tiles_from_states=lambda items: tiles_from_states(items)[0],
+    )
+    print(f"{'карточек':>8} " + ' '.join(f'{name + ", мс":>24}' for name in methods) + f" {'ускорение':>10}")
+    for count in args.items:
+        rng = random.Random(0)
+        items = [make_tile(index, rng) for index in range(count)]
+        expected = per_tile(items)
+        for name, method in methods.items():
+            assert method(items) == expected, f'{name}: карточки отличаются от разбора по одной'
+        timings = {name: measure(method, items, args.repeat) for name, method in methods.items()}
+        print(
+            f"{count:>8} " + ' '.join(f'{timing * 1000:>24.3f}' for timing in timings.values())
+            + f" {timings['fields_then_columns'] / timings['tiles_from_states']:>9.2f}x"
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,195 @@
+"""
+Корпус ответов Ozon для бенчмарков разбора.
+
+Записанные ответы (`python -m benchmarks.record_fixtures`) лежат в `benchmarks/fixtures/`
+в виде `<вид>--<имя>.<html|json>`; если их нет, используется синтетический корпус той же
+структуры, что и реальные ответы (детерминированный, без сети).
+
+Виды ответов:
+- `search_html` — HTML страницы выдачи (`parse_search`);
+- `search_json` — ответ entrypoint API для выдачи (`parse_search_json`);
+- `product` — ответ entrypoint API для страницы товара (`parse_product`);
+- `details` — ответ entrypoint API с описанием и характеристиками (`parse_details`).
+"""
+import html
+import json
+import random
+
+from dataclasses import dataclass
+from pathlib import Path
+
+
+FIXTURES_DIR = Path(__file__).parent / 'fixtures'
+KINDS = ('search_html', 'search_json', 'product', 'details')
+
+
+@dataclass(frozen=True)
+class Fixture:
+    kind: str
+    name: str
+    payload: str
+
+    @property
+    def size(self) -> int:
+        return len(self.payload.encode())
+
+
+def make_tile(
+        index: int,
+        rng: random.Random
+) -> dict:
+    sku = 100000 + index
+    return {
+        'sku': sku,
+        'action': {'link': f'/product/tovar-{index}-{sku}/'},
+        'mainState': [
+            {'textAtom': {'text': f'Товар <b>{index}</b> "с кавычками"', 'testInfo': {'automatizationId': 'tile-name'}}},
+            {'priceV2': {'price': [
+                {'text': f'{rng.randint(500, 90000):,} ₽'.replace(',', ' '), 'textStyle': 'PRICE'},
+                {'text': f'{rng.randint(90000, 120000):,} ₽'.replace(',', ' '), 'textStyle': 'ORIGINAL_PRICE'},
+            ]}},
+            {'labelList': {'items': [
+                {'title': f'{rng.uniform(3.5, 5):.1f}', 'testInfo': {'automatizationId': 'tile-list-rating'}},
+                {'title': f'{rng.randint(0, 20000)} отзывов', 'testInfo': {'automatizationId': 'tile-list-comments'}},
+            ]}},
+        ],
+        'tileImage': {'items': [{'image': {'link': f'https://cdn1.ozone.ru/s3/multimedia/{sku}.jpg'}}]},
+    }
+
+
+def make_filters() -> dict:
+    return {'sections': [{'filters': [
+        {'key': 'brand', 'checkboxesFilter': {'items': [{'title': f'Бренд {index}'} for index in range(50)]}},
+        {'key': 'currency_price', 'multipleRangesFilter': {'rangeFilter': {'minValue': '490', 'maxValue': '119990'}}},
+    ]}]}
+
+
+def make_search_states(
+        items: int,
+        rng: random.Random
+) -> tuple[str, str]:
+    grid = json.dumps({'items': [make_tile(index, rng) for index in range(items)]}, ensure_ascii=False)
+    return grid, json.dumps(make_filters(), ensure_ascii=False)
+
+
+def make_search_html(
+        items: int,
+        padding: int,
+        rng: random.Random
+) -> str:
+    grid, filters = make_search_states(items, rng)
+    noise = '<div class="tile"><span>реклама</span><a href="/x">ссылка</a></div>\n'
+    body = noise * (padding // len(noise))
+    return (
+        '<!DOCTYPE html><html><head><script>window.__NUXT__={}</script></head><body>'
+        f'{body[:len(body) // 2]}'
+        '<div class="client-state">'
+        f'<div id="state-tileGridDesktop-3201208-default-1" data-state=\'{html.escape(grid)}\'></div>'
+        f'<div id="state-filtersDesktop-1930785-default-1" data-state=\'{html.escape(filters)}\'></div>'
+        '</div>'
+        f'{body[len(body) // 2:]}</body></html>'
+    )
+
+
+def make_redirect_html() -> str:
+    return (
+        '<!DOCTYPE html><html><head><script>'
+        'location.replace("/category/smartfony-15502/?text=\\u0441\\u043c\\u0430\\u0440\\u0442\\u0444\\u043e\\u043d")'
+        '</script></head><body></body></html>'
+    )
+
+
+def make_entrypoint(
+        widgets: dict,
+        padding: int = 0,
+        redirect_url: str | None = None
+) -> str:
+    states = {name: json.dumps(value, ensure_ascii=False) for name, value in widgets.items()}
+    # Виджеты, которые разбор пропускает: реклама, рекомендации и т.п.
+    states.update({f'skuFeedList-{index}-default-1': json.dumps({'items': ['x' * 200] * 5}) for index in range(padding)})
+    document = {'widgetStates': states, 'layout': [{'component': name} for name in states]}
+    if redirect_url:
+        document = {'redirectUrl': redirect_url}
+    return json.dumps(document, ensure_ascii=False)
+
+
+def make_characteristics(groups: int) -> dict:
+    return {'characteristics': [
+        {'short': [
+            {'name': f'Характеристика {group}-{index}', 'values': [{'text': f'значение {index}'}, {'text': 'еще'}]}
+            for index in range(10)
+        ]}
+        for group in range(groups)
+    ]}
+
+
+def make_details(
+        rich: str,
+        groups: int,
+        padding: int
+) -> str:
+    if rich == 'html':
+        description = {'richAnnotationType': 'HTML', 'richAnnotation': '<p>Описание <b>товара</b></p>' * 40}
+    else:
+        description = {'richAnnotationType': 'JSON', 'richAnnotationJson': {'content': [
+            {'blocks': [{'text': {'content': [f'Абзац {row}-{block}' for _ in range(3)]}} for block in range(4)]}
+            for row in range(20)
+        ]}}
+    description['characteristics'] = [{'title': f'Параметр {index}', 'content': 'значение'} for index in range(10)]
+    return make_entrypoint({
+        'webCharacteristics-3282540-pdpPage2column-2': make_characteristics(groups),
+        'webDescription-2983286-pdpPage2column-2': description,
+    }, padding)
+
+
+def make_product(padding: int) -> str:
+    return make_entrypoint({
+        'breadCrumbs-3385917-default-1': {'breadcrumbs': [{'text': 'Электроника'}, {'text': 'Смартфоны'}]},
+        'webStickyProducts-726428-default-1': {'sku': '1234567890', 'name': 'Смартфон Пример 8/256 ГБ'},
+    }, padding)
+
+
+def synthetic_corpus(seed: int = 0) -> list[Fixture]:
+    """
+    Возвращает синтетический корпус: по маленькому и большому ответу каждого вида,
+    ответы с редиректом, описания в HTML и JSON.
+    """
+    rng = random.Random(seed)
+    grid, filters = make_search_states(36, rng)
+    large_grid, large_filters = make_search_states(360, rng)
+    return [
+        Fixture('search_html', 'small', make_search_html(12, 50_000, rng)),
+        Fixture('search_html', 'large', make_search_html(36, 1_000_000, rng)),
+        Fixture('search_html', 'redirect', make_redirect_html()),
+        Fixture('search_json', 'small', make_entrypoint(
+            {'tileGridDesktop-3201208-default-1': json.loads(grid), 'filtersDesktop-1930785-default-1': json.loads(filters)}, 20)),
+        Fixture('search_json', 'large', make_entrypoint(
+            {'tileGridDesktop-3201208-default-1': json.loads(large_grid), 'filtersDesktop-1930785-default-1': json.loads(large_filters)}, 200)),
+        Fixture('search_json', 'redirect', make_entrypoint(dict(), redirect_url='/category/smartfony-15502/?text=smartfon')),
+        Fixture('product', 'small', make_product(10)),
+        Fixture('product', 'large', make_product(300)),
+        Fixture('details', 'html_small', make_details('html', 3, 10)),
+        Fixture('details', 'json_large', make_details('json', 30, 300)),
+    ]
+
+
+def recorded_corpus(directory: Path = FIXTURES_DIR) -> list[Fixture]:
+    """
+    Загружает записанные ответы `<вид>--<имя>.<html|json>` из `directory`.
+    """
+    fixtures = list()
+    for path in sorted(directory.glob('*--*.*')) if directory.exists() else list():
+        kind, _, name = path.stem.partition('--')
+        if kind in KINDS:
+            fixtures.append(Fixture(kind, name, path.read_text(encoding='utf-8')))
+    return fixtures
+
+
+def load_corpus(
+        directory: Path = FIXTURES_DIR,
+        synthetic: bool = False
+) -> list[Fixture]:
+    """
+    Возвращает записанный корпус, а если его нет (или `synthetic=True`) — синтетический.
+    """
+    return (not synthetic and recorded_corpus(directory)) or synthetic_corpus()
@@ -0,0 +1,69 @@
+"""
+Записывает реальные ответы Ozon в корпус фикстур бенчмарков (`benchmarks/fixtures/`).
+
+Запуск из корня проекта (нужны `.env` и действующие cookie):
+
+    python -m benchmarks.record_fixtures --query "смартфон" --product-url https://www.ozon.ru/product/... --sku 123456
+
+Сохраняются полная HTML-страница выдачи (без потокового чтения), ответы entrypoint API
+для выдачи, страницы товара и деталей товара. Запросы идут через те же функции
+`requests.py`, что и в сервисе (лимитер, ретраи, пул cookie).
+"""
+import argparse
+import asyncio
+import re
+
+from pathlib import Path
+from urllib.parse import urlencode
+
+from benchmarks.fixtures import FIXTURES_DIR
+from src.config import settings
+from src.repositories.ozon.parser_products import get_headers
+from src.repositories.ozon.requests import (
+    ozon_client,
+    parse_search,
+    parse_search_json,
+    parse_product,
+    parse_details
+)
+
+
+async def record(
+        query: str,
+        product_url: str,
+        sku: str,
+        directory: Path
+) -> None:
+    session = await ozon_client.start(await get_headers())
+    settings.OZON_STREAM_SEARCH = False
+    params = {'text': query, 'from_global': 'true'}
+    pages = {
+        'search_html--recorded.html': await parse_search(session, params),
+        'search_json--recorded.json': await parse_search_json(session, f'/search/?{urlencode(params)}'),
+        'details--recorded.json': await parse_details(session, sku),
+    }
+    if match := re.search(r'https://(?:www.)?ozon.ru(/(?:product|t)/[a-zA-Z\d-]+/?)', product_url):
+        url = f'https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url={match.group(1)}'
+        pages['product--recorded.json'] = await parse_product(session, f'{url}?layout_container=pdpPage2column&layout_page_index=1')
+
+    directory.mkdir(parents=True, exist_ok=True)
+    for name, payload in pages.items():
+        (directory / name).write_text(payload, encoding='utf-8')
+        print(f"{name}: {len(payload.encode()) / 1024:.0f} КБ")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--query', required=True, help='текст поискового запроса')
+    parser.add_argument('--product-url', required=True, help='ссылка на карточку товара')
+    parser.add_argument('--sku', required=True, help='SKU товара для запроса деталей')
+    parser.add_argument('--output', type=Path, default=FIXTURES_DIR, help='каталог фикстур')
+    args = parser.parse_args()
+    try:
+        await record(args.query, args.product_url, args.sku, args.output)
+    finally:
+        await ozon_client.close()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,10 +1,13 @@
 import asyncio
+import os
 
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as ec
 
+from src.config import settings
+
 
 async def main() -> None:
     cookies = list()
@@ -16,9 +19,13 @@ async def main() -> None:
 
 
 async def update_file(cookies: list[str]) -> None:
-    path = r'C:\Users\Administrator\PycharmProjects\Marketplaces\Cookies\Data\OzonData.txt'
-    with open(path, mode='wt+', encoding='utf-8') as file:
+    # Файл читается пулом cookie на лету, поэтому подменяем его атомарно
+    path = settings.OZON_COOKIES_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_suffix('.tmp')
+    with open(temp_path, mode='wt+', encoding='utf-8') as file:
         file.writelines('\n'.join(cookies))
+    os.replace(temp_path, path)
 
 
 async def get_cookie() -> str:
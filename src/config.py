@@ -1,4 +1,5 @@
 from pathlib import Path
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -11,6 +12,73 @@ class Settings(BaseSettings):
     DB_USER: str
     DB_PASS: str
     DB_NAME: str
+    DB_POOL_SIZE: int = 5
+    DB_POOL_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 30 * 60
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_SLOW_CHECKOUT: float = 0.1
+    DB_STATEMENT_CACHE_SIZE: int = 100
+    DB_CACHE_TTL: float = 7 * 24 * 60 * 60
+    DB_CACHE_TTL_SORTING: dict[str, float] = dict()
+    DB_CACHE_HARD_TTL: float = 30 * 24 * 60 * 60
+    DB_CACHE_HARD_TTL_SORTING: dict[str, float] = dict()
+    DB_CACHE_PARTITIONED: bool = False
+    DB_PARTITIONS_AHEAD: int = 3
+    DB_PURGE_INTERVAL: float = 60 * 60
+    DB_PURGE_BATCH_SIZE: int = 1000
+
+    HTTP_POOL_LIMIT: int = 100
+    HTTP_POOL_LIMIT_PER_HOST: int = 20
+    HTTP_KEEPALIVE_TIMEOUT: float = 60
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_WARMUP_CONNECTIONS: int = 2
+
+    OZON_TOP_N: int = 1
+    OZON_DETAILS_CONCURRENCY: int = 5
+    OZON_STREAM_SEARCH: bool = True
+    OZON_STREAM_CHUNK_SIZE: int = 64 * 1024
+    OZON_SEARCH_BACKEND: str = "json"
+    OZON_SEARCH_REDIRECT_TTL: float = 24 * 60 * 60
+    OZON_SEARCH_REDIRECT_MAX: int = 10000
+    OZON_SEARCH_PAGES: int = 1
+    OZON_SEARCH_MAX_ITEMS: Optional[int] = None
+
+    PARSE_EXECUTOR: str = "inline"
+    PARSE_WORKERS: int = 2
+    PARSE_MIN_SIZE: int = 64 * 1024
+
+    RATE_LIMIT_RPS: float = 5
+    RATE_LIMIT_BURST: float = 5
+    RATE_LIMIT_MIN_RPS: float = 0.5
+    RATE_LIMIT_MAX_RPS: float = 20
+    RATE_LIMIT_INCREASE: float = 0.05
+    RATE_LIMIT_DECREASE: float = 0.5
+
+    RETRY_ATTEMPTS: int = 3
+    RETRY_BASE_DELAY: float = 1
+    RETRY_MAX_DELAY: float = 10
+    RETRY_BUDGET: float = 60
+
+    BREAKER_FAILURE_THRESHOLD: int = 5
+    BREAKER_RESET_TIMEOUT: float = 30
+
+    OZON_COOKIES_FILE: Path = Path(__file__).parent.parent / "data" / "ozon_cookies.txt"
+    OZON_COOKIES_QUARANTINE: float = 600
+    OZON_COOKIES_MAX_THROTTLED: int = 3
+
+    DISK_CACHE_ENABLED: bool = True
+    DISK_CACHE_DIR: Path = Path(__file__).parent.parent / "data" / "cache"
+    DISK_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    DISK_CACHE_TTL_DETAILS: float = 24 * 60 * 60
+    DISK_CACHE_TTL_PRODUCT: float = 24 * 60 * 60
+
+    MEMORY_CACHE_ENABLED: bool = True
+    MEMORY_CACHE_MAX_ENTRIES: int = 1000
+    MEMORY_CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    MEMORY_CACHE_TTL: float = 5 * 60
+    MEMORY_CACHE_NEGATIVE_TTL: float = 60
+    MEMORY_CACHE_SNAPSHOT: Optional[Path] = None
 
     @property
     def db_url(self) -> str:
@@ -2,8 +2,22 @@ from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
 
 from src.config import settings
+from src.utils import fast_json
+from src.utils.pool_metrics import PoolMetrics
 
-engine = create_async_engine(settings.db_url)
+pool_metrics = PoolMetrics(slow_checkout=settings.DB_POOL_SLOW_CHECKOUT)
+engine = create_async_engine(
+    settings.db_url,
+    json_deserializer=fast_json.loads,
+    poolclass=pool_metrics.pool_class(),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_POOL_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    connect_args={"prepared_statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE}
+)
+pool_metrics.attach(engine)
 
 
 async_session_maker = async_sessionmaker(bind=engine, expire_on_commit=False)
@@ -1,14 +1,55 @@
+import asyncio
+import contextlib
+import logging
 import uvicorn
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
+from src.config import settings
 from src.middleware import SecretKeyCheck
 from src.routers.ozon import router as oz_router
+from src.repositories.ozon.requests import ozon_client
+from src.repositories.ozon.parser_products import get_headers, parse_executor
+from src.repositories.ozon.maintenance import run_maintenance_loop
+from src.repositories.ozon.database import result_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Жизненный цикл приложения: создает и прогревает общий пул HTTP-соединений
+    и пул разбора ответов (`PARSE_EXECUTOR`) при старте и закрывает их при остановке.
+    Если `DB_PURGE_INTERVAL > 0`, в фоне периодически удаляются устаревшие выгрузки из БД.
+    Если задан `MEMORY_CACHE_SNAPSHOT`, кэш результатов в памяти загружается из снимка при старте
+    и сохраняется в него при остановке.
+    """
+    if settings.MEMORY_CACHE_ENABLED and settings.MEMORY_CACHE_SNAPSHOT:
+        result_cache.load(settings.MEMORY_CACHE_SNAPSHOT)
+    await ozon_client.start(await get_headers())
+    await ozon_client.warm_up()
+    await parse_executor.start()
+    maintenance = asyncio.create_task(run_maintenance_loop()) if settings.DB_PURGE_INTERVAL > 0 else None
+    try:
+        yield
+    finally:
+        if maintenance:
+            maintenance.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await maintenance
+        await ozon_client.close()
+        await parse_executor.close()
+        if settings.MEMORY_CACHE_ENABLED and settings.MEMORY_CACHE_SNAPSHOT:
+            try:
+                result_cache.save(settings.MEMORY_CACHE_SNAPSHOT)
+            except (OSError, TypeError, ValueError) as exception:
+                logging.warning(f"Не удалось сохранить снимок кэша результатов: {exception!r}")
 
 
 server_app = FastAPI(
     timeout=None,
-    description='Проект по сбору данных'
+    description='Проект по сбору данных',
+    lifespan=lifespan
 )
 
 # server_app.add_middleware(SecretKeyCheck)
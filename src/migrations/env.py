@@ -13,12 +13,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 from src.config import settings
 from src.database import Base
 
-from src.models.ozon import (
-    SearchMatchOrm,
-    UrlProductsOrm,
-    ProductTopOrm,
-    ProductCharacteristicsOrm
-)
+from src.models.ozon import SearchMatchOrm
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,45 @@
+"""add url products metrics
+
+Revision ID: 3c5e9a1d7b42
+Revises: b723eb44048d
+Create Date: 2026-10-17 12:10:31.482190
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c5e9a1d7b42"
+down_revision: Union[str, Sequence[str], None] = "b723eb44048d"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Метка колонок, добавленных этой ревизией: downgrade удаляет только их
+ADDED_COMMENT = f"added by {revision}"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Колонки могли быть добавлены вручную до появления миграции
+    existing = {column["name"] for column in sa.inspect(op.get_bind()).get_columns("ozon_url_products")}
+    columns = (
+        sa.Column("product_price", sa.Integer(), nullable=True, comment=ADDED_COMMENT),
+        sa.Column("product_rating", sa.String(length=50), nullable=True, comment=ADDED_COMMENT),
+        sa.Column("product_reviews", sa.String(length=50), nullable=True, comment=ADDED_COMMENT),
+    )
+    for column in columns:
+        if column.name not in existing:
+            op.add_column("ozon_url_products", column)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Колонки, существовавшие до ревизии (без метки), вместе с данными остаются
+    for column in reversed(sa.inspect(op.get_bind()).get_columns("ozon_url_products")):
+        if column["name"] in ("product_price", "product_rating", "product_reviews") and column.get("comment") == ADDED_COMMENT:
+            op.drop_column("ozon_url_products", column["name"])
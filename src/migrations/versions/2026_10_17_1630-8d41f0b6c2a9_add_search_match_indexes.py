@@ -0,0 +1,50 @@
+"""add search match indexes
+
+Revision ID: 8d41f0b6c2a9
+Revises: 3c5e9a1d7b42
+Create Date: 2026-10-17 16:30:12.904113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "8d41f0b6c2a9"
+down_revision: Union[str, Sequence[str], None] = "3c5e9a1d7b42"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Дубликаты (concat_name, sorting_type): оставляется самая свежая выгрузка,
+    # дочерние строки удаляются каскадно
+    op.execute(
+        """
+        DELETE FROM ozon_search_match AS match
+        USING ozon_search_match AS newer
+        WHERE match.concat_name = newer.concat_name
+          AND match.sorting_type = newer.sorting_type
+          AND (match.update_time, match.unique_id) < (newer.update_time, newer.unique_id)
+        """
+    )
+    op.create_index(
+        "ix_ozon_search_match_name_sorting",
+        "ozon_search_match",
+        ["concat_name", "sorting_type"],
+        unique=True,
+    )
+    op.create_index(
+        "ix_ozon_search_match_update_time",
+        "ozon_search_match",
+        ["update_time"],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ozon_search_match_update_time", table_name="ozon_search_match")
+    op.drop_index("ix_ozon_search_match_name_sorting", table_name="ozon_search_match")
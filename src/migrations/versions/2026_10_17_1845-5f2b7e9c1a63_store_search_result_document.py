@@ -0,0 +1,273 @@
+"""store search result document
+
+Revision ID: 5f2b7e9c1a63
+Revises: 8d41f0b6c2a9
+Create Date: 2026-10-17 18:45:07.316254
+
+"""
+
+import ast
+
+from collections import defaultdict
+from typing import Any, Callable, Optional, Sequence, Union
+
+from alembic import op
+import numpy as np
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import JSONB
+
+
+# revision identifiers, used by Alembic.
+revision: str = "5f2b7e9c1a63"
+down_revision: Union[str, Sequence[str], None] = "8d41f0b6c2a9"
+branch_labels: Union[str, Sequence[str], None] = ("main",)
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Формат документа зафиксирован на момент миграции (SearchResult.to_document), код приложения не импортируется
+BATCH_SIZE = 1000
+MISSING_VALUE = "Нет"
+PRICE_ATTRIBUTES = ("min_price", "max_price", "avg_price")
+PERCENTILES = (10, 25, 75, 90)
+TRIM = 0.1
+
+
+def parse_number(
+        value: Optional[str],
+        format_type: Callable
+) -> Optional[int | float]:
+    if not value:
+        return None
+    if format_type is int:
+        value = "".join(char for char in str(value) if char.isdigit())
+    else:
+        value = "".join(char for char in str(value) if char.isdigit() or char == ".")
+    try:
+        return format_type(value)
+    except ValueError:
+        return None
+
+
+def to_response_value(value: Any) -> Any:
+    return MISSING_VALUE if value is None else value
+
+
+def build_price_stats(
+        tiles: list[tuple[Optional[int], Optional[float], Optional[int]]]
+) -> Optional[dict[str, Any]]:
+    """
+    Статистика цен по карточкам `(price, rating, reviews)`.
+    """
+    price, rating, reviews = (
+        np.array([np.nan if value is None else value for value in column], dtype=np.float64)
+        for column in zip(*tiles)
+    ) if tiles else (np.empty(0), np.empty(0), np.empty(0))
+    prices = np.sort(price[~np.isnan(price)])
+    if not prices.size:
+        return None
+    values = np.percentile(prices, [50, *PERCENTILES])
+    cut = int(prices.size * TRIM)
+    trimmed = prices[cut:prices.size - cut] if prices.size - 2 * cut > 0 else prices
+    rated = ~np.isnan(price) & ~np.isnan(rating) & (rating > 0)
+    weighted = float(np.average(price[rated], weights=rating[rated])) if rated.any() else None
+    return dict(
+        count=int(prices.size),
+        min_price=float(prices[0]),
+        max_price=float(prices[-1]),
+        median_price=round(float(values[0]), 2),
+        **{f"p{percentile:g}": round(float(value), 2) for percentile, value in zip(PERCENTILES, values[1:])},
+        trimmed_mean_price=round(float(trimmed.mean()), 2),
+        rating_weighted_price=None if weighted is None else round(weighted, 2),
+        avg_rating=round(float(np.nanmean(rating)), 2) if (~np.isnan(rating)).any() else None,
+        total_reviews=int(np.nansum(reviews)),
+    )
+
+
+def build_document(
+        sorting_type: str,
+        urls: list[tuple[str, Optional[int], Optional[str], Optional[str]]],
+        attributes: dict[str, str],
+        characteristics: dict[str, list[str]]
+) -> dict[str, Any]:
+    """
+    Документ `result` из строк дочерних таблиц одной выгрузки.
+    """
+    tiles = [
+        (url, price, parse_number(rating, float), parse_number(reviews, int))
+        for url, price, rating, reviews in urls
+    ]
+    attributes = dict(attributes)
+    currency_prices = {name: float(attributes.pop(name)) for name in PRICE_ATTRIBUTES if name in attributes}
+    top = list()
+    if attributes or characteristics:
+        top.append(dict(
+            url=tiles[0][0] if tiles else None,
+            sku=None,
+            name=attributes.get("product_name"),
+            image=attributes.get("main_image"),
+            description=attributes.get("description"),
+            characteristics=characteristics,
+        ))
+    return dict(
+        sorting_type=sorting_type,
+        products_data=[
+            dict(
+                url=url,
+                name=None,
+                price=to_response_value(price),
+                rating=to_response_value(rating),
+                reviews=to_response_value(reviews),
+            )
+            for url, price, rating, reviews in tiles
+        ],
+        currency_prices=currency_prices,
+        price_stats=build_price_stats([tile[1:] for tile in tiles]),
+        product_name=top[0]["name"] if top else None,
+        product_image=top[0]["image"] if top else None,
+        description=top[0]["description"] if top else None,
+        characteristics=top[0]["characteristics"] if top else None,
+        products_top=top,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ozon_search_match", sa.Column("result", JSONB(), nullable=True))
+
+    # Перенос выгрузок из дочерних таблиц в документ порциями по BATCH_SIZE (по 3 запроса на порцию)
+    connection = op.get_bind()
+    update = sa.text("UPDATE ozon_search_match SET result = :result WHERE unique_id = :unique_id").bindparams(
+        sa.bindparam("result", type_=JSONB())
+    )
+    matches = connection.execute(
+        sa.text("SELECT unique_id, sorting_type FROM ozon_search_match ORDER BY unique_id")
+    ).fetchall()
+    for start in range(0, len(matches), BATCH_SIZE):
+        batch = matches[start:start + BATCH_SIZE]
+        ids = {"ids": [unique_id for unique_id, _ in batch]}
+        urls, attributes, characteristics = defaultdict(list), defaultdict(dict), defaultdict(dict)
+        for unique_id, sorting_type, *url in connection.execute(
+                sa.text(
+                    "SELECT unique_id, sorting_type, product_url, product_price, product_rating, product_reviews "
+                    "FROM ozon_url_products WHERE unique_id IN :ids ORDER BY unique_id, index"
+                ).bindparams(sa.bindparam("ids", expanding=True)),
+                ids
+        ):
+            urls[unique_id, sorting_type].append(tuple(url))
+        for unique_id, name, value in connection.execute(
+                sa.text(
+                    "SELECT unique_id, attribute_name, value FROM ozon_product_top WHERE unique_id IN :ids"
+                ).bindparams(sa.bindparam("ids", expanding=True)),
+                ids
+        ):
+            attributes[unique_id][name] = value
+        for unique_id, name, value in connection.execute(
+                sa.text(
+                    "SELECT unique_id, characteristics_name, value FROM ozon_product_characteristics WHERE unique_id IN :ids"
+                ).bindparams(sa.bindparam("ids", expanding=True)),
+                ids
+        ):
+            characteristics[unique_id][name] = ast.literal_eval(value)
+
+        connection.execute(update, [
+            {
+                "result": build_document(
+                    sorting_type,
+                    urls.get((unique_id, sorting_type), list()),
+                    attributes.get(unique_id, dict()),
+                    characteristics.get(unique_id, dict())
+                ),
+                "unique_id": unique_id,
+            }
+            for unique_id, sorting_type in batch
+        ])
+
+    op.alter_column("ozon_search_match", "result", nullable=False)
+    op.create_index(
+        "ix_ozon_search_match_url_sorting",
+        "ozon_search_match",
+        ["product_url", "sorting_type", "update_time"],
+    )
+    op.drop_table("ozon_url_products")
+    op.drop_table("ozon_product_top")
+    op.drop_table("ozon_product_characteristics")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_table(
+        "ozon_product_characteristics",
+        sa.Column("unique_id", sa.UUID(), nullable=False),
+        sa.Column("characteristics_name", sa.String(length=250), nullable=False),
+        sa.Column("value", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["unique_id"], ["ozon_search_match.unique_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("unique_id", "characteristics_name"),
+    )
+    op.create_table(
+        "ozon_product_top",
+        sa.Column("unique_id", sa.UUID(), nullable=False),
+        sa.Column("attribute_name", sa.String(length=150), nullable=False),
+        sa.Column("value", sa.Text(), nullable=False),
+        sa.ForeignKeyConstraint(["unique_id"], ["ozon_search_match.unique_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("unique_id", "attribute_name"),
+    )
+    op.create_table(
+        "ozon_url_products",
+        sa.Column("unique_id", sa.UUID(), nullable=False),
+        sa.Column("sorting_type", sa.String(length=50), nullable=False),
+        sa.Column("index", sa.INTEGER(), nullable=False),
+        sa.Column("product_url", sa.Text(), nullable=False),
+        # Метка 3c5e9a1d7b42: при дальнейшем откате эти колонки удаляются
+        sa.Column("product_price", sa.INTEGER(), nullable=True, comment="added by 3c5e9a1d7b42"),
+        sa.Column("product_rating", sa.String(length=50), nullable=True, comment="added by 3c5e9a1d7b42"),
+        sa.Column("product_reviews", sa.String(length=50), nullable=True, comment="added by 3c5e9a1d7b42"),
+        sa.ForeignKeyConstraint(["unique_id"], ["ozon_search_match.unique_id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("unique_id", "sorting_type", "index"),
+    )
+
+    # Обратный перенос документа в дочерние таблицы
+    connection = op.get_bind()
+    url_rows, product_rows, characteristics_rows = list(), list(), list()
+    for unique_id, sorting_type, result in connection.execute(
+            sa.text("SELECT unique_id, sorting_type, result FROM ozon_search_match").columns(result=JSONB())
+    ).fetchall():
+        for index, tile in enumerate(result.get("products_data") or list(), start=1):
+            url_rows.append({
+                "unique_id": unique_id,
+                "sorting_type": sorting_type,
+                "index": index,
+                "product_url": tile["url"],
+                "product_price": tile["price"] if isinstance(tile["price"], int) else None,
+                "product_rating": None if isinstance(tile["rating"], str) else str(tile["rating"]),
+                "product_reviews": None if isinstance(tile["reviews"], str) else str(tile["reviews"]),
+            })
+        attributes = dict(result.get("currency_prices") or dict())
+        attributes.update(
+            product_name=result.get("product_name"),
+            main_image=result.get("product_image"),
+            description=result.get("description"),
+        )
+        product_rows.extend(
+            {"unique_id": unique_id, "attribute_name": name, "value": str(value)}
+            for name, value in attributes.items()
+            if value is not None
+        )
+        characteristics_rows.extend(
+            {"unique_id": unique_id, "characteristics_name": name, "value": str(value)}
+            for name, value in (result.get("characteristics") or dict()).items()
+        )
+
+    for table, rows in (
+            ("ozon_url_products", url_rows),
+            ("ozon_product_top", product_rows),
+            ("ozon_product_characteristics", characteristics_rows),
+    ):
+        if rows:
+            columns = list(rows[0])
+            connection.execute(
+                sa.text(f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(':' + name for name in columns)})"),
+                rows
+            )
+
+    op.drop_index("ix_ozon_search_match_url_sorting", table_name="ozon_search_match")
+    op.drop_column("ozon_search_match", "result")
@@ -0,0 +1,87 @@
+"""partition search match by day
+
+Revision ID: e3a7c5b9d142
+Revises:
+Create Date: 2026-10-17 20:10:44.518372
+
+"""
+
+from datetime import datetime, timedelta
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3a7c5b9d142"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = ("partitioned",)
+depends_on: Union[str, Sequence[str], None] = "5f2b7e9c1a63"
+
+
+# Отдельная ветка: применяется только явно (`alembic upgrade partitioned@head`),
+# приложению при этом нужен DB_CACHE_PARTITIONED=true
+PARTITIONS_AHEAD = 3
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE ozon_search_match RENAME TO ozon_search_match_plain")
+    op.execute("ALTER TABLE ozon_search_match_plain RENAME CONSTRAINT ozon_search_match_pkey TO ozon_search_match_plain_pkey")
+    for index in ("name_sorting", "update_time", "url_sorting"):
+        op.drop_index(f"ix_ozon_search_match_{index}", table_name="ozon_search_match_plain")
+
+    # Ключ секционирования входит в PK, поэтому уникального индекса (concat_name, sorting_type) нет
+    op.execute(
+        """
+        CREATE TABLE ozon_search_match (
+            LIKE ozon_search_match_plain INCLUDING DEFAULTS,
+            CONSTRAINT ozon_search_match_pkey PRIMARY KEY (unique_id, update_time)
+        ) PARTITION BY RANGE (update_time)
+        """
+    )
+    op.execute("CREATE TABLE ozon_search_match_default PARTITION OF ozon_search_match DEFAULT")
+
+    first_day = op.get_bind().scalar(sa.text("SELECT min(update_time)::date FROM ozon_search_match_plain"))
+    day, last_day = first_day or datetime.now().date(), datetime.now().date() + timedelta(days=PARTITIONS_AHEAD)
+    while day <= last_day:
+        op.execute(
+            f"CREATE TABLE ozon_search_match_p{day:%Y%m%d} PARTITION OF ozon_search_match "
+            f"FOR VALUES FROM ('{day}') TO ('{day + timedelta(days=1)}')"
+        )
+        day += timedelta(days=1)
+
+    op.execute("INSERT INTO ozon_search_match SELECT * FROM ozon_search_match_plain")
+    op.drop_table("ozon_search_match_plain")
+    op.create_index("ix_ozon_search_match_name_sorting", "ozon_search_match", ["concat_name", "sorting_type", "update_time"])
+    op.create_index("ix_ozon_search_match_url_sorting", "ozon_search_match", ["product_url", "sorting_type", "update_time"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("ALTER TABLE ozon_search_match RENAME TO ozon_search_match_partitioned")
+    op.execute("ALTER TABLE ozon_search_match_partitioned RENAME CONSTRAINT ozon_search_match_pkey TO ozon_search_match_partitioned_pkey")
+    op.drop_index("ix_ozon_search_match_name_sorting", table_name="ozon_search_match_partitioned")
+    op.drop_index("ix_ozon_search_match_url_sorting", table_name="ozon_search_match_partitioned")
+    op.execute(
+        """
+        CREATE TABLE ozon_search_match (
+            LIKE ozon_search_match_partitioned INCLUDING DEFAULTS,
+            CONSTRAINT ozon_search_match_pkey PRIMARY KEY (unique_id)
+        )
+        """
+    )
+    # По каждому ключу переносится только самая свежая выгрузка
+    op.execute(
+        """
+        INSERT INTO ozon_search_match
+        SELECT DISTINCT ON (concat_name, sorting_type) *
+        FROM ozon_search_match_partitioned
+        ORDER BY concat_name, sorting_type, update_time DESC, unique_id DESC
+        """
+    )
+    op.execute("DROP TABLE ozon_search_match_partitioned CASCADE")
+    op.create_index("ix_ozon_search_match_name_sorting", "ozon_search_match", ["concat_name", "sorting_type"], unique=True)
+    op.create_index("ix_ozon_search_match_update_time", "ozon_search_match", ["update_time"])
+    op.create_index("ix_ozon_search_match_url_sorting", "ozon_search_match", ["product_url", "sorting_type", "update_time"])
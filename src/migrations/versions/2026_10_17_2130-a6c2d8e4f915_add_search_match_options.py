@@ -0,0 +1,36 @@
+"""add search match options
+
+Revision ID: a6c2d8e4f915
+Revises: 5f2b7e9c1a63
+Create Date: 2026-10-17 21:30:18.640527
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6c2d8e4f915"
+down_revision: Union[str, Sequence[str], None] = "5f2b7e9c1a63"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Параметры поиска, с которыми получена выгрузка; прежним строкам — 1 страница и детали 1 товара
+    op.add_column("ozon_search_match", sa.Column("top_n", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("ozon_search_match", sa.Column("pages", sa.Integer(), server_default="1", nullable=False))
+    op.add_column("ozon_search_match", sa.Column("max_items", sa.Integer(), nullable=True))
+    op.alter_column("ozon_search_match", "top_n", server_default=None)
+    op.alter_column("ozon_search_match", "pages", server_default=None)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("ozon_search_match", "max_items")
+    op.drop_column("ozon_search_match", "pages")
+    op.drop_column("ozon_search_match", "top_n")
@@ -1,14 +1,29 @@
 from sqlalchemy.orm import Mapped, mapped_column
-from sqlalchemy import String, DateTime, BIGINT, INT, ForeignKey, Text, Float
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import String, DateTime, BIGINT, INT, Text, Index
+from sqlalchemy.dialects.postgresql import UUID, JSONB
 
 from datetime import datetime
+from typing import Any, Optional
 import uuid
+from src.config import settings
 from src.database import Base
 
 
 class SearchMatchOrm(Base):
     __tablename__ = "ozon_search_match"
+    # Таблица соответствует ветке миграций: `partitioned@head` при DB_CACHE_PARTITIONED, иначе `main@head`
+    if settings.DB_CACHE_PARTITIONED:
+        __table_args__ = (
+            Index("ix_ozon_search_match_name_sorting", "concat_name", "sorting_type", "update_time"),
+            Index("ix_ozon_search_match_url_sorting", "product_url", "sorting_type", "update_time"),
+            dict(postgresql_partition_by="RANGE (update_time)"),
+        )
+    else:
+        __table_args__ = (
+            Index("ix_ozon_search_match_name_sorting", "concat_name", "sorting_type", unique=True),
+            Index("ix_ozon_search_match_update_time", "update_time"),
+            Index("ix_ozon_search_match_url_sorting", "product_url", "sorting_type", "update_time"),
+        )
 
     unique_id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
@@ -20,56 +35,8 @@ class SearchMatchOrm(Base):
     concat_name: Mapped[str] = mapped_column(String(length=2000))
     sorting_type: Mapped[str] = mapped_column(String(length=50))
     create_time: Mapped[datetime] = mapped_column(DateTime)
-    update_time: Mapped[datetime] = mapped_column(DateTime)
-
-
-class UrlProductsOrm(Base):
-    __tablename__ = "ozon_url_products"
-
-    unique_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
-        ForeignKey("ozon_search_match.unique_id", ondelete="CASCADE"),
-        primary_key=True
-    )
-    sorting_type: Mapped[str] = mapped_column(
-        String(length=50),
-        primary_key=True
-    )
-    index: Mapped[int] = mapped_column(
-        INT,
-        primary_key=True
-    )
-    product_url: Mapped[str] = mapped_column(Text)
-    product_price: Mapped[int] = mapped_column(INT)
-    product_rating: Mapped[str] = mapped_column(String(length=50))
-    product_reviews: Mapped[str] = mapped_column(String(length=50))
-
-
-class ProductTopOrm(Base):
-    __tablename__ = "ozon_product_top"
-
-    unique_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
-        ForeignKey("ozon_search_match.unique_id", ondelete="CASCADE"),
-        primary_key=True
-    )
-    attribute_name: Mapped[str] = mapped_column(
-        String(length=150),
-        primary_key=True
-    )
-    value: Mapped[str] = mapped_column(Text)
-
-
-class ProductCharacteristicsOrm(Base):
-    __tablename__ = "ozon_product_characteristics"
-
-    unique_id: Mapped[uuid.UUID] = mapped_column(
-        UUID(as_uuid=True),
-        ForeignKey("ozon_search_match.unique_id", ondelete="CASCADE"),
-        primary_key=True
-    )
-    characteristics_name: Mapped[str] = mapped_column(
-        String(length=250),
-        primary_key=True
-    )
-    value: Mapped[str] = mapped_column(Text)
+    update_time: Mapped[datetime] = mapped_column(DateTime, primary_key=settings.DB_CACHE_PARTITIONED)
+    top_n: Mapped[int] = mapped_column(INT)
+    pages: Mapped[int] = mapped_column(INT)
+    max_items: Mapped[Optional[int]] = mapped_column(INT, nullable=True)
+    result: Mapped[dict[str, Any]] = mapped_column(JSONB)
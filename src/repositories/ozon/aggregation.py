@@ -0,0 +1,290 @@
+"""
+Колоночная обработка карточек выдачи: сбор сырых полей в колонки за один проход,
+пакетный разбор чисел и статистика цен на NumPy.
+"""
+import re
+import numpy as np
+
+from dataclasses import dataclass
+from typing import Any, Optional, Sequence
+
+from src.schemas.ozon import Tile, PriceStats
+
+
+PERCENTILES = (10, 25, 75, 90)
+TRIM = 0.1 # Доля отбрасываемых с каждого края цен для усеченного среднего
+
+INT_PATTERN = re.compile(r'[^\d\n]+')
+FLOAT_PATTERN = re.compile(r'[^\d.\n]+')
+EMPTY_PATTERN = re.compile(r'^$', re.MULTILINE)
+
+# Поля `mainState`, нужные карточке (`automatizationId` атомов и `textStyle` цен)
+TILE_FIELDS = ('tile-name', 'PRICE', 'tile-list-rating', 'tile-list-comments')
+FIELD_POSITIONS = {name: position for position, name in enumerate(TILE_FIELDS)}
+EMPTY: dict[str, Any] = dict() # Общая пустая замена отсутствующих вложенных объектов (только для чтения)
+
+
+def parse_numbers(
+        values: Sequence[Optional[str]],
+        pattern: re.Pattern = INT_PATTERN
+) -> np.ndarray:
+    """
+    Пакетно приводит строки вида "1 990 ₽" / "4.7" к числам.
+
+    Parameters
+    ----------
+    values : Sequence[Optional[str]]
+        Исходные строки (None — значение отсутствует).
+    pattern : re.Pattern
+        Символы, удаляемые перед преобразованием (`INT_PATTERN` или `FLOAT_PATTERN`).
+
+    Returns
+    -------
+    np.ndarray
+        Массив float64 той же длины; NaN для пустых и нераспознанных значений.
+
+    Notes
+    -----
+    Строки склеиваются через перевод строки и очищаются одним проходом регулярного
+    выражения, а преобразование в числа выполняет NumPy — без разбора по символам на Python.
+    """
+    if not values:
+        return np.empty(0, dtype=np.float64)
+    if all(type(value) is int for value in values):
+        # Например, SKU из JSON уже числа: очистка строк не нужна
+        return np.array(values, dtype=np.float64)
+    text = '\n'.join('' if value is None else str(value).replace('\n', ' ') for value in values)
+    text = EMPTY_PATTERN.sub('nan', pattern.sub('', text))
+    try:
+        return np.array(text.split('\n'), dtype=np.float64)
+    except ValueError:
+        # Например, "4.7." — такие значения разбираются по одному
+        return np.array([safe_float(value) for value in text.split('\n')], dtype=np.float64)
+
+
+def safe_float(value: str) -> float:
+    try:
+        return float(value)
+    except ValueError:
+        return np.nan
+
+
+def read_tile_columns(
+        items: list[dict[str, Any]]
+) -> dict[str, list[Any]]:
+    """
+    Одним проходом по элементам `items` сетки товаров собирает сырые колонки карточек.
+
+    Parameters
+    ----------
+    items : list[dict[str, Any]]
+        Декодированные элементы `items` (с `mainState`, `action`, `tileImage`).
+
+    Returns
+    -------
+    dict[str, list[Any]]
+        Колонки одинаковой длины: `sku`, `link`, `image` и строковые значения `mainState`
+        по `automatizationId`/`textStyle` из `TILE_FIELDS` (None — значения нет).
+
+    Notes
+    -----
+    Значения сразу раскладываются по колонкам, без промежуточного словаря полей на каждую
+    карточку; остальные атомы `mainState` пропускаются. Если поле встречается несколько раз,
+    берется последнее значение.
+    """
+    columns = {name: list() for name in ('sku', 'link', 'image', *TILE_FIELDS)}
+    skus, links, images = columns['sku'], columns['link'], columns['image']
+    fields = [columns[name] for name in TILE_FIELDS]
+    position_of = FIELD_POSITIONS.get
+    for item in items:
+        row = [None] * len(TILE_FIELDS)
+        for state in item.get('mainState') or ():
+            for key, value in state.items():
+                if key == 'labelList':
+                    for label in value.get('items') or ():
+                        if (position := position_of((label.get('testInfo') or EMPTY).get('automatizationId'))) is not None:
+                            row[position] = label.get('title')
+                elif key == 'textAtom':
+                    if (position := position_of((value.get('testInfo') or EMPTY).get('automatizationId'))) is not None:
+                        row[position] = value.get('text')
+                elif key == 'priceV2':
+                    for price in value.get('price') or ():
+                        if (position := position_of(price.get('textStyle'))) is not None:
+                            row[position] = price.get('text')
+        for column, value in zip(fields, row):
+            column.append(value)
+
+        image_items = (item.get('tileImage') or EMPTY).get('items')
+        images.append((image_items[0].get('image') or EMPTY).get('link') if image_items else None)
+        skus.append(item.get('sku'))
+        links.append((item.get('action') or EMPTY).get('link'))
+    return columns
+
+
+def tiles_from_states(
+        items: list[dict[str, Any]]
+) -> tuple[list[Tile], 'TileColumns']:
+    """
+    Создает карточки из элементов `items` сетки товаров: сырые поля собираются в колонки
+    одним проходом (`read_tile_columns`), цены, рейтинги и отзывы разбираются пакетно (`parse_numbers`).
+
+    Parameters
+    ----------
+    items : list[dict[str, Any]]
+        Декодированные элементы `items` состояния `tileGridDesktop`.
+
+    Returns
+    -------
+    tuple[list[Tile], TileColumns]
+        Карточки товаров в порядке выдачи и их числовые колонки для `compute_stats`.
+
+    Notes
+    -----
+    Колонки переводятся в списки Python целиком (`to_values`), поэтому при создании карточек
+    нет поэлементных операций NumPy и проверок NaN.
+    """
+    raw = read_tile_columns(items)
+    columns = TileColumns(
+        price=parse_numbers(raw['PRICE']),
+        rating=parse_numbers(raw['tile-list-rating'], FLOAT_PATTERN),
+        reviews=parse_numbers(raw['tile-list-comments']),
+    )
+    tiles = [
+        Tile(
+            sku=sku,
+            url='https://www.ozon.ru' + (link or ''),
+            name=str(name or '').strip() or None,
+            price=price,
+            rating=rating,
+            reviews=reviews,
+            image=image,
+        )
+        for sku, link, name, price, rating, reviews, image in zip(
+            to_values(parse_numbers(raw['sku']), int),
+            raw['link'],
+            raw['tile-name'],
+            to_values(columns.price, int),
+            to_values(columns.rating, float),
+            to_values(columns.reviews, int),
+            raw['image'],
+        )
+    ]
+    return tiles, columns
+
+
+def to_values(
+        column: np.ndarray,
+        format_type: type = int
+) -> list[Optional[int | float]]:
+    """
+    Переводит колонку в список Python: NaN -> None, остальные значения -> `format_type`.
+    """
+    missing = np.isnan(column)
+    values = (np.where(missing, 0, column).astype(np.int64) if format_type is int else column).astype(object)
+    values[missing] = None
+    return values.tolist()
+
+
+@dataclass(slots=True)
+class TileColumns:
+    """
+    Колонки числовых полей карточек: цена, рейтинг, количество отзывов (NaN — нет значения).
+    """
+    price: np.ndarray
+    rating: np.ndarray
+    reviews: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.price)
+
+    @classmethod
+    def from_tiles(
+            cls,
+            tiles: Sequence[Tile]
+    ) -> 'TileColumns':
+        """
+        Собирает колонки из готовых карточек (если колонок разбора нет, например у документа из кэша).
+        """
+        count = len(tiles)
+        return cls(
+            price=np.fromiter((np.nan if tile.price is None else tile.price for tile in tiles), np.float64, count),
+            rating=np.fromiter((np.nan if tile.rating is None else tile.rating for tile in tiles), np.float64, count),
+            reviews=np.fromiter((np.nan if tile.reviews is None else tile.reviews for tile in tiles), np.float64, count),
+        )
+
+    def take(
+            self,
+            indices: Sequence[int]
+    ) -> 'TileColumns':
+        """
+        Возвращает колонки выбранных карточек (например, после отбрасывания повторных SKU).
+        """
+        indices = np.asarray(indices, dtype=np.intp)
+        return TileColumns(price=self.price[indices], rating=self.rating[indices], reviews=self.reviews[indices])
+
+    @classmethod
+    def concat(
+            cls,
+            parts: Sequence['TileColumns']
+    ) -> 'TileColumns':
+        """
+        Склеивает колонки нескольких страниц выдачи в порядке `parts`.
+        """
+        if not parts:
+            return cls(price=np.empty(0), rating=np.empty(0), reviews=np.empty(0))
+        return cls(
+            price=np.concatenate([part.price for part in parts]),
+            rating=np.concatenate([part.rating for part in parts]),
+            reviews=np.concatenate([part.reviews for part in parts]),
+        )
+
+
+def compute_stats(
+        columns: TileColumns,
+        percentiles: Sequence[float] = PERCENTILES,
+        trim: float = TRIM
+) -> Optional[PriceStats]:
+    """
+    Считает статистику цен карточек.
+
+    Parameters
+    ----------
+    columns : TileColumns
+        Колонки карточек выдачи.
+    percentiles : Sequence[float]
+        Перцентили цены (помимо медианы).
+    trim : float
+        Доля отбрасываемых цен с каждого края для усеченного среднего.
+
+    Returns
+    -------
+    Optional[PriceStats]
+        Статистика или None, если ни у одной карточки нет цены.
+
+    Notes
+    -----
+    Средняя цена, взвешенная по рейтингу, считается по карточкам, у которых есть и цена, и рейтинг.
+    """
+    prices = np.sort(columns.price[~np.isnan(columns.price)])
+    if not prices.size:
+        return None
+    values = np.percentile(prices, [50, *percentiles])
+    cut = int(prices.size * trim)
+    trimmed = prices[cut:prices.size - cut] if prices.size - 2 * cut > 0 else prices
+
+    rated = ~np.isnan(columns.price) & ~np.isnan(columns.rating) & (columns.rating > 0)
+    weighted = (
+        float(np.average(columns.price[rated], weights=columns.rating[rated]))
+        if rated.any() else None
+    )
+    return PriceStats(
+        count=int(prices.size),
+        min_price=float(prices[0]),
+        max_price=float(prices[-1]),
+        median_price=round(float(values[0]), 2),
+        percentiles={f'p{percentile:g}': round(float(value), 2) for percentile, value in zip(percentiles, values[1:])},
+        trimmed_mean_price=round(float(trimmed.mean()), 2),
+        rating_weighted_price=None if weighted is None else round(weighted, 2),
+        avg_rating=round(float(np.nanmean(columns.rating)), 2) if (~np.isnan(columns.rating)).any() else None,
+        total_reviews=int(np.nansum(columns.reviews)),
+    )
@@ -0,0 +1,58 @@
+"""
+Сроки актуальности выгрузок в кэше БД по типам сортировки (`DB_CACHE_TTL*`, `DB_CACHE_HARD_TTL*`).
+
+Отдельный модуль без зависимостей от парсера и HTTP-клиента: его используют и чтение/запись
+кэша (`database`), и фоновое обслуживание (`maintenance`).
+"""
+from datetime import timedelta
+
+from src.config import settings
+
+
+def get_cache_ttl(
+        sorting_type: str,
+        hard: bool = False
+) -> timedelta:
+    """
+    Срок актуальности выгрузки в БД для типа сортировки.
+
+    Parameters
+    ----------
+    sorting_type : str
+        Тип сортировки выдачи.
+    hard : bool
+        False — мягкий TTL (`DB_CACHE_TTL_SORTING`, иначе `DB_CACHE_TTL`): после него выгрузка
+        отдается с пометкой `stale` и обновляется в фоне; True — жесткий TTL
+        (`DB_CACHE_HARD_TTL_SORTING`, иначе `DB_CACHE_HARD_TTL`, не меньше мягкого): после него
+        выгрузка не отдается и удаляется фоновой очисткой.
+
+    Returns
+    -------
+    timedelta
+        Срок актуальности.
+    """
+    soft_ttl = settings.DB_CACHE_TTL_SORTING.get(sorting_type, settings.DB_CACHE_TTL)
+    if not hard:
+        return timedelta(seconds=soft_ttl)
+    return timedelta(seconds=max(settings.DB_CACHE_HARD_TTL_SORTING.get(sorting_type, settings.DB_CACHE_HARD_TTL), soft_ttl))
+
+
+def default_hard_ttl() -> timedelta:
+    """
+    Жесткий TTL типов сортировки без своих настроек в `*_SORTING`.
+    """
+    return timedelta(seconds=max(settings.DB_CACHE_HARD_TTL, settings.DB_CACHE_TTL))
+
+
+def configured_sorting_types() -> set[str]:
+    """
+    Типы сортировки со своим TTL (`DB_CACHE_TTL_SORTING`, `DB_CACHE_HARD_TTL_SORTING`).
+    """
+    return {*settings.DB_CACHE_TTL_SORTING, *settings.DB_CACHE_HARD_TTL_SORTING}
+
+
+def max_hard_ttl() -> timedelta:
+    """
+    Наибольший жесткий TTL среди всех типов сортировки.
+    """
+    return max([default_hard_ttl(), *(get_cache_ttl(sorting_type, hard=True) for sorting_type in configured_sorting_types())])
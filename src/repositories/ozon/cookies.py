@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import os
+import time
+
+from pathlib import Path
+from typing import Any, Mapping, Optional
+from http.cookies import Morsel
+
+
+class CookieIdentity:
+    """
+    Один набор cookie Ozon и статистика ответов, полученных с ним.
+
+    Notes
+    -----
+    `source` — строка из файла пула (ключ идентичности), `cookie` — текущее значение
+    с учетом `Set-Cookie` из ответов (обновленные токены, `abt_data`, `__Secure-ETC`).
+    """
+    __slots__ = (
+        'source', 'cookie', 'success', 'throttled', 'denied', 'health',
+        'consecutive_throttled', 'quarantined_until', 'last_used'
+    )
+
+    def __init__(
+            self,
+            cookie: str
+    ) -> None:
+        self.source = cookie
+        self.cookie = cookie
+        self.success = 0
+        self.throttled = 0
+        self.denied = 0
+        self.health = 1.0
+        self.consecutive_throttled = 0
+        self.quarantined_until = 0.0
+        self.last_used = 0.0
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {'cookie': self.cookie}
+
+    @property
+    def key(self) -> str:
+        return hashlib.sha1(self.source.encode()).hexdigest()[:10]
+
+    def update(
+            self,
+            cookies: Mapping[str, Morsel]
+    ) -> None:
+        """
+        Применяет `Set-Cookie` ответа к cookie этой идентичности.
+
+        Parameters
+        ----------
+        cookies : Mapping[str, Morsel]
+            Cookie из ответа (`aiohttp.ClientResponse.cookies`); значения с `Max-Age=0` удаляются.
+        """
+        if not cookies:
+            return
+        values = dict(
+            item.strip().split('=', 1) if '=' in item else (item.strip(), '')
+            for item in self.cookie.split(';') if item.strip()
+        )
+        for name, morsel in cookies.items():
+            if morsel['max-age'] == '0':
+                values.pop(name, None)
+            else:
+                values[name] = morsel.value
+        self.cookie = '; '.join(f'{name}={value}' for name, value in values.items())
+
+    def stats(self) -> dict[str, Any]:
+        quarantine = max(self.quarantined_until - time.monotonic(), 0)
+        return dict(
+            key=self.key,
+            health=round(self.health, 3),
+            success=self.success,
+            throttled=self.throttled,
+            denied=self.denied,
+            quarantine=round(quarantine, 1) or None,
+        )
+
+
+class CookiePool:
+    """
+    Пул cookie из файла (по одной строке на идентичность), собираемого `ozon_cookies_update.py`.
+
+    Notes
+    -----
+    - Каждый запрос получает наиболее «здоровую» и дольше всех не использовавшуюся cookie.
+    - `health` — экспоненциальное среднее доли успешных ответов.
+    - 401/403 сразу отправляют cookie в карантин; 429 — после `max_throttled` подряд.
+    - Файл перечитывается при изменении (проверка mtime не чаще раза в `reload_interval` сек);
+      статистика и обновленные ответами cookie сохраняются для строк, оставшихся в файле.
+    - `Set-Cookie` ответа применяется только к cookie, с которой ушел запрос (`report`),
+      поэтому у общей HTTP-сессии хранилище cookie отключено (`aiohttp.DummyCookieJar`).
+    - Если файла нет или все cookie в карантине, `acquire` возвращает None и запрос
+      уходит с cookie из заголовков сессии по умолчанию.
+    """
+    def __init__(
+            self,
+            path: Path,
+            quarantine_time: float,
+            max_throttled: int,
+            reload_interval: float = 5.0,
+            health_alpha: float = 0.2
+    ) -> None:
+        self.path = Path(path)
+        self.quarantine_time = quarantine_time
+        self.max_throttled = max_throttled
+        self.reload_interval = reload_interval
+        self.health_alpha = health_alpha
+        self._identities: dict[str, CookieIdentity] = dict()
+        self._mtime: Optional[float] = None
+        self._checked = 0.0
+
+    def reload(self, force: bool = False) -> None:
+        """
+        Перечитывает файл cookie, если он изменился с прошлой загрузки.
+
+        Parameters
+        ----------
+        force : bool
+            Перечитать файл без учета `reload_interval` и mtime.
+        """
+        now = time.monotonic()
+        if not force and now - self._checked < self.reload_interval:
+            return
+        self._checked = now
+        try:
+            mtime = os.stat(self.path).st_mtime
+            if not force and mtime == self._mtime:
+                return
+            lines = self.path.read_text(encoding='utf-8').splitlines()
+        except OSError as exception:
+            if self._mtime is not None:
+                logging.warning(f"Не удалось прочитать файл cookie {self.path}: {exception!r}")
+            return
+        self._mtime = mtime
+        cookies = [line.strip() for line in lines if line.strip()]
+        self._identities = {
+            cookie: self._identities.get(cookie) or CookieIdentity(cookie)
+            for cookie in cookies
+        }
+
+    def acquire(self) -> Optional[CookieIdentity]:
+        """
+        Выбирает cookie для очередного запроса.
+
+        Returns
+        -------
+        Optional[CookieIdentity]
+            Cookie вне карантина с лучшим `health` (при равенстве — дольше всех не использовавшаяся)
+            или None, если доступных cookie нет.
+        """
+        self.reload()
+        now = time.monotonic()
+        available = [
+            identity for identity in self._identities.values()
+            if identity.quarantined_until <= now
+        ]
+        if not available:
+            return None
+        identity = min(available, key=lambda item: (-round(item.health, 1), item.last_used))
+        identity.last_used = now
+        return identity
+
+    def report(
+            self,
+            identity: Optional[CookieIdentity],
+            status: int,
+            cookies: Optional[Mapping[str, Morsel]] = None
+    ) -> None:
+        """
+        Учитывает HTTP-статус ответа, полученного с cookie, и сохраняет в ней `Set-Cookie` ответа.
+
+        Parameters
+        ----------
+        identity : Optional[CookieIdentity]
+            Cookie, выданная `acquire` (None — ничего не делает).
+        status : int
+            HTTP-статус ответа.
+        cookies : Optional[Mapping[str, Morsel]]
+            Cookie из ответа (`aiohttp.ClientResponse.cookies`).
+        """
+        if identity is None:
+            return
+        identity.update(cookies)
+        ok = 200 <= status < 400
+        identity.health += self.health_alpha * (float(ok) - identity.health)
+        if ok:
+            identity.success += 1
+            identity.consecutive_throttled = 0
+        elif status == 429:
+            identity.throttled += 1
+            identity.consecutive_throttled += 1
+            if identity.consecutive_throttled >= self.max_throttled:
+                self._quarantine(identity)
+        elif status in (401, 403):
+            identity.denied += 1
+            self._quarantine(identity)
+
+    def _quarantine(
+            self,
+            identity: CookieIdentity
+    ) -> None:
+        identity.quarantined_until = time.monotonic() + self.quarantine_time
+        identity.consecutive_throttled = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Возвращает состояние пула для мониторинга (без значений cookie).
+
+        Returns
+        -------
+        dict[str, Any]
+            `size`, `available` и статистика по каждой cookie.
+        """
+        self.reload()
+        now = time.monotonic()
+        return dict(
+            size=len(self._identities),
+            available=sum(identity.quarantined_until <= now for identity in self._identities.values()),
+            identities=[identity.stats() for identity in self._identities.values()],
+        )
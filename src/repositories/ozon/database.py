@@ -1,22 +1,131 @@
+import logging
 import uuid
-import aiohttp
 
-from typing import Any
-from sqlalchemy import select, insert, delete
+from typing import Any, Hashable
+from urllib.parse import urlsplit
+from sqlalchemy import ColumnElement, select, func, and_, or_, true
+from sqlalchemy.dialects.postgresql import insert
 from datetime import datetime
 
 
+from src.config import settings
 from src.database import async_session_maker
-from src.models.ozon import (
-    SearchMatchOrm,
-    UrlProductsOrm,
-    ProductTopOrm,
-    ProductCharacteristicsOrm
+from src.utils.circuit_breaker import CircuitOpenError, get_breaker
+from src.utils.single_flight import SingleFlight
+from src.utils.memory_cache import MemoryCache
+from src.schemas.ozon import SearchResult
+from src.models.ozon import SearchMatchOrm
+from src.repositories.ozon.cache_ttl import get_cache_ttl
+from src.repositories.ozon.requests import ozon_client
+from src.repositories.ozon.parser_products import (
+    get_headers,
+    search_products,
+    search_options,
+    format_product_name
 )
 
+
+upload_flight = SingleFlight()
+result_cache = MemoryCache(
+    max_entries=settings.MEMORY_CACHE_MAX_ENTRIES,
+    max_bytes=settings.MEMORY_CACHE_MAX_BYTES
+)
+NEGATIVE_MESSAGES = ("Наименование не распознано", "Товары не найдены")
+
+
+def covers_options(
+        top_n: int,
+        pages: int,
+        max_items: int | None
+) -> ColumnElement[bool]:
+    """
+    Условие «выгрузка получена с параметрами не меньше запрошенных» (`search_options`):
+    деталей не меньше `top_n`, страниц не меньше `pages`, лимит карточек не меньше `max_items`
+    (NULL — без ограничения).
+    """
+    if max_items is None:
+        items_condition = SearchMatchOrm.max_items.is_(None)
+    else:
+        items_condition = or_(SearchMatchOrm.max_items.is_(None), SearchMatchOrm.max_items >= max_items)
+    return and_(SearchMatchOrm.top_n >= top_n, SearchMatchOrm.pages >= pages, items_condition)
+
+
+def covered_by_options(
+        top_n: int,
+        pages: int,
+        max_items: int | None
+) -> ColumnElement[bool]:
+    """
+    Обратное к `covers_options` условие «выгрузка получена с параметрами не больше указанных»:
+    деталей не больше `top_n`, страниц не больше `pages`, лимит карточек не больше `max_items`
+    (NULL — без ограничения, его покрывает только `max_items=None`).
+    """
+    if max_items is None:
+        items_condition = true()
+    else:
+        items_condition = and_(SearchMatchOrm.max_items.is_not(None), SearchMatchOrm.max_items <= max_items)
+    return and_(SearchMatchOrm.top_n <= top_n, SearchMatchOrm.pages <= pages, items_condition)
+
+
+def get_memory_keys(
+        sorting_type: str,
+        options: tuple[int, int, int | None],
+        product_url: str | None = None,
+        product_name: str | None = None
+) -> list[Hashable]:
+    """
+    Ключи `result_cache`: по нормализованной ссылке на товар (без параметров запроса и
+    завершающего `/`, хост в нижнем регистре) и по нормализованному имени товара;
+    в оба входят тип сортировки и параметры поиска `options` (`search_options`).
+    """
+    keys = list()
+    if product_url:
+        url = urlsplit(product_url.strip())
+        keys.append(("url", f"{url.netloc.lower()}{url.path.rstrip('/')}", sorting_type, *options))
+    if product_name:
+        keys.append(("name", " ".join(product_name.split()).casefold(), sorting_type, *options))
+    return keys
+
+
+def recall(keys: list[Hashable]) -> dict[str, Any] | None:
+    """
+    Возвращает результат из `result_cache` по первому найденному ключу.
+    """
+    if settings.MEMORY_CACHE_ENABLED:
+        for key in keys:
+            if (result := result_cache.get(key)) is not None:
+                return result
+    return None
+
+
+def remember(
+        result: dict[str, Any],
+        keys: list[Hashable]
+) -> dict[str, Any]:
+    """
+    Сохраняет результат в `result_cache` под всеми ключами и возвращает его.
+
+    Notes
+    -----
+    Отрицательные результаты (`NEGATIVE_MESSAGES`) хранятся `MEMORY_CACHE_NEGATIVE_TTL`,
+    остальные — `MEMORY_CACHE_TTL`; устаревшие (`stale`) выгрузки не сохраняются.
+    """
+    if settings.MEMORY_CACHE_ENABLED and not result.get("stale"):
+        if result.get("message") in NEGATIVE_MESSAGES:
+            ttl = settings.MEMORY_CACHE_NEGATIVE_TTL
+        else:
+            ttl = settings.MEMORY_CACHE_TTL
+        for key in keys:
+            result_cache.set(key, result, ttl)
+    return result
+
+
 async def get_product_data_depr(
         product_url: str,
-        sorting_type: str
+        sorting_type: str,
+        top_n: int | None = None,
+        pages: int | None = None,
+        max_items: int | None = None
 ) -> dict[str, Any]:
     """
     Устаревший интегрированный конвейер: парсинг -> сохранение -> возврат.
@@ -27,6 +136,12 @@ async def get_product_data_depr(
         Ссылка на карточку товара Ozon.
     sorting_type : str
         Тип сортировки поиска (score/new/price/rating).
+    top_n : int | None
+        Сколько первых товаров выдачи дополнять деталями (по умолчанию `settings.OZON_TOP_N`).
+    pages : int | None
+        Сколько страниц выдачи читать (по умолчанию `settings.OZON_SEARCH_PAGES`).
+    max_items : int | None
+        Максимум товаров выдачи.
 
     Returns
     -------
@@ -35,224 +150,300 @@ async def get_product_data_depr(
 
     Notes
     -----
-    - Проверяет наличие кэша в БД (`check_exists`).
-    - При необходимости парсит и сохраняет (`upload_products`).
-    - В противном случае читает из БД (`get_database_info`).
+    - Возвращает актуальный кэш из БД, если он есть (`get_database_info`).
+    - Иначе парсит и сохраняет (`upload_products`).
+    - Если предохранитель эндпоинта Ozon открыт (в том числе `product` — до запроса имени товара),
+      отдает последнюю сохраненную выгрузку по этой ссылке не старше жесткого TTL
+      (`get_fallback_info`), а при ее отсутствии сразу возбуждает `CircuitOpenError`.
     """
-    headers, connector = await get_headers(), aiohttp.TCPConnector(ssl=False)
-    async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
-        product_name, sku_id = await format_product_name(session, product_url)
-        if product_name:
-            exists_flag, unique_id = await check_exists(product_name, sorting_type)
-            if exists_flag:
-                if products := await get_products(session, product_name, sorting_type):
-                    products = await format_products(session, products, sorting_type)
-                    return await upload_products(product_url, product_name, sku_id, products)
-                else:
-                    return dict(
-                        sorting_type=sorting_type,
-                        message="Товары не найдены",
-                        details=dict()
-                    )
-            else:
-                return await get_database_info(unique_id, sorting_type)
-        else:
-            return dict(
-                sorting_type=sorting_type,
-                message="Наименование не распознано",
-                details=dict()
-            )
+    try:
+        return await get_parsed_data(product_url, sorting_type, top_n, pages, max_items)
+    except CircuitOpenError:
+        if fallback := await get_fallback_info(product_url, sorting_type):
+            return fallback
+        raise
 
 
-async def get_database_info(
-        unique_id: uuid.UUID,
-        sorting_type: str
+async def get_parsed_data(
+        product_url: str,
+        sorting_type: str,
+        top_n: int | None = None,
+        pages: int | None = None,
+        max_items: int | None = None
 ) -> dict[str, Any]:
     """
-    Возвращает ранее сохраненные в БД результаты по уникальному ключу запроса.
+    Парсит выдачу и сохраняет ее в БД либо возвращает актуальный кэш из БД.
 
     Parameters
     ----------
-    unique_id : uuid.UUID
-        Идентификатор выгрузки.
+    product_url : str
+        Ссылка на карточку товара Ozon.
     sorting_type : str
-        Тип сортировки, для которой нужно вернуть список URL и метаданные.
+        Тип сортировки поиска (score/new/price/rating).
+    top_n : int | None
+        Сколько первых товаров выдачи дополнять деталями.
+    pages : int | None
+        Сколько страниц выдачи читать.
+    max_items : int | None
+        Максимум товаров выдачи.
 
     Returns
     -------
     dict[str, Any]
-        Объект с полями `details` (products, currency_price, main_image, description, characteristics).
+        Структурированный результат для ответа API.
+
+    Notes
+    -----
+    - Одновременные запросы с одинаковыми `(product_name, sorting_type, top_n, pages, max_items)` ожидают
+      один общий парсинг и одну запись в БД (`upload_flight`).
+    - Выгрузка старше мягкого TTL, но моложе жесткого возвращается сразу с `stale=True`,
+      а обновление запускается в фоне (одно на ключ, отдельно от `refresh`: ошибки фонового
+      обновления только логируются); ожидание парсинга — только без выгрузки или после жесткого TTL.
+    - Перед БД проверяется кэш в памяти `result_cache` (по ссылке, затем по имени товара,
+      с учетом `sorting_type` и параметров поиска);
+      в нем на короткий срок запоминаются и отрицательные результаты.
+    - При открытом предохранителе `product` после проверки кэша по ссылке сразу возбуждается
+      `CircuitOpenError`, без получения заголовков и сессии.
     """
-    result = dict(
-        sorting_type=sorting_type,
-        message="Выгрузка с базы данных",
-        details=dict(
-            products=list(),
-            main_image=None,
-            characteristics=dict(),
-            description=None,
-            currency_price=dict()
+    options = search_options(top_n, pages, max_items)
+    if cached := recall(get_memory_keys(sorting_type, options, product_url)):
+        return cached
+    if get_breaker('product').is_open:
+        # Имя товара без запроса к Ozon не получить: выгрузку по ссылке отдает `get_product_data_depr`
+        raise CircuitOpenError('Эндпоинт product временно недоступен')
+
+    session = await ozon_client.get_session(await get_headers())
+    product_name, sku_id = await format_product_name(session, product_url)
+    if product_name:
+        keys = get_memory_keys(sorting_type, options, product_url, product_name)
+        if cached := recall(keys[1:]):
+            return remember(cached, keys[:1])
+
+        async def refresh() -> dict[str, Any]:
+            if products := await search_products(
+                    session, product_name, sorting_type, top_n, pages, max_items
+            ):
+                result = await upload_products(product_url, product_name, sku_id, products, top_n, pages, max_items)
+            else:
+                result = SearchResult(sorting_type=sorting_type, message="Товары не найдены").to_response()
+            return remember(result, keys)
+
+        async def revalidate() -> dict[str, Any] | None:
+            try:
+                return await refresh()
+            except Exception as exception:
+                logging.warning(f"Фоновое обновление выгрузки {product_name!r} ({sorting_type}) не удалось: {exception!r}")
+
+        key = (product_name, sorting_type, *options)
+        if cached := await get_database_info(product_name, sorting_type, *options):
+            if cached["stale"]:
+                # Свой ключ: ожидающий `refresh` не должен получить None от фонового обновления
+                upload_flight.start(("revalidate", *key), revalidate)
+            return remember(cached, keys)
+        return await upload_flight.do(key, refresh)
+    else:
+        return remember(
+            SearchResult(sorting_type=sorting_type, message="Наименование не распознано").to_response(),
+            get_memory_keys(sorting_type, options, product_url)
         )
-    )
-    async with async_session_maker() as db_session:
-        query = select(UrlProductsOrm).filter_by(unique_id=unique_id, sorting_type=sorting_type)
-        urls = await db_session.execute(query)
-        urls = urls.scalars().fetchall()
-
-        query = select(ProductTopOrm).filter_by(unique_id=unique_id)
-        product = await db_session.execute(query)
-        product = product.scalars().fetchall()
 
-        query = select(ProductCharacteristicsOrm).filter_by(unique_id=unique_id)
-        characteristics = await db_session.execute(query)
-        characteristics = characteristics.scalars().fetchall()
 
-    result["details"]["products"] = [url.product_url for url in urls]
+async def get_fallback_info(
+        product_url: str,
+        sorting_type: str
+) -> dict[str, Any] | None:
+    """
+    Возвращает последнюю сохраненную выгрузку по ссылке на товар без учета мягкого TTL
+    (но не старше жесткого).
 
-    for row in product:
-        match row.attribute_name:
-            case "avg_price" | "max_price" | "min_price":
-                result["details"]["currency_price"][row.attribute_name] = float(row.value)
-            case _:
-                result["details"][row.attribute_name] = row.value
+    Parameters
+    ----------
+    product_url : str
+        Исходная ссылка на товар.
+    sorting_type : str
+        Тип сортировки выдачи.
 
-    for row in characteristics:
-        result["details"]["characteristics"][row.characteristics_name] = eval(row.value)
+    Returns
+    -------
+    dict[str, Any] | None
+        Сохраненный результат с пометкой в `message` или None, если выгрузок нет.
+    """
+    query = (
+        select(SearchMatchOrm.result)
+        .where(
+            SearchMatchOrm.product_url == product_url,
+            SearchMatchOrm.sorting_type == sorting_type,
+            SearchMatchOrm.update_time >= func.localtimestamp() - get_cache_ttl(sorting_type, hard=True)
+        )
+        .order_by(SearchMatchOrm.update_time.desc())
+        .limit(1)
+    )
+    async with async_session_maker() as db_session:
+        document = await db_session.scalar(query)
 
-    return result
+    if document is None:
+        return None
+    return dict(document, message="Ozon недоступен, выгрузка с базы данных", stale=True)
 
 
-async def upload_products(
-        product_url: str,
+async def get_database_info(
         product_name: str,
-        sku_id: int,
-        products: dict[str, Any]
-) -> dict[str, Any]:
+        sorting_type: str,
+        top_n: int | None = None,
+        pages: int | None = None,
+        max_items: int | None = None
+) -> dict[str, Any] | None:
     """
-    Сохраняет результаты парсинга в связанные таблицы PostgreSQL.
+    Возвращает выгрузку из БД по ключу запроса, если она не старше жесткого TTL
+    и получена с параметрами поиска не меньше запрошенных.
 
     Parameters
     ----------
-    product_url : str
-        Исходная ссылка на товар.
     product_name : str
-        Имя (конкатенация) товара для поиска/кэширования.
-    sku_id : int
-        SKU товара.
-    products : dict[str, Any]
-        Агрегированные данные (`details`, `sorting_type`, и т.д.).
+        Имя товара (`concat_name`).
+    sorting_type : str
+        Тип сортировки выдачи.
+    top_n : int | None
+        Сколько первых товаров выдачи дополнено деталями (по умолчанию `settings.OZON_TOP_N`).
+    pages : int | None
+        Сколько страниц выдачи прочитано (по умолчанию `settings.OZON_SEARCH_PAGES`).
+    max_items : int | None
+        Максимум товаров выдачи (по умолчанию `settings.OZON_SEARCH_MAX_ITEMS`).
 
     Returns
     -------
-    dict[str, Any]
-        Изначально переданные данные `products` (для дальнейшего ответа).
-    """
-    match_values = {
-        "unique_id": (new_uuid := uuid.uuid4()),
-        "product_url": product_url,
-        "sku_id": sku_id,
-        "concat_name": product_name,
-        "create_time": datetime.now(),
-        "update_time": datetime.now(),
-        "sorting_type": products.get('sorting_type', 'score')
-    }
-
-    urls_values = [
-        {
-            "unique_id": new_uuid,
-            "sorting_type": products.get('sorting_type', 'score'),
-            "index": index,
-            "product_url": url
-        }
-        for index, url in enumerate(products.get('details', dict()).get('products', list()), start=1)
-    ]
-
-    product_values = [
-        {
-            "unique_id": new_uuid,
-            "attribute_name": key,
-            "value": str(value)
-        }
-        for key, value in products.get('details', dict()).get('currency_price', dict()).items()
-    ]
-    product_values.extend([
-        {
-            "unique_id": new_uuid,
-            "attribute_name": key,
-            "value": products.get('details', dict()).get(key)
-        }
-        for key in ('main_image', 'description')
-    ])
-
-    characteristics_values = [
-        {
-            "unique_id": new_uuid,
-            "characteristics_name": key,
-            "value": str(value)
-        }
-        for key, value in products.get('details', dict()).get('characteristics', dict()).items()
-    ]
+    dict[str, Any] | None
+        Сохраненный результат в формате `SearchResult.to_response` (`stale=True`, если выгрузка
+        старше мягкого TTL) или None, если выгрузки нет и нужен парсинг.
 
+    Notes
+    -----
+    - Одна строка по индексу `(concat_name, sorting_type)`: документ `result`
+      (`SearchResult.to_document`) декодируется драйвером из JSONB и отдается в ответ как есть.
+    - Выгрузка с большими `top_n`/`pages`/`max_items` (`covers_options`) тоже подходит:
+      в ней может быть больше карточек и деталей, чем запрошено.
+    """
+    query = (
+        select(
+            SearchMatchOrm.result,
+            (SearchMatchOrm.update_time < func.localtimestamp() - get_cache_ttl(sorting_type)).label("stale")
+        )
+        .where(
+            SearchMatchOrm.concat_name == product_name,
+            SearchMatchOrm.sorting_type == sorting_type,
+            SearchMatchOrm.update_time >= func.localtimestamp() - get_cache_ttl(sorting_type, hard=True),
+            covers_options(*search_options(top_n, pages, max_items))
+        )
+        .order_by(SearchMatchOrm.update_time.desc())
+        .limit(1)
+    )
     async with async_session_maker() as db_session:
-        insert_match_stmt = insert(SearchMatchOrm).values(**match_values)
-        await db_session.execute(insert_match_stmt)
-        insert_urls_stmt = insert(UrlProductsOrm).values(urls_values)
-        await db_session.execute(insert_urls_stmt)
-        insert_product_stmt = insert(ProductTopOrm).values(product_values)
-        await db_session.execute(insert_product_stmt)
-        insert_characteristics_stmt = insert(ProductCharacteristicsOrm).values(characteristics_values)
-        await db_session.execute(insert_characteristics_stmt)
-
-        await db_session.commit()
+        row = (await db_session.execute(query)).one_or_none()
 
-    return products
+    if row is None:
+        return None
+    return dict(row.result, message="Выгрузка с базы данных", stale=row.stale)
 
 
-async def check_exists(
+async def upload_products(
+        product_url: str,
         product_name: str,
-        sorting_type: str
-) -> tuple[bool, uuid.UUID | None]:
+        sku_id: int,
+        products: SearchResult,
+        top_n: int | None = None,
+        pages: int | None = None,
+        max_items: int | None = None
+) -> dict[str, Any]:
     """
-    Проверяет наличие актуальной записи в БД для пары (product_name, sorting_type).
+    Сохраняет результат парсинга в БД.
 
     Parameters
     ----------
+    product_url : str
+        Исходная ссылка на товар.
     product_name : str
-        Имя товара для поиска.
-    sorting_type : str
-        Тип сортировки выдачи.
+        Имя (конкатенация) товара для поиска/кэширования.
+    sku_id : int
+        SKU товара.
+    products : SearchResult
+        Результат поиска (`search_products`).
+    top_n : int | None
+        Сколько первых товаров выдачи дополнено деталями.
+    pages : int | None
+        Сколько страниц выдачи прочитано.
+    max_items : int | None
+        Максимум товаров выдачи.
 
     Returns
     -------
-    tuple[bool, uuid.UUID | None]
-        `(need_parse, unique_id)` — если данные актуальны (<=7 дней),
-        возвращает `(False, unique_id)`; если требуется перепарсинг — `(True, None)`.
+    dict[str, Any]
+        `products.to_response()` для дальнейшего ответа.
+
+    Notes
+    -----
+    - Результат целиком записывается одной строкой `ozon_search_match` с документом
+      `result` (JSONB, `SearchResult.to_document`).
+    - Параметры поиска (`search_options`) сохраняются в колонках `top_n`, `pages`, `max_items`.
+    - Выгрузка по ключу `(concat_name, sorting_type)` заменяется на месте одним запросом
+      (`INSERT ... ON CONFLICT DO UPDATE ... WHERE`), если она старше TTL или новые параметры
+      покрывают сохраненные и строго больше их (`covered_by_options`). Актуальная выгрузка с равными
+      или несравнимыми параметрами (например, `top_n=3, pages=1` и `top_n=1, pages=3`) остается:
+      параллельные записи не затирают друг друга.
+    - В секционированной таблице (`DB_CACHE_PARTITIONED`) уникального индекса по ключу нет:
+      выгрузка всегда вставляется новой строкой, а параллельные записи одного ключа
+      сериализуются транзакционной advisory-блокировкой.
     """
+    top_n, pages, max_items = options = search_options(top_n, pages, max_items)
+    cutoff = func.localtimestamp() - get_cache_ttl(products.sorting_type)
+    insert_stmt = insert(SearchMatchOrm).values(
+        unique_id=uuid.uuid4(),
+        product_url=product_url,
+        sku_id=sku_id,
+        concat_name=product_name,
+        sorting_type=products.sorting_type,
+        create_time=datetime.now(),
+        update_time=datetime.now(),
+        top_n=top_n,
+        pages=pages,
+        max_items=max_items,
+        result=products.to_document(),
+    )
     async with async_session_maker() as db_session:
-        query = select(SearchMatchOrm)
-        matches = await db_session.execute(query)
-        matches = {
-            (match.concat_name, match.sorting_type): {
-                'unique_id': match.unique_id,
-                'update_time': match.update_time
-            }
-            for match in matches.scalars().fetchall()
-        }
-
-    if (product_name, sorting_type) in matches:
-        unique_id = matches[(product_name, sorting_type)]['unique_id']
-        update_time = matches[(product_name, sorting_type)]['update_time']
-        if (datetime.now() - update_time).days <= 7:
-            return False, unique_id
-        else:
-            async with async_session_maker() as db_session:
-                delete_urls_stmt = (
-                    delete(SearchMatchOrm)
-                    .where(SearchMatchOrm.unique_id == unique_id)
+        async with db_session.begin():
+            if settings.DB_CACHE_PARTITIONED:
+                await db_session.execute(
+                    select(func.pg_advisory_xact_lock(func.hashtextextended(f"{product_name}:{products.sorting_type}", 0)))
+                )
+                fresh_query = (
+                    select(SearchMatchOrm.unique_id)
+                    .where(
+                        SearchMatchOrm.concat_name == product_name,
+                        SearchMatchOrm.sorting_type == products.sorting_type,
+                        SearchMatchOrm.update_time >= cutoff,
+                        covers_options(*options)
+                    )
+                    .limit(1)
+                )
+                if await db_session.scalar(fresh_query) is None:
+                    await db_session.execute(insert_stmt)
+            else:
+                await db_session.execute(
+                    insert_stmt.on_conflict_do_update(
+                        index_elements=[SearchMatchOrm.concat_name, SearchMatchOrm.sorting_type],
+                        set_=dict(
+                            product_url=insert_stmt.excluded.product_url,
+                            sku_id=insert_stmt.excluded.sku_id,
+                            update_time=insert_stmt.excluded.update_time,
+                            top_n=insert_stmt.excluded.top_n,
+                            pages=insert_stmt.excluded.pages,
+                            max_items=insert_stmt.excluded.max_items,
+                            result=insert_stmt.excluded.result,
+                        ),
+                        where=or_(
+                            SearchMatchOrm.update_time < cutoff,
+                            and_(covered_by_options(*options), ~covers_options(*options))
+                        )
+                    )
                 )
-                await db_session.execute(delete_urls_stmt)
-                await db_session.commit()
 
-            return True, None
-    else:
-        return True, None
\ No newline at end of file
+    return products.to_response()
@@ -0,0 +1,222 @@
+"""
+Синхронный разбор ответов Ozon: сырой ответ -> компактная модель (`src/schemas/ozon.py`).
+
+Функции модуля чистые (без ввода-вывода и настроек) и передаются в `parse_executor`,
+поэтому могут выполняться в пуле процессов: модуль не импортирует `src.config`,
+а аргументы и результаты сериализуются pickle.
+"""
+import re
+
+from collections import defaultdict
+from typing import Any, Optional
+
+from src.utils import fast_json
+from src.schemas.ozon import Tile, PriceSummary, ProductDetails, SearchResult
+from src.repositories.ozon.widgets import WidgetStates
+from src.repositories.ozon.aggregation import tiles_from_states
+from src.repositories.ozon.page_states import (
+    GRID_STATE,
+    FILTER_STATE,
+    extract_states,
+    extract_states_soup
+)
+
+
+def build_search_result(
+        grid_state: Optional[str],
+        filter_state: Optional[str],
+        sorting_type: str
+) -> Optional[SearchResult]:
+    """
+    Собирает результат поиска из JSON-строк состояний сетки товаров и фильтров.
+
+    Parameters
+    ----------
+    grid_state : Optional[str]
+        Состояние `tileGridDesktop-*`.
+    filter_state : Optional[str]
+        Состояние `filtersDesktop-*`.
+    sorting_type : str
+        Тип сортировки выдачи.
+
+    Returns
+    -------
+    Optional[SearchResult]
+        Карточки и сводные цены или None, если сетки товаров нет.
+    """
+    if not grid_state:
+        return None
+    tiles, columns = tiles_from_states(fast_json.loads(grid_state).get('items', list()))
+    return SearchResult(
+        sorting_type=sorting_type,
+        tiles=tiles,
+        prices=PriceSummary.from_filters(fast_json.loads(filter_state)) if filter_state else PriceSummary(),
+        columns=columns,
+    )
+
+
+def parse_search_payload(
+        payload: str,
+        sorting_type: str
+) -> tuple[Optional[str], Optional[SearchResult]]:
+    """
+    Разбирает ответ entrypoint JSON API для страницы поиска.
+
+    Parameters
+    ----------
+    payload : str
+        Тело ответа `parse_search_json`.
+    sorting_type : str
+        Тип сортировки выдачи.
+
+    Returns
+    -------
+    tuple[Optional[str], Optional[SearchResult]]
+        Адрес редиректа (`redirectUrl`), если Ozon перенаправил запрос, и результат поиска
+        (None, если товаров в ответе нет).
+    """
+    widgets = WidgetStates.from_payload(payload)
+    if widgets.redirect_url:
+        return widgets.redirect_url, None
+    return None, build_search_result(widgets.raw('tileGridDesktop-'), widgets.raw('filtersDesktop-'), sorting_type)
+
+
+def parse_search_page(
+        page: str,
+        sorting_type: str
+) -> Optional[SearchResult]:
+    """
+    Разбирает HTML выдачи поиска.
+
+    Parameters
+    ----------
+    page : str
+        HTML страницы (или компактный HTML потокового чтения).
+    sorting_type : str
+        Тип сортировки выдачи.
+
+    Returns
+    -------
+    Optional[SearchResult]
+        Результат поиска или None, если сетка товаров не найдена.
+
+    Notes
+    -----
+    Блоки извлекаются прямым поиском по тексту (`extract_states`); BeautifulSoup
+    (`extract_states_soup`) используется, только если так сетку товаров найти не удалось.
+    """
+    if GRID_STATE not in (page_states := extract_states(page)):
+        page_states = extract_states_soup(page)
+    return build_search_result(page_states.get(GRID_STATE), page_states.get(FILTER_STATE), sorting_type)
+
+
+def parse_product_name(
+        payload: str
+) -> tuple[Optional[str], int]:
+    """
+    Разбирает ответ `parse_product`: читаемое имя товара (с последней категорией
+    из хлебных крошек) и SKU.
+
+    Parameters
+    ----------
+    payload : str
+        Тело ответа entrypoint API для страницы товара.
+
+    Returns
+    -------
+    tuple[Optional[str], int]
+        Имя товара и SKU.
+    """
+    prefix, product_name, sku_id = None, None, int()
+    widgets = WidgetStates.from_payload(payload)
+    for data in widgets.get_all('breadCrumbs-'):
+        *_, last_item = data.get('breadcrumbs', list())
+        prefix = last_item.get('text', '')
+    for data in widgets.get_all('webStickyProducts-'):
+        sku_id = int(data.get('sku', '0'))
+        product_name = data.get('name', '')
+    if str(prefix).lower() in str(product_name).lower():
+        return product_name, sku_id
+    else:
+        return f'{prefix} {product_name}', sku_id
+
+
+def parse_product_details(
+        payload: str,
+        tile: Tile
+) -> ProductDetails:
+    """
+    Разбирает ответ `parse_details`: описание и характеристики товара.
+
+    Parameters
+    ----------
+    payload : str
+        Тело ответа entrypoint API для карточки товара.
+    tile : Tile
+        Карточка товара из выдачи (источник url, sku, имени и изображения).
+
+    Returns
+    -------
+    ProductDetails
+        Детали товара.
+    """
+    description = str()
+    characteristics = dict()
+    widgets = WidgetStates.from_payload(payload)
+    for data in widgets.get_all('webCharacteristics-'):
+        characteristics.update(get_characteristics(data))
+    for rich in widgets.get_all('webDescription-'):
+        if 'richAnnotationType' in rich:
+            if rich.get('richAnnotationType') == 'HTML':
+                if rich_text := rich.get('richAnnotation'):
+                    description += rich_text + '\n'
+            else:
+                for row in rich.get('richAnnotationJson', dict()).get('content', list()):
+                    for block in row.get('blocks', list()):
+                        for text in block.get('text', dict()).get('content', list()):
+                            description += text + '\n'
+        if 'characteristics' in rich:
+            for row in rich.get('characteristics', list()):
+                key, value = row.get('title'), row.get('content')
+                description += f'{key}: {value}\n'
+    else:
+        description = description if description.strip() else 'Описание не найдено'
+        description = re.sub(pattern=r'</?[a-z/]+>', repl='', string=description)
+
+    return ProductDetails(
+        sku=tile.sku,
+        url=tile.url,
+        name=tile.name,
+        image=tile.image,
+        description=description,
+        characteristics=characteristics,
+    )
+
+
+def get_characteristics(
+        data: dict[str, Any]
+) -> dict[str, list[str]]:
+    """
+    Преобразует блок характеристик виджета в словарь: название -> список значений.
+
+    Parameters
+    ----------
+    data : dict[str, Any]
+        JSON-объект виджета характеристик.
+
+    Returns
+    -------
+    dict[str, list[str]]
+        Словарь с названием характеристики и списком значений.
+    """
+    result = defaultdict(list)
+    for part_data in data.get('characteristics', list()):
+        for _, characteristics in part_data.items():
+            if isinstance(characteristics, list):
+                for characteristic in characteristics:
+                    if characteristic_name := characteristic.get('name'):
+                        for value in characteristic.get('values', list()):
+                            if characteristic_values := value.get('text'):
+                                result[characteristic_name].append(characteristic_values)
+    else:
+        return dict(result)
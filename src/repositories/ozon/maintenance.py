@@ -0,0 +1,245 @@
+"""
+Фоновое обслуживание кэша выгрузок в БД: удаление устаревших строк небольшими порциями
+и, при секционированной таблице (`DB_CACHE_PARTITIONED`), создание дневных секций заранее
+и удаление секций целиком.
+
+Запускается из lifespan приложения (`DB_PURGE_INTERVAL`) или разово:
+
+    python -m src.repositories.ozon.maintenance
+"""
+import asyncio
+import logging
+import re
+import sys
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import and_, delete, func, select, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from src.config import settings
+from src.database import async_session_maker, engine
+from src.models.ozon import SearchMatchOrm
+from src.repositories.ozon.cache_ttl import configured_sorting_types, default_hard_ttl, get_cache_ttl, max_hard_ttl
+
+
+PARTITION_PATTERN = re.compile(r'^ozon_search_match_p(\d{8})$')
+
+
+def partition_name(day: date) -> str:
+    return f'ozon_search_match_p{day:%Y%m%d}'
+
+
+def expired_conditions() -> list:
+    """
+    Возвращает условия устаревания строк (старше жесткого TTL): по одному на тип сортировки
+    со своим TTL (`DB_CACHE_TTL_SORTING`, `DB_CACHE_HARD_TTL_SORTING`) и одно для остальных.
+    """
+    sorting_types = configured_sorting_types()
+    conditions = [
+        and_(
+            SearchMatchOrm.sorting_type == sorting_type,
+            SearchMatchOrm.update_time < func.localtimestamp() - get_cache_ttl(sorting_type, hard=True)
+        )
+        for sorting_type in sorting_types
+    ]
+    conditions.append(and_(
+        SearchMatchOrm.sorting_type.not_in(list(sorting_types)),
+        SearchMatchOrm.update_time < func.localtimestamp() - default_hard_ttl()
+    ))
+    return conditions
+
+
+async def purge_expired(
+        batch_size: int | None = None
+) -> int:
+    """
+    Удаляет устаревшие выгрузки порциями по `batch_size` строк, каждая в своей транзакции.
+
+    Parameters
+    ----------
+    batch_size : int | None
+        Размер порции (по умолчанию `settings.DB_PURGE_BATCH_SIZE`).
+
+    Returns
+    -------
+    int
+        Количество удаленных строк.
+
+    Notes
+    -----
+    Строки порции блокируются с `SKIP LOCKED`, поэтому очистка из нескольких воркеров
+    не мешает друг другу и записи новых выгрузок.
+    """
+    batch_size = batch_size or settings.DB_PURGE_BATCH_SIZE
+    deleted = 0
+    for condition in expired_conditions():
+        while True:
+            batch = (
+                select(SearchMatchOrm.unique_id)
+                .where(condition)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            async with async_session_maker() as db_session:
+                result = await db_session.execute(
+                    delete(SearchMatchOrm).where(SearchMatchOrm.unique_id.in_(batch.scalar_subquery()))
+                )
+                await db_session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                break
+            await asyncio.sleep(0)
+    return deleted
+
+
+async def maintain_partitions(
+        days_ahead: int | None = None
+) -> list[str]:
+    """
+    Создает дневные секции `ozon_search_match` на `days_ahead` дней вперед и удаляет секции,
+    все строки которых старше наибольшего жесткого TTL.
+
+    Parameters
+    ----------
+    days_ahead : int | None
+        На сколько дней вперед создавать секции (по умолчанию `settings.DB_PARTITIONS_AHEAD`).
+
+    Returns
+    -------
+    list[str]
+        Имена удаленных секций.
+
+    Notes
+    -----
+    - Каждая секция создается и удаляется в своей транзакции; ошибка логируется
+      и не мешает обслуживанию остальных секций.
+    - Секции создаются и для дней, строки которых уже попали в `ozon_search_match_default`
+      (например, если обслуживание долго не запускалось): строки переносятся в новую секцию
+      в той же транзакции (`create_partition`).
+    """
+    days_ahead = settings.DB_PARTITIONS_AHEAD if days_ahead is None else days_ahead
+    today = datetime.now().date()
+    max_ttl = max_hard_ttl()
+    oldest = (datetime.now() - max_ttl).date()
+    async with engine.connect() as connection:
+        partitions = set((await connection.scalars(text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class AS child ON child.oid = pg_inherits.inhrelid "
+            "WHERE pg_inherits.inhparent = 'ozon_search_match'::regclass"
+        ))).all())
+        default_days = (await connection.scalars(text(
+            "SELECT DISTINCT update_time::date FROM ozon_search_match_default"
+        ))).all()
+
+    days = {today + timedelta(days=offset) for offset in range(days_ahead + 1)}
+    days.update(day for day in default_days if day >= oldest)
+    for day in sorted(days):
+        if partition_name(day) in partitions:
+            continue
+        try:
+            async with engine.begin() as connection:
+                await create_partition(connection, day)
+        except Exception as exception:
+            logging.warning(f"Не удалось создать секцию {partition_name(day)}: {exception!r}")
+
+    dropped = list()
+    for name in sorted(partitions):
+        if match := PARTITION_PATTERN.match(name):
+            upper_bound = datetime.strptime(match.group(1), '%Y%m%d') + timedelta(days=1)
+            if upper_bound <= datetime.now() - max_ttl:
+                try:
+                    async with engine.begin() as connection:
+                        await connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+                except Exception as exception:
+                    logging.warning(f"Не удалось удалить секцию {name}: {exception!r}")
+                else:
+                    dropped.append(name)
+    return dropped
+
+
+async def create_partition(
+        connection: AsyncConnection,
+        day: date
+) -> None:
+    """
+    Создает секцию дня `day`, перенося в нее строки этого дня из `ozon_search_match_default`.
+
+    Parameters
+    ----------
+    connection : AsyncConnection
+        Соединение с открытой транзакцией.
+    day : date
+        День секции.
+
+    Notes
+    -----
+    `CREATE TABLE ... PARTITION OF` завершился бы ошибкой, если в секции по умолчанию
+    есть строки этого дня, поэтому секция создается отдельной таблицей, заполняется
+    и подключается `ATTACH PARTITION`.
+    """
+    name, bounds = partition_name(day), dict(start=day, end=day + timedelta(days=1))
+    await connection.execute(text(f"CREATE TABLE {name} (LIKE ozon_search_match INCLUDING DEFAULTS)"))
+    await connection.execute(
+        text(
+            f"WITH moved AS ("
+            f"DELETE FROM ozon_search_match_default "
+            f"WHERE update_time >= :start AND update_time < :end RETURNING *"
+            f") INSERT INTO {name} SELECT * FROM moved"
+        ),
+        bounds
+    )
+    await connection.execute(text(
+        f"ALTER TABLE ozon_search_match ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+
+
+async def run_maintenance() -> int:
+    """
+    Выполняет один проход обслуживания: секции (если включены) и удаление устаревших строк.
+
+    Returns
+    -------
+    int
+        Количество удаленных строк.
+    """
+    if settings.DB_CACHE_PARTITIONED:
+        if dropped := await maintain_partitions():
+            logging.info(f"Удалены секции кэша: {', '.join(dropped)}")
+    return await purge_expired()
+
+
+async def run_maintenance_loop(
+        interval: float | None = None
+) -> None:
+    """
+    Повторяет `run_maintenance` каждые `interval` секунд до отмены задачи.
+
+    Parameters
+    ----------
+    interval : float | None
+        Период, сек (по умолчанию `settings.DB_PURGE_INTERVAL`).
+    """
+    interval = interval or settings.DB_PURGE_INTERVAL
+    while True:
+        try:
+            if deleted := await run_maintenance():
+                logging.info(f"Удалено устаревших выгрузок: {deleted}")
+        except Exception as exception:
+            logging.warning(f"Обслуживание кэша БД не удалось: {exception!r}")
+        await asyncio.sleep(interval)
+
+
+async def main() -> None:
+    try:
+        logging.info(f"Удалено устаревших выгрузок: {await run_maintenance()}")
+    finally:
+        await engine.dispose()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(
+        level=logging.INFO,
+        stream=sys.stdout
+    )
+    asyncio.run(main())
@@ -0,0 +1,279 @@
+import re
+import html
+
+from typing import Optional
+from bs4 import BeautifulSoup
+
+
+GRID_STATE = 'state-tileGridDesktop-'
+FILTER_STATE = 'state-filtersDesktop-'
+STATE_PREFIXES = (GRID_STATE, FILTER_STATE)
+REDIRECT_MARKER = 'location.replace('
+REDIRECT_PATTERN = re.compile(r'location\.replace\(\"(.*?)\"\)')
+
+
+class StateStreamScanner:
+    """
+    Потоковый поиск блоков `data-state` и редиректа `location.replace(...)` в HTML выдачи.
+
+    Notes
+    -----
+    - HTML подается частями (`feed`); в буфере остается только хвост, в котором может
+      начинаться еще не найденный блок, поэтому страница целиком в памяти не хранится.
+    - Поиск считается завершенным (`done`), когда найдены все блоки из `prefixes`
+      или редирект — после этого чтение ответа можно прекратить.
+    """
+    def __init__(
+            self,
+            prefixes: tuple[str, ...] = STATE_PREFIXES
+    ) -> None:
+        self.prefixes = prefixes
+        self.fragments: dict[str, str] = dict()
+        self.redirect: Optional[str] = None
+        self._markers = {prefix: f'id="{prefix}' for prefix in prefixes}
+        # Хвост буфера, сохраняемый между частями: маркер и начало тега могут прийти в разных частях
+        self._overlap = max(len(marker) for marker in (*self._markers.values(), REDIRECT_MARKER)) + 256
+        self._buffer = str()
+
+    @property
+    def done(self) -> bool:
+        return self.redirect is not None or len(self.fragments) == len(self.prefixes)
+
+    def feed(
+            self,
+            text: str
+    ) -> bool:
+        """
+        Добавляет очередную часть HTML и извлекает завершенные блоки.
+
+        Parameters
+        ----------
+        text : str
+            Очередная декодированная часть страницы.
+
+        Returns
+        -------
+        bool
+            True, если все нужное уже найдено и дальше читать не нужно.
+        """
+        self._buffer += text
+        keep_from = max(len(self._buffer) - self._overlap, 0)
+
+        if match := REDIRECT_PATTERN.search(self._buffer):
+            self.redirect = match.group(1)
+            self._buffer = str()
+            return True
+        if (index := find_pending_redirect(self._buffer)) != -1:
+            keep_from = min(keep_from, index)
+
+        for prefix, marker in self._markers.items():
+            if prefix in self.fragments or (index := self._buffer.find(marker)) == -1:
+                continue
+            start = self._buffer.rfind('<', 0, index)
+            if (end := find_element_end(self._buffer, start)) != -1:
+                self.fragments[prefix] = self._buffer[start:end]
+            else:
+                keep_from = min(keep_from, start)
+
+        self._buffer = self._buffer[keep_from:]
+        return self.done
+
+    def to_html(self) -> str:
+        """
+        Собирает найденное в компактный HTML той же структуры, что и исходная страница
+        (`location.replace(...)` либо блоки внутри `div.client-state`).
+
+        Returns
+        -------
+        str
+            Компактный HTML для дальнейшего разбора.
+        """
+        if self.redirect is not None:
+            return f'<script>location.replace("{self.redirect}")</script>'
+        return '<div class="client-state">{}</div>'.format(''.join(self.fragments.values()))
+
+
+def find_pending_redirect(
+        text: str
+) -> int:
+    """
+    Находит первый `location.replace(`, который еще может совпасть с `REDIRECT_PATTERN`
+    после прихода следующих частей страницы.
+
+    Parameters
+    ----------
+    text : str
+        HTML-текст, в котором `REDIRECT_PATTERN` не найден.
+
+    Returns
+    -------
+    int
+        Позиция маркера или -1. Завершенные несовпадающие вызовы (например,
+        `location.replace(url)` во встроенном скрипте) пропускаются.
+    """
+    position = 0
+    while (index := text.find(REDIRECT_MARKER, position)) != -1:
+        tail = text[index + len(REDIRECT_MARKER):]
+        if not tail or (tail[0] == '"' and '\n' not in tail):
+            return index
+        position = index + 1
+    return -1
+
+
+def find_tag_end(
+        text: str | bytes,
+        start: int
+) -> int:
+    """
+    Находит конец открывающего тега, начинающегося с позиции `start`, пропуская
+    значения атрибутов в кавычках (внутри них может встречаться `>`).
+
+    Parameters
+    ----------
+    text : str | bytes
+        HTML-текст или сырые байты страницы.
+    start : int
+        Позиция символа `<` открывающего тега.
+
+    Returns
+    -------
+    int
+        Позиция символа `>` или -1, если тег в тексте еще не завершен.
+    """
+    double_quote, single_quote, greater = ('"', "'", '>') if isinstance(text, str) else (b'"', b"'", b'>')
+    position = start
+    while True:
+        quote = min(
+            (index for index in (text.find(double_quote, position), text.find(single_quote, position)) if index != -1),
+            default=-1
+        )
+        tag_end = text.find(greater, position)
+        if tag_end == -1:
+            return -1
+        if quote == -1 or tag_end < quote:
+            return tag_end
+        if (position := text.find(text[quote:quote + 1], quote + 1)) == -1:
+            return -1
+        position += 1
+
+
+def find_element_end(
+        text: str,
+        start: int
+) -> int:
+    """
+    Находит конец пустого элемента `<div ...></div>`, начинающегося с позиции `start`.
+
+    Parameters
+    ----------
+    text : str
+        HTML-текст.
+    start : int
+        Позиция символа `<` открывающего тега.
+
+    Returns
+    -------
+    int
+        Позиция сразу после `</div>` или -1, если элемент в тексте еще не завершен.
+    """
+    if (tag_end := find_tag_end(text, start)) == -1:
+        return -1
+    if (close := text.find('</div>', tag_end)) == -1:
+        return -1
+    return close + len('</div>')
+
+
+def extract_states(
+        page: str | bytes,
+        prefixes: tuple[str, ...] = STATE_PREFIXES
+) -> dict[str, str]:
+    """
+    Извлекает значения `data-state` элементов с `id`, начинающимся на `prefixes`,
+    прямым поиском по тексту страницы (без построения DOM-дерева).
+
+    Parameters
+    ----------
+    page : str | bytes
+        HTML страницы; bytes декодируются (UTF-8) только в пределах найденных тегов.
+    prefixes : tuple[str, ...]
+        Префиксы `id` искомых элементов.
+
+    Returns
+    -------
+    dict[str, str]
+        Префикс -> значение атрибута `data-state` с раскрытыми HTML-сущностями
+        (для первого найденного элемента каждого префикса).
+    """
+    is_text = isinstance(page, str)
+    result = dict()
+    for prefix in prefixes:
+        marker = f'id="{prefix}' if is_text else f'id="{prefix}'.encode()
+        if (index := page.find(marker)) == -1:
+            continue
+        if (start := page.rfind('<' if is_text else b'<', 0, index)) == -1:
+            continue
+        if (end := find_tag_end(page, start)) == -1:
+            continue
+        tag = page[start:end + 1] if is_text else page[start:end + 1].decode('utf-8', errors='replace')
+        if (value := get_attribute(tag, 'data-state')) is not None:
+            result[prefix] = value
+    return result
+
+
+def get_attribute(
+        tag: str,
+        name: str
+) -> Optional[str]:
+    """
+    Возвращает значение атрибута из текста открывающего тега с раскрытыми HTML-сущностями.
+
+    Parameters
+    ----------
+    tag : str
+        Текст тега вида `<div id="..." data-state='...'>`.
+    name : str
+        Имя атрибута.
+
+    Returns
+    -------
+    Optional[str]
+        Значение атрибута или None, если атрибута нет.
+    """
+    if (index := tag.find(f' {name}=')) == -1:
+        return None
+    position = index + len(name) + 2
+    if position >= len(tag) or tag[position] not in '"\'':
+        return None
+    if (end := tag.find(tag[position], position + 1)) == -1:
+        return None
+    value = tag[position + 1:end]
+    return html.unescape(value) if '&' in value else value
+
+
+def extract_states_soup(
+        page: str | bytes,
+        prefixes: tuple[str, ...] = STATE_PREFIXES
+) -> dict[str, str]:
+    """
+    Запасной вариант `extract_states` на BeautifulSoup: медленнее, но устойчив
+    к нестандартной разметке.
+
+    Parameters
+    ----------
+    page : str | bytes
+        HTML страницы.
+    prefixes : tuple[str, ...]
+        Префиксы `id` искомых элементов.
+
+    Returns
+    -------
+    dict[str, str]
+        Префикс -> значение атрибута `data-state`.
+    """
+    result = dict()
+    if client_state := BeautifulSoup(page, 'html.parser').find(class_="client-state"):
+        for prefix in prefixes:
+            element = client_state.select_one(f'[id^="{prefix}"]')
+            if element and element.get('data-state'):
+                result[prefix] = element.get('data-state')
+    return result
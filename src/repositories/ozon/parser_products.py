@@ -1,18 +1,42 @@
 import re
+import time
+import asyncio
 import aiohttp
 import json
-
-from collections import defaultdict
-from typing import Optional, Any, Callable
-from bs4 import BeautifulSoup
-
+import logging
+
+from dataclasses import replace
+from typing import Optional, Any
+from urllib.parse import urlencode, urlsplit, parse_qsl
+
+from src.config import settings
+from src.utils.single_flight import SingleFlight
+from src.utils.retry_decorators import RetryPolicy, deadline_scope
+from src.utils.circuit_breaker import CircuitOpenError
+from src.utils.parse_executor import ParseExecutor
+from src.schemas.ozon import Tile, ProductDetails, SearchResult
+from src.repositories.ozon.aggregation import TileColumns, compute_stats
+from src.repositories.ozon.extractors import (
+    parse_search_page,
+    parse_search_payload,
+    parse_product_name,
+    parse_product_details
+)
 from src.repositories.ozon.requests import (
+    ozon_client,
     parse_product,
     parse_search,
+    parse_search_json,
     parse_details
 )
 
 
+search_flight = SingleFlight()
+details_flight = SingleFlight()
+search_redirects: dict[str, tuple[float, str]] = dict() # Запрос -> (время, адрес выдачи после редиректа)
+parse_executor = ParseExecutor(settings.PARSE_EXECUTOR, settings.PARSE_WORKERS, settings.PARSE_MIN_SIZE)
+
+
 async def get_product_name(
         product_url: str,
 ) -> tuple[str, int]:
@@ -30,13 +54,12 @@ async def get_product_name(
         Пара (наименование, sku_id). Если имя не распознано, возвращает
         ("Наименование не распознано", 0).
     """
-    headers, connector = await get_headers(), aiohttp.TCPConnector(ssl=False)
-    async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
-        product_name, sku_id = await format_product_name(session, product_url)
-        if product_name:
-            return product_name, sku_id
-        else:
-            return "Наименование не распознано", 0
+    session = await ozon_client.get_session(await get_headers())
+    product_name, sku_id = await format_product_name(session, product_url)
+    if product_name:
+        return product_name, sku_id
+    else:
+        return "Наименование не распознано", 0
 
 
 async def format_product_name(
@@ -56,29 +79,14 @@ async def format_product_name(
     Returns
     -------
     tuple[Optional[str], int]
-        Имя товара и SKU. Если не удалось распознать — (None, 0).
+        Имя товара и SKU (`extractors.parse_product_name`). Если не удалось распознать — (None, 0).
     """
-    prefix, product_name, sku_id = None, None, int()
     pattern = r'https://(?:www.)?ozon.ru(/(?:product|t)/[a-zA-Z\d-]+/?)'
     if match := re.search(pattern=pattern, string=product_url):
         product_url, main_url = match.group(1), 'https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url='
         parse_url = f'{main_url}{product_url}?layout_container=pdpPage2column&layout_page_index=1'
-        product_data = await parse_product(session, parse_url)
-        product_data = json.loads(product_data)
-        for name, value in product_data.get('widgetStates', dict()).items():
-            if name.startswith('breadCrumbs-') and value != '{}':
-                data = json.loads(value)
-                *_, last_item = data.get('breadcrumbs', list())
-                prefix = last_item.get('text', '')
-            elif name.startswith('webStickyProducts-') and value != '{}':
-                data = json.loads(value)
-                sku_id = int(data.get('sku', '0'))
-                product_name = data.get('name', '')
-        else:
-            if str(prefix).lower() in str(product_name).lower():
-                return product_name, sku_id
-            else:
-                return f'{prefix} {product_name}', sku_id
+        payload = await parse_product(session, parse_url)
+        return await parse_executor.run(parse_product_name, payload, size=len(payload))
     else:
         return None, 0
 
@@ -86,6 +94,9 @@ async def format_product_name(
 async def get_product_data(
         product_name: str,
         sorting_type: str,
+        top_n: Optional[int] = None,
+        pages: Optional[int] = None,
+        max_items: Optional[int] = None,
 ) -> dict[str, Any]:
     """
     Формирует агрегированные данные выдачи по имени товара.
@@ -96,39 +107,96 @@ async def get_product_data(
         Имя товара (по которому выполняется поиск).
     sorting_type : str
         Тип сортировки (`score`, `new`, `price`, `rating`).
+    top_n : Optional[int]
+        Сколько первых товаров выдачи дополнять описанием и характеристиками
+        (по умолчанию `settings.OZON_TOP_N`).
+    pages : Optional[int]
+        Сколько страниц выдачи читать.
+    max_items : Optional[int]
+        Максимум карточек выдачи в результате.
 
     Returns
     -------
     dict[str, Any]
-        Агрегированные данные: карточки, цены, топ-товар, описание, характеристики.
-
-    Notes
-    -----
-    Может возвращать кеш из БД, если включено и запись актуальна.
-    """
-    # exists_flag, unique_id = await check_exists(product_name, sorting_type)
-    exists_flag, unique_id = True, None
-    if exists_flag:
-        headers, connector = await get_headers(), aiohttp.TCPConnector(ssl=False)
-        async with aiohttp.ClientSession(headers=headers, connector=connector) as session:
-            if products := await get_products(session, product_name, sorting_type):
-                products = await format_products(session, products)
-                # await upload_products(product_url, product_name, sku_id, products)
-                return products
-            else:
-                return dict()
+        Агрегированные данные: карточки, цены, топ-товар, описание, характеристики
+        (`SearchResult.to_response`) или пустой словарь, если товары не найдены.
+    """
+    session = await ozon_client.get_session(await get_headers())
+    if products := await search_products(session, product_name, sorting_type, top_n, pages, max_items):
+        return products.to_response()
     else:
-        db_info = await get_database_info(unique_id, sorting_type)
-        return db_info
+        return dict()
+
+
+async def search_products(
+        session: aiohttp.ClientSession,
+        product_name: str,
+        sorting_type: str,
+        top_n: Optional[int] = None,
+        pages: Optional[int] = None,
+        max_items: Optional[int] = None,
+) -> Optional[SearchResult]:
+    """
+    Выполняет поиск и агрегацию выдачи (`get_products` + `format_products`), объединяя
+    одновременные одинаковые запросы в один.
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Активная HTTP-сессия.
+    product_name : str
+        Текст запроса поиска.
+    sorting_type : str
+        Тип сортировки (`score`, `new`, `price`, `rating`).
+    top_n : Optional[int]
+        Количество первых товаров, дополняемых деталями.
+    pages : Optional[int]
+        Сколько страниц выдачи читать.
+    max_items : Optional[int]
+        Максимум карточек выдачи в результате.
+
+    Returns
+    -------
+    Optional[SearchResult]
+        Результат поиска или None, если товары не найдены.
+        Результат общий для всех одновременных вызывающих — не изменяйте его на месте.
+    """
+    async def search() -> Optional[SearchResult]:
+        if products := await get_products(session, product_name, sorting_type, pages, max_items):
+            return await format_products(session, products, top_n)
+        else:
+            return None
+
+    key = (product_name, sorting_type, *search_options(top_n, pages, max_items))
+    return await search_flight.do(key, search)
+
+
+def search_options(
+        top_n: Optional[int] = None,
+        pages: Optional[int] = None,
+        max_items: Optional[int] = None,
+) -> tuple[int, int, Optional[int]]:
+    """
+    Подставляет значения по умолчанию из `Settings` в параметры поиска, чтобы одинаковые
+    запросы (например, `top_n=None` и `top_n=settings.OZON_TOP_N`) давали один ключ.
+    """
+    return (
+        top_n or settings.OZON_TOP_N,
+        pages or settings.OZON_SEARCH_PAGES,
+        max_items or settings.OZON_SEARCH_MAX_ITEMS
+    )
 
 
 async def get_products(
         session: aiohttp.ClientSession,
         product_name: str,
         sorting_type: str,
-) -> dict:
+        pages: Optional[int] = None,
+        max_items: Optional[int] = None,
+) -> Optional[SearchResult]:
     """
-    Получает и парсит страницу поиска, извлекает список товаров и фильтры.
+    Получает и парсит выдачу поиска (одну или несколько страниц): карточки товаров
+    и сводные цены из фильтров.
 
     Parameters
     ----------
@@ -138,306 +206,355 @@ async def get_products(
         Текст запроса поиска.
     sorting_type : str
         Тип сортировки (`score`, `new`, `price`, `rating`).
+    pages : Optional[int]
+        Сколько страниц выдачи читать (по умолчанию `settings.OZON_SEARCH_PAGES`).
+    max_items : Optional[int]
+        Максимум карточек в результате (по умолчанию `settings.OZON_SEARCH_MAX_ITEMS`, без ограничения).
 
     Returns
     -------
-    dict
-        Объект с ключами `products`, `product_top`, `filters` (если найдены).
+    Optional[SearchResult]
+        Карточки (`Tile`) и цены (`PriceSummary`) выдачи или None, если сетка товаров не найдена.
+
+    Notes
+    -----
+    - Первая страница запрашивается отдельно (по ней определяется редирект выдачи),
+      остальные — одновременно по номеру (`page=N`, а не по ссылке на следующую страницу
+      из ответа: она известна только после загрузки предыдущей); скорость запросов
+      ограничивает общий лимитер Ozon.
+    - Страницы добавляются в результат в порядке номеров, как только загружены все
+      предыдущие: порядок карточек — порядок выдачи, от него зависят `top_n` и `max_items`.
+      Карточки с уже встречавшимся SKU пропускаются.
+    - Чтение прекращается (оставшиеся запросы отменяются), когда набрано `max_items`
+      карточек или очередная страница пуста.
+    - Сводные цены берутся из фильтров первой страницы: они описывают всю выдачу.
     """
-    result = dict()
+    pages = pages or settings.OZON_SEARCH_PAGES
+    max_items = max_items or settings.OZON_SEARCH_MAX_ITEMS
     if sorting_type in ("new", "price", "rating"):
         params = {'text': product_name, 'from_global': 'true', 'sorting': sorting_type}
     else:
         params = {'text': product_name, 'from_global': 'true'}
 
-    page_data = await get_page_data(session, params)
-    if client_state := page_data.find(class_="client-state"):
-        grid_data = client_state.select_one('[id^="state-tileGridDesktop-"]')
-        filter_data = client_state.select_one('[id^="state-filtersDesktop-"]')
-        if grid_data and grid_data.get('data-state'):
-            products = json.loads(grid_data.get('data-state')).get('items', list())
-            result["products"] = products
-            result["product_top"] = products[:1]
-        if filter_data and filter_data.get('data-state'):
-            filters_data = json.loads(filter_data.get('data-state'))
-            result["filters"] = filters_data
+    if not (first_page := await get_search_page(session, params, sorting_type)):
+        return None
+    result, seen, parts = replace(first_page, tiles=list()), set(), list()
+
+    def merge(page_result: SearchResult) -> bool:
+        indices, more = list(), bool(page_result.tiles)
+        for index, tile in enumerate(page_result.tiles):
+            key = tile.sku or tile.url
+            if key in seen:
+                continue
+            seen.add(key)
+            result.tiles.append(tile)
+            indices.append(index)
+            if max_items and len(result.tiles) >= max_items:
+                more = False
+                break
+        parts.append(page_result.columns.take(indices) if page_result.columns is not None else None)
+        return more
+
+    if merge(first_page) and pages > 1:
+        tasks = {
+            page: asyncio.ensure_future(get_search_page(session, params, sorting_type, page))
+            for page in range(2, pages + 1)
+        }
+        try:
+            for page, task in tasks.items():
+                try:
+                    page_result = await task
+                except CircuitOpenError:
+                    raise
+                except Exception as exception:
+                    logging.warning(f"Не удалось получить страницу {page} выдачи: {exception!r}")
+                    break
+                if not page_result or not merge(page_result):
+                    break
+        finally:
+            for task in tasks.values():
+                task.cancel()
+                task.add_done_callback(lambda done: done.cancelled() or done.exception())
+    result.columns = TileColumns.concat(parts) if None not in parts else None
     return result
 
 
-async def get_page_data(
+async def get_search_page(
         session: aiohttp.ClientSession,
         params: dict[str, str],
-) -> BeautifulSoup:
+        sorting_type: str,
+        page: int = 1,
+) -> Optional[SearchResult]:
     """
-    Загружает HTML выдачи поиска Ozon и возвращает `BeautifulSoup`-дерево.
+    Получает и парсит одну страницу выдачи поиска.
 
     Parameters
     ----------
     session : aiohttp.ClientSession
         Активная HTTP-сессия.
     params : dict[str, str]
-        Параметры поиска (например, text, sorting).
+        Параметры поиска (например, text, sorting), без номера страницы.
+    sorting_type : str
+        Тип сортировки (`score`, `new`, `price`, `rating`).
+    page : int
+        Номер страницы выдачи (параметр Ozon `page`).
 
     Returns
     -------
-    BeautifulSoup
-        Объект дерева HTML для дальнейшего извлечения блоков.
+    Optional[SearchResult]
+        Результат страницы или None, если сетка товаров не найдена.
+
+    Notes
+    -----
+    - При `settings.OZON_SEARCH_BACKEND == "json"` выдача запрашивается через entrypoint JSON API
+      (`get_search_states`); если запрос не удался или в ответе нет сетки товаров, используется
+      HTML-страница. Пустая сетка (страница за концом выдачи) возвращается как есть.
+    - JSON API и HTML-страница делят один бюджет `settings.RETRY_BUDGET` (`deadline_scope`):
+      запасной запрос получает только остаток, а если бюджет исчерпан, ошибка JSON API возбуждается сразу.
+    - Из состояний виджетов сохраняются только нужные поля, декодированный JSON сразу освобождается.
+    - Разбор выполняется через `parse_executor` (при `settings.PARSE_EXECUTOR != "inline"` — вне event loop).
     """
-    page_data = await parse_search(session, params)
-    if search_match := re.search(pattern=r'location\.replace\(\"(.*?)\"\)', string=page_data):
-        search_url = json.loads(f'"{search_match.group(1)}"')
-        page_data = await parse_product(session, search_url)
-    return BeautifulSoup(page_data, 'html.parser')
+    with deadline_scope(settings.RETRY_BUDGET) as deadline:
+        result = None
+        if settings.OZON_SEARCH_BACKEND == 'json':
+            try:
+                result = await get_search_states(session, params, sorting_type, page)
+            except CircuitOpenError:
+                raise
+            except Exception as exception:
+                if RetryPolicy.remaining(deadline) == 0:
+                    raise
+                logging.warning(f"Поиск через JSON API не удался, используется HTML: {exception!r}")
+
+        if result is None:
+            page_data = await get_page_data(session, params, page)
+            result = await parse_executor.run(parse_search_page, page_data, sorting_type, size=len(page_data))
+    return result
 
 
-async def format_products(
+async def get_search_states(
         session: aiohttp.ClientSession,
-        products: dict[str, Any],
-) -> dict:
+        params: dict[str, str],
+        sorting_type: str,
+        page: int = 1,
+) -> Optional[SearchResult]:
     """
-    Преобразует данные виджетов в единый агрегированный результат.
+    Получает выдачу (`tileGridDesktop-*`, `filtersDesktop-*`) через entrypoint JSON API.
 
     Parameters
     ----------
     session : aiohttp.ClientSession
         Активная HTTP-сессия.
-    products : dict[str, Any]
-        Данные, полученные из страницы поиска (список товаров и фильтры).
+    params : dict[str, str]
+        Параметры поиска (например, text, sorting).
+    sorting_type : str
+        Тип сортировки выдачи.
+    page : int
+        Номер страницы выдачи.
 
     Returns
     -------
-    dict
-        Структура с `products_data`, `currency_prices`, `product_name`,
-        `product_image`, `description`, `characteristics`.
-    """
-    products_data = list() # Ссылки на товары, цены, рейтинг и количество отзывов
-    currency_prices = dict() # Схема с минимальной и максимальной ценой (средняя цена)
-    product_name = None # Наименование самого популярного товара
-    product_image = None # Главное и первое изображение самого популярного товара
-    description = None # Описание товара с Rich-контентом самого популярного товара
-    characteristics = None # Характеристики самого популярного товара
-    for product_number, product in enumerate(products.get('products', list()), start=1):
-        products_data.append(await get_product_rating(product))
-        if product_number == 1:
-            product_top_result_data = await get_product_top_data(session, products)
-            product_name, product_image, description, characteristics = product_top_result_data
-    else:
-        currency_prices.update(await get_currency_prices(products))
-        return dict(
-            products_data=products_data,
-            currency_prices=currency_prices,
-            product_name=product_name,
-            product_image=product_image,
-            description=description,
-            characteristics=characteristics,
-        )
+    Optional[SearchResult]
+        Результат поиска (None, если сетка товаров не найдена).
 
-
-async def get_product_rating(
-        product: dict[str, Any],
-) -> dict[str, Any]:
+    Notes
+    -----
+    Если Ozon перенаправляет запрос (`redirectUrl`, например в категорию), адрес выдачи
+    запоминается для запроса (`search_redirects`), и следующие такие же поиски идут сразу по нему.
     """
-    Извлекает из состояния карточки товара (tile) имя, цену, рейтинг, отзывы и URL.
-
-    Parameters
-    ----------
-    product : dict[str, Any]
-        Объект товара из списка `mainState`.
-
-    Returns
-    -------
-    dict[str, Any]
-        Объект с полями `url`, `name`, `price`, `rating`, `reviews`.
-    """
-    product_url = 'https://www.ozon.ru' + product.get('action', dict()).get('link')
-    result = dict()
-    for state in product.get('mainState', list()):
-        for key, value in state.items():
-            if key == 'labelList':
-                for item in value.get('items', list()):
-                    item_name = item.get('testInfo', dict()).get('automatizationId')
-                    result[item_name] = item.get('title')
-            elif key == 'textAtom':
-                item_name = value.get('testInfo', dict()).get('automatizationId')
-                result[item_name] = value.get('text')
-            elif key == 'priceV2':
-                for price in value.get('price', list()):
-                    item_name = price.get('textStyle')
-                    result[item_name] = price.get('text')
-    else:
-        return dict(
-            url=product_url,
-            name=str(result.get('tile-name')).strip(),
-            price=await format_str_to_int(result.get('PRICE'), int),
-            rating=await format_str_to_int(result.get('tile-list-rating'), float),
-            reviews=await format_str_to_int(result.get('tile-list-comments'), int),
-        )
+    query = urlencode(params)
+    path = get_search_redirect(query) or f'/search/?{query}'
+    payload = await parse_search_json(session, with_page(path, page))
+    redirect_url, result = await parse_executor.run(parse_search_payload, payload, sorting_type, size=len(payload))
+    if redirect_url:
+        path = save_search_redirect(query, redirect_url)
+        payload = await parse_search_json(session, with_page(path, page))
+        _, result = await parse_executor.run(parse_search_payload, payload, sorting_type, size=len(payload))
+    return result
 
 
-async def format_str_to_int(
-        value: str,
-        format_type: Callable,
-        default_value: str = 'Нет'
-) -> float | int | None | str:
+def get_search_redirect(
+        query: str
+) -> Optional[str]:
     """
-    Приводит строку к числу (int/float), очищая от лишних символов.
+    Возвращает запомненный адрес выдачи для поискового запроса, если он не устарел.
+    """
+    if cached := search_redirects.get(query):
+        saved_time, path = cached
+        if time.monotonic() - saved_time <= settings.OZON_SEARCH_REDIRECT_TTL:
+            return path
+        search_redirects.pop(query, None)
+    return None
+
+
+def with_page(
+        path: str,
+        page: int
+) -> str:
+    """
+    Добавляет к адресу выдачи номер страницы (`page`); для первой страницы адрес не меняется.
+    """
+    if page <= 1:
+        return path
+    parts = urlsplit(path)
+    query = [(key, value) for key, value in parse_qsl(parts.query) if key != 'page']
+    return f'{parts.path}?{urlencode(query + [("page", str(page))])}'
 
-    Parameters
-    ----------
-    value : str
-        Исходное строковое значение (например, "1 990 ₽" или "4.7").
-    format_type : Callable
-        Тип для преобразования: `int` или `float`.
-    default_value : str
-        Значение по умолчанию, если `value` пусто.
 
-    Returns
-    -------
-    float | int | None | str
-        Преобразованное значение или `default_value`.
+def save_search_redirect(
+        query: str,
+        redirect_url: str
+) -> str:
     """
-    if value:
-        if format_type is int:
-            value = ''.join(char for char in str(value) if char.isdigit())
-        else:
-            value = ''.join(char for char in str(value) if char.isdigit() or char == '.')
-
-        return format_type(value)
-    else:
-        return default_value
+    Запоминает адрес выдачи после редиректа (в относительном виде) и возвращает его.
+    """
+    parts = urlsplit(redirect_url)
+    path = f'{parts.path}?{parts.query}' if parts.query else parts.path
+    if len(search_redirects) >= settings.OZON_SEARCH_REDIRECT_MAX:
+        search_redirects.pop(next(iter(search_redirects)))
+    search_redirects[query] = (time.monotonic(), path)
+    return path
 
 
-async def get_product_top_data(
+async def get_page_data(
         session: aiohttp.ClientSession,
-        products: dict[str, Any],
-) -> tuple | tuple[None, str | None, str | Any, dict[Any, Any]]:
+        params: dict[str, str],
+        page: int = 1,
+) -> str:
     """
-    Извлекает данные топ-товара: главное изображение, имя, описание, характеристики.
+    Загружает HTML выдачи поиска Ozon, выполняя редирект `location.replace(...)`.
 
     Parameters
     ----------
     session : aiohttp.ClientSession
         Активная HTTP-сессия.
-    products : dict[str, Any]
-        Данные результатов поиска, содержащие `product_top`.
+    params : dict[str, str]
+        Параметры поиска (например, text, sorting).
+    page : int
+        Номер страницы выдачи.
 
     Returns
     -------
-    tuple
-        `(product_name, product_image, description, characteristics)`.
-    """
-    product_name = None
-    product_image = None
-    description = str()
-    characteristics = dict()
-    for product in products.get('product_top', list()):
-        product_image = await get_main_image(product)
-        product_data_ = await get_product_rating(product)
-        product_name = product_data_.get('name')
-        details = await parse_details(session, product.get('sku'))
-        for name, value in json.loads(details).get('widgetStates', dict()).items():
-            if name.startswith('webCharacteristics-') and value != '{}':
-                characteristics.update(await get_characteristics(json.loads(value)))
-            if name.startswith('webDescription-') and value != '{}':
-                if 'richAnnotationType' in (rich := json.loads(value)):
-                    if rich.get('richAnnotationType') == 'HTML':
-                        if rich_text := rich.get('richAnnotation'):
-                            description += rich_text + '\n'
-                    else:
-                        for row in rich.get('richAnnotationJson', dict()).get('content', list()):
-                            for block in row.get('blocks', list()):
-                                for text in block.get('text', dict()).get('content', list()):
-                                    description += text + '\n'
-                if 'characteristics' in (rich := json.loads(value)):
-                    for row in rich.get('characteristics', list()):
-                        key, value = row.get('title'), row.get('content')
-                        description += f'{key}: {value}\n'
-        else:
-            description = description if description.strip() else 'Описание не найдено'
-            description = re.sub(pattern=r'</?[a-z/]+>', repl='', string=description)
+    str
+        HTML выдачи для `extractors.parse_search_page`.
 
-    return (
-        product_name, product_image, description, characteristics
-    )
+    Notes
+    -----
+    Адрес редиректа `location.replace(...)` запоминается для запроса (`search_redirects`),
+    поэтому повторный такой же поиск обходится одним запросом.
+    """
+    query = urlencode(params)
+    if path := get_search_redirect(query):
+        page_data = await parse_search(session, None, f'https://www.ozon.ru{with_page(path, page)}')
+    else:
+        page_data = await parse_search(session, params | {'page': str(page)} if page > 1 else params)
+        if search_match := re.search(pattern=r'location\.replace\(\"(.*?)\"\)', string=page_data):
+            search_url = json.loads(f'"{search_match.group(1)}"')
+            path = save_search_redirect(query, search_url)
+            page_data = await parse_search(session, None, f'https://www.ozon.ru{with_page(path, page)}')
+    return page_data
 
 
-async def get_characteristics(
-        data: dict[str, Any]
-) -> dict:
+async def format_products(
+        session: aiohttp.ClientSession,
+        products: SearchResult,
+        top_n: Optional[int] = None,
+) -> SearchResult:
     """
-    Преобразует блок характеристик виджета в словарь: название -> список значений.
+    Дополняет результат поиска деталями первых товаров выдачи.
 
     Parameters
     ----------
-    data : dict[str, Any]
-        JSON-объект виджета характеристик.
+    session : aiohttp.ClientSession
+        Активная HTTP-сессия.
+    products : SearchResult
+        Результат `get_products` (карточки и цены).
+    top_n : Optional[int]
+        Количество первых товаров, дополняемых деталями (по умолчанию `settings.OZON_TOP_N`).
 
     Returns
     -------
-    dict
-        Словарь с названием характеристики и списком значений.
-    """
-    result = defaultdict(list)
-    for part_data in data.get('characteristics', list()):
-        for _, characteristics in part_data.items():
-            if isinstance(characteristics, list):
-                for characteristic in characteristics:
-                    if characteristic_name := characteristic.get('name'):
-                        for value in characteristic.get('values', list()):
-                            if characteristic_values := value.get('text'):
-                                result[characteristic_name].append(characteristic_values)
-    else:
-        return result
+    SearchResult
+        Тот же результат со статистикой цен по всем карточкам (`stats`) и заполненным `top`
+        (детали товаров, полученные без ошибок).
+    """
+    if products.tiles:
+        columns = products.columns if products.columns is not None else TileColumns.from_tiles(products.tiles)
+        products.stats = compute_stats(columns)
+        products.top = await get_product_top_data(session, products.tiles[:top_n or settings.OZON_TOP_N])
+    return products
 
 
-async def get_main_image(
-        product: dict[str, Any]
-) -> Optional[str]:
+async def get_product_top_data(
+        session: aiohttp.ClientSession,
+        tiles: list[Tile],
+        concurrency: Optional[int] = None,
+) -> list[ProductDetails]:
     """
-    Возвращает ссылку на главное изображение товара, если доступно.
+    Параллельно загружает детали товаров (не более `concurrency` запросов одновременно),
+    поэтому общее время близко к одному запросу `parse_details`.
 
     Parameters
     ----------
-    product : dict[str, Any]
-        Объект товара из списка `product_top`.
+    session : aiohttp.ClientSession
+        Активная HTTP-сессия.
+    tiles : list[Tile]
+        Карточки товаров, для которых нужны детали.
+    concurrency : Optional[int]
+        Ограничение параллельных запросов (по умолчанию `settings.OZON_DETAILS_CONCURRENCY`).
 
     Returns
     -------
-    Optional[str]
-        URL изображения или None, если не найдено.
+    list[ProductDetails]
+        Детали товаров в порядке выдачи; товары без SKU (детали запрашиваются по SKU)
+        и товары, по которым запрос завершился ошибкой, пропускаются.
+
+    Raises
+    ------
+    Exception
+        Ошибка первого товара, если не удалось получить детали ни одного товара.
     """
-    for item in product.get('tileImage', dict()).get('items', list()):
-        return item.get('image', dict()).get('link')
-    else:
-        return None
+    semaphore = asyncio.Semaphore(concurrency or settings.OZON_DETAILS_CONCURRENCY)
+    results = await asyncio.gather(
+        *(get_product_details(session, tile, semaphore) for tile in tiles if tile.sku is not None),
+        return_exceptions=True
+    )
+    details = [result for result in results if not isinstance(result, BaseException)]
+    if results and not details:
+        raise results[0]
+    return details
 
 
-async def get_currency_prices(
-        products: dict[str, Any],
-) -> dict[str, Any]:
+async def get_product_details(
+        session: aiohttp.ClientSession,
+        tile: Tile,
+        semaphore: asyncio.Semaphore,
+) -> ProductDetails:
     """
-    Извлекает из фильтров минимальную/максимальную цену и считает среднюю.
+    Извлекает данные одного товара: главное изображение, имя, описание, характеристики.
 
     Parameters
     ----------
-    products : dict[str, Any]
-        Данные результатов поиска, содержащие `filters`.
+    session : aiohttp.ClientSession
+        Активная HTTP-сессия.
+    tile : Tile
+        Карточка товара из выдачи.
+    semaphore : asyncio.Semaphore
+        Семафор, ограничивающий число одновременных запросов `parse_details`.
+        Одновременные запросы одного SKU объединяются (`details_flight`).
 
     Returns
     -------
-    dict[str, Any]
-        `{"min_price": float, "max_price": float, "avg_price": float}`.
-    """
-    result = dict()
-    for section in products.get('filters', dict()).get('sections', list()):
-        for filter_ in section.get('filters', list()):
-            if filter_.get('key') == 'currency_price':
-                filter_data = filter_.get('multipleRangesFilter', dict()).get('rangeFilter', dict())
-                result['min_price'] = float(filter_data.get('minValue', '0'))
-                result['max_price'] = float(filter_data.get('maxValue', '0'))
-                result['avg_price'] = round((result['min_price'] + result['max_price']) / 2, 2)
-    else:
-        return result
+    ProductDetails
+        Детали товара (`url`, `sku`, `name`, `image`, `description`, `characteristics`),
+        разобранные `extractors.parse_product_details` через `parse_executor`.
+    """
+    async with semaphore:
+        details = await details_flight.do(
+            tile.sku,
+            lambda: parse_details(session, tile.sku)
+        )
+    return await parse_executor.run(parse_product_details, details, tile, size=len(details))
 
 
 async def get_headers() -> dict[str, str]:
@@ -452,6 +569,7 @@ async def get_headers() -> dict[str, str]:
     Notes
     -----
     Содержит реальные cookie — при необходимости замените на актуальные или вынесите в конфиг.
+    Используются как запасной вариант: если пул `ozon_cookies` пуст, запросы уходят с этими cookie.
     """
     return {
         "accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7",
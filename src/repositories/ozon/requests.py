@@ -1,14 +1,48 @@
+import codecs
 import aiohttp
 
-from src.utils import retry_decorators, log_decorators
+from typing import Mapping, Optional
 
+from src.config import settings
+from src.utils import retry_decorators, log_decorators, rate_limiter, circuit_breaker
+from src.utils.http_client import HttpClient
+from src.utils.disk_cache import DiskCache
+from src.repositories.ozon.cookies import CookiePool
+from src.repositories.ozon.page_states import StateStreamScanner
 
+
+ozon_client = HttpClient(warmup_url='https://www.ozon.ru/', cookie_jar=aiohttp.DummyCookieJar)
+ozon_limiter = rate_limiter.get_limiter('www.ozon.ru')
+ozon_retry_policy = retry_decorators.RetryPolicy(
+    attempts=settings.RETRY_ATTEMPTS,
+    base_delay=settings.RETRY_BASE_DELAY,
+    max_delay=settings.RETRY_MAX_DELAY,
+    budget=settings.RETRY_BUDGET
+)
+ozon_cookies = CookiePool(
+    path=settings.OZON_COOKIES_FILE,
+    quarantine_time=settings.OZON_COOKIES_QUARANTINE,
+    max_throttled=settings.OZON_COOKIES_MAX_THROTTLED
+)
+ozon_disk_cache = DiskCache(
+    directory=settings.DISK_CACHE_DIR,
+    max_bytes=settings.DISK_CACHE_MAX_BYTES
+)
+
+
+@ozon_disk_cache.cached('details', ttl=settings.DISK_CACHE_TTL_DETAILS, enabled=settings.DISK_CACHE_ENABLED)
 @log_decorators.save_request_info
-@retry_decorators.retry_request(default_value='{}', raise_error=True, attempts=3, delay=5)
+@retry_decorators.retry_request(
+    default_value='{}',
+    raise_error=True,
+    policy=ozon_retry_policy,
+    limiter=ozon_limiter,
+    breaker=circuit_breaker.get_breaker('details')
+)
 async def parse_details(
         session: aiohttp.ClientSession,
         sku: str
-) -> tuple[str, int, str]:
+) -> tuple[str, int, str, Mapping[str, str]]:
     """
     Запрашивает подробную карточку товара (детали, описание, характеристики).
 
@@ -21,29 +55,44 @@ async def parse_details(
 
     Returns
     -------
-    tuple[str, int, str]
-        Кортеж: (итоговый URL, HTTP-статус, тело ответа).
+    tuple[str, int, str, Mapping[str, str]]
+        Кортеж: (итоговый URL, HTTP-статус, тело ответа, заголовки ответа).
 
     Notes
     -----
     - Декорировано логированием и ретраями. В случае ошибок повторит запрос.
+    - Каждая попытка проходит через общий лимитер `ozon_limiter`.
+    - Суммарное время всех попыток ограничено `ozon_retry_policy.budget`.
+    - Защищено предохранителем `details`: при его срабатывании запрос отклоняется сразу.
+    - Cookie для каждой попытки берется из пула `ozon_cookies`, статус ответа учитывается в его статистике.
+    - Успешные ответы сохраняются в дисковый кэш `ozon_disk_cache` (`DISK_CACHE_TTL_DETAILS`).
     """
+    identity = ozon_cookies.acquire()
     async with session.get(
             url=(
                     f'https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2?url='
                     f'/product/{sku}/?layout_container=pdpPage2column&layout_page_index=2'
             ),
+            headers=identity.headers if identity else None,
             timeout=aiohttp.ClientTimeout(25)
     ) as response:
-        return str(response.url), response.status, await response.text()
+        ozon_cookies.report(identity, response.status, response.cookies)
+        return str(response.url), response.status, await response.text(), response.headers
 
 
 @log_decorators.save_request_info
-@retry_decorators.retry_request(default_value='', raise_error=True, attempts=3, delay=5)
+@retry_decorators.retry_request(
+    default_value='',
+    raise_error=True,
+    policy=ozon_retry_policy,
+    limiter=ozon_limiter,
+    breaker=circuit_breaker.get_breaker('search')
+)
 async def parse_search(
         session: aiohttp.ClientSession,
-        params: dict
-) -> tuple[str, int, str]:
+        params: Optional[dict],
+        url: str = 'https://www.ozon.ru/search/'
+) -> tuple[str, int, str, Mapping[str, str]]:
     """
     Выполняет запрос страницы поиска Ozon с заданными параметрами.
 
@@ -51,28 +100,119 @@ async def parse_search(
     ----------
     session : aiohttp.ClientSession
         Активная HTTP-сессия.
-    params : dict
+    params : Optional[dict]
         Параметры запроса (например, text, sorting и т.д.).
+    url : str
+        Адрес страницы выдачи (по умолчанию — поиск; для редиректа — целевой URL).
 
     Returns
     -------
-    tuple[str, int, str]
-        Кортеж: (итоговый URL, HTTP-статус, тело ответа).
+    tuple[str, int, str, Mapping[str, str]]
+        Кортеж: (итоговый URL, HTTP-статус, тело ответа, заголовки ответа).
+
+    Notes
+    -----
+    При `settings.OZON_STREAM_SEARCH` успешный ответ читается потоково (`read_page_states`),
+    и вместо всей страницы возвращается компактный HTML с нужными блоками.
     """
+    identity = ozon_cookies.acquire()
     async with session.get(
-            url=f'https://www.ozon.ru/search/',
+            url=url,
             params=params,
+            headers=identity.headers if identity else None,
+            timeout=aiohttp.ClientTimeout(total=25)
+    ) as response:
+        ozon_cookies.report(identity, response.status, response.cookies)
+        if settings.OZON_STREAM_SEARCH and response.status == 200:
+            text = await read_page_states(response)
+        else:
+            text = await response.text()
+        return str(response.url), response.status, text, response.headers
+
+
+@log_decorators.save_request_info
+@retry_decorators.retry_request(
+    default_value='{}',
+    raise_error=True,
+    policy=ozon_retry_policy,
+    limiter=ozon_limiter,
+    breaker=circuit_breaker.get_breaker('search')
+)
+async def parse_search_json(
+        session: aiohttp.ClientSession,
+        path: str
+) -> tuple[str, int, str, Mapping[str, str]]:
+    """
+    Запрашивает выдачу поиска через entrypoint JSON API (без загрузки HTML-страницы).
+
+    Parameters
+    ----------
+    session : aiohttp.ClientSession
+        Активная HTTP-сессия.
+    path : str
+        Относительный адрес выдачи, например `/search/?text=...&sorting=price`.
+
+    Returns
+    -------
+    tuple[str, int, str, Mapping[str, str]]
+        Кортеж: (итоговый URL, HTTP-статус, тело ответа, заголовки ответа).
+    """
+    identity = ozon_cookies.acquire()
+    async with session.get(
+            url='https://www.ozon.ru/api/entrypoint-api.bx/page/json/v2',
+            params={'url': path},
+            headers=identity.headers if identity else None,
             timeout=aiohttp.ClientTimeout(total=25)
     ) as response:
-        return str(response.url), response.status, await response.text()
+        ozon_cookies.report(identity, response.status, response.cookies)
+        return str(response.url), response.status, await response.text(), response.headers
+
+
+async def read_page_states(
+        response: aiohttp.ClientResponse
+) -> str:
+    """
+    Читает HTML выдачи частями и прекращает чтение, как только найдены блоки
+    `state-tileGridDesktop-*`, `state-filtersDesktop-*` или редирект `location.replace(...)`.
+
+    Parameters
+    ----------
+    response : aiohttp.ClientResponse
+        Ответ со страницей выдачи.
+
+    Returns
+    -------
+    str
+        Компактный HTML с найденными блоками (`StateStreamScanner.to_html`).
+
+    Notes
+    -----
+    Если тело прочитано не полностью, aiohttp закрывает соединение вместо возврата в пул:
+    это дешевле, чем докачивать оставшиеся сотни килобайт страницы.
+    """
+    scanner = StateStreamScanner()
+    decoder = codecs.getincrementaldecoder(response.charset or 'utf-8')(errors='replace')
+    async for chunk in response.content.iter_chunked(settings.OZON_STREAM_CHUNK_SIZE):
+        if scanner.feed(decoder.decode(chunk)):
+            break
+    else:
+        scanner.feed(decoder.decode(b'', final=True))
+    return scanner.to_html()
 
 
+@ozon_disk_cache.cached('product', ttl=settings.DISK_CACHE_TTL_PRODUCT, enabled=settings.DISK_CACHE_ENABLED)
 @log_decorators.save_request_info
-@retry_decorators.retry_request(default_value='{}', raise_error=True, attempts=3, delay=5)
+@retry_decorators.retry_request(
+    default_value='{}',
+    raise_error=True,
+    policy=ozon_retry_policy,
+    limiter=ozon_limiter,
+    breaker=circuit_breaker.get_breaker('product')
+)
 async def parse_product(
         session: aiohttp.ClientSession,
         url: str
-) -> tuple[str, int, str]:
+) -> tuple[str, int, str, Mapping[str, str]]:
     """
     Выполняет GET-запрос по произвольному URL товара/страницы.
 
@@ -85,11 +225,14 @@ async def parse_product(
 
     Returns
     -------
-    tuple[str, int, str]
-        Кортеж: (итоговый URL, HTTP-статус, тело ответа).
+    tuple[str, int, str, Mapping[str, str]]
+        Кортеж: (итоговый URL, HTTP-статус, тело ответа, заголовки ответа).
     """
+    identity = ozon_cookies.acquire()
     async with session.get(
             url=url,
+            headers=identity.headers if identity else None,
             timeout=aiohttp.ClientTimeout(total=25)
     ) as response:
-        return str(response.url), response.status, await response.text()
+        ozon_cookies.report(identity, response.status, response.cookies)
+        return str(response.url), response.status, await response.text(), response.headers
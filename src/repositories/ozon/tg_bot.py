@@ -5,6 +5,8 @@ import sys
 from aiogram import Dispatcher
 
 from tg_handlers import bot, router
+from src.repositories.ozon.requests import ozon_client
+from src.repositories.ozon.parser_products import get_headers, parse_executor
 
 
 async def main() -> None:
@@ -14,14 +16,20 @@ async def main() -> None:
     Notes
     -----
     - Использует `router` из `tg_handlers.py`.
-    - Корректно закрывает сессию бота в блоке `finally`.
+    - Создает и прогревает общий пул HTTP-соединений к Ozon и пул разбора ответов.
+    - Корректно закрывает сессию бота и пул соединений в блоке `finally`.
     """
     dp = Dispatcher()
     dp.include_routers(router)
+    await ozon_client.start(await get_headers())
+    await ozon_client.warm_up()
+    await parse_executor.start()
     try:
         await dp.start_polling(bot)
     finally:
         await bot.session.close()
+        await ozon_client.close()
+        await parse_executor.close()
 
 
 if __name__ == "__main__":
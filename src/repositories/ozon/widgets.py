@@ -0,0 +1,100 @@
+from typing import Any, Optional
+
+from src.utils import fast_json
+
+
+WIDGET_PREFIXES = (
+    'breadCrumbs-',
+    'webStickyProducts-',
+    'webCharacteristics-',
+    'webDescription-',
+    'tileGridDesktop-',
+    'filtersDesktop-',
+)
+
+
+class WidgetStates:
+    """
+    Ленивый доступ к `widgetStates` ответа entrypoint API.
+
+    Notes
+    -----
+    - Внешний документ декодируется один раз (`fast_json`), значения виджетов остаются
+      строками; сохраняются только виджеты зарегистрированных префиксов (`WIDGET_PREFIXES`).
+    - Виджет декодируется при первом обращении и запоминается, поэтому повторные
+      обращения к одному префиксу не декодируют JSON заново.
+    - Пустые виджеты (`'{}'`) пропускаются.
+    """
+    __slots__ = ('redirect_url', '_raw', '_decoded')
+
+    def __init__(
+            self,
+            widgets: dict[str, str],
+            redirect_url: Optional[str] = None,
+            prefixes: tuple[str, ...] = WIDGET_PREFIXES
+    ) -> None:
+        self.redirect_url = redirect_url
+        self._raw: dict[str, list[str]] = {prefix: list() for prefix in prefixes}
+        self._decoded: dict[str, list[Any]] = dict()
+        for name, value in widgets.items():
+            if value == '{}':
+                continue
+            for prefix in prefixes:
+                if name.startswith(prefix):
+                    self._raw[prefix].append(value)
+                    break
+
+    @classmethod
+    def from_payload(
+            cls,
+            payload: str | bytes,
+            prefixes: tuple[str, ...] = WIDGET_PREFIXES
+    ) -> 'WidgetStates':
+        """
+        Создает объект из тела ответа entrypoint API.
+
+        Parameters
+        ----------
+        payload : str | bytes
+            JSON-ответ `/api/entrypoint-api.bx/page/json/v2`.
+        prefixes : tuple[str, ...]
+            Префиксы виджетов, которые нужно сохранить.
+
+        Returns
+        -------
+        WidgetStates
+            Виджеты ответа и адрес редиректа (`redirectUrl`), если он есть.
+        """
+        document = fast_json.loads(payload)
+        return cls(document.get('widgetStates') or dict(), document.get('redirectUrl'), prefixes)
+
+    def raw(
+            self,
+            prefix: str
+    ) -> Optional[str]:
+        """
+        Возвращает недекодированное значение первого виджета с префиксом `prefix`.
+        """
+        values = self._raw.get(prefix)
+        return values[0] if values else None
+
+    def get_all(
+            self,
+            prefix: str
+    ) -> list[Any]:
+        """
+        Возвращает декодированные значения всех виджетов с префиксом `prefix`.
+        """
+        if prefix not in self._decoded:
+            self._decoded[prefix] = [fast_json.loads(value) for value in self._raw.get(prefix, list())]
+        return self._decoded[prefix]
+
+    def get(
+            self,
+            prefix: str
+    ) -> Optional[Any]:
+        """
+        Возвращает декодированное значение первого виджета с префиксом `prefix`.
+        """
+        values = self.get_all(prefix)
+        return values[0] if values else None
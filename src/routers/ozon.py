@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Query
 from fastapi.responses import JSONResponse
 
+from src.database import pool_metrics
 from src.schemas import universal as scm_universal
-from src.repositories.ozon import parser_products
+from src.repositories.ozon import database, parser_products
+from src.repositories.ozon.requests import ozon_cookies, ozon_disk_cache
+from src.utils import rate_limiter, circuit_breaker
 
 
 router = APIRouter(
@@ -14,7 +17,10 @@ router = APIRouter(
 @router.get(path="/items/search")
 async def get_items_search(
         product_url: str = Query(description="Ссылка на товар Озон", regex=r"https://ozon.by/product/.+"),
-        sorting_type: str | None = Query(default="score", description="Тип сортировки товаров")
+        sorting_type: str | None = Query(default="score", description="Тип сортировки товаров"),
+        top_n: int | None = Query(default=None, ge=1, le=10, description="Количество товаров с описанием и характеристиками"),
+        pages: int | None = Query(default=None, ge=1, le=10, description="Количество страниц выдачи"),
+        max_items: int | None = Query(default=None, ge=1, le=1000, description="Максимум товаров выдачи")
 ) -> JSONResponse:
     """
     Выполняет поиск и агрегацию данных по товару Ozon.
@@ -25,6 +31,12 @@ async def get_items_search(
         Ссылка на карточку товара в домене `ozon.by`.
     sorting_type : str | None
         Тип сортировки выдачи: `score` (по умолчанию), `new`, `price`, `rating`.
+    top_n : int | None
+        Сколько первых товаров выдачи дополнять деталями (по умолчанию `settings.OZON_TOP_N`).
+    pages : int | None
+        Сколько страниц выдачи читать (по умолчанию `settings.OZON_SEARCH_PAGES`).
+    max_items : int | None
+        Максимум товаров выдачи; чтение страниц прекращается, когда он набран.
 
     Returns
     -------
@@ -40,7 +52,9 @@ async def get_items_search(
         'error': False, 'message': None, 'results': None
     })
     try:
-        response.results = await parser_products.get_product_data_depr(product_url, sorting_type)
+        response.results = await database.get_product_data_depr(
+            product_url, sorting_type, top_n, pages, max_items
+        )
     except Exception as cpm_exception:
         response.error = True
         response.message = repr(cpm_exception)
@@ -49,3 +63,38 @@ async def get_items_search(
             status_code=200,
             content=response.model_dump()
         )
+
+
+@router.get(path="/upstream/status")
+async def get_upstream_status() -> JSONResponse:
+    """
+    Возвращает текущее состояние защитных механизмов при обращении к Ozon.
+
+    Returns
+    -------
+    JSONResponse
+        Объект ответа, где `results.limiters` — состояние лимитеров по хостам
+        (текущая скорость, токены, длина очереди, количество 429), `results.breakers` —
+        состояние предохранителей эндпоинтов (`closed` / `open` / `half_open`), `results.cookies` —
+        состояние пула cookie (без самих значений cookie), `results.disk_cache` — счетчики
+        дискового кэша сырых ответов, `results.result_cache` — счетчики кэша результатов в памяти
+        (попадания, промахи, истекшие, вытесненные, размер), `results.db_pool` — пул соединений
+        с БД (занятые соединения, время получения соединения p50/p99/max, таймауты),
+        `results.parse_executor` — режим и счетчики разбора ответов.
+    """
+    response = scm_universal.ResultResponse(**{
+        'error': False, 'message': None, 'results': None
+    })
+    response.results = dict(
+        limiters={host: limiter.stats() for host, limiter in rate_limiter.limiters.items()},
+        breakers={name: breaker.stats() for name, breaker in circuit_breaker.breakers.items()},
+        cookies=ozon_cookies.stats(),
+        disk_cache=ozon_disk_cache.stats(),
+        result_cache=database.result_cache.stats(),
+        db_pool=pool_metrics.stats(),
+        parse_executor=parser_products.parse_executor.stats()
+    )
+    return JSONResponse(
+        status_code=200,
+        content=response.model_dump()
+    )
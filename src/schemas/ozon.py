@@ -0,0 +1,221 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Optional
+
+if TYPE_CHECKING:
+    from src.repositories.ozon.aggregation import TileColumns
+
+
+MISSING_VALUE = 'Нет' # Значение в ответе API для отсутствующих цены/рейтинга/отзывов
+
+
+def parse_number(
+        value: Optional[str],
+        format_type: Callable
+) -> Optional[int | float]:
+    """
+    Приводит строку к числу (int/float), очищая от лишних символов.
+
+    Parameters
+    ----------
+    value : Optional[str]
+        Исходное строковое значение (например, "1 990 ₽" или "4.7").
+    format_type : Callable
+        Тип для преобразования: `int` или `float`.
+
+    Returns
+    -------
+    Optional[int | float]
+        Преобразованное значение или None, если числа в строке нет.
+    """
+    if not value:
+        return None
+    if format_type is int:
+        value = ''.join(char for char in str(value) if char.isdigit())
+    else:
+        value = ''.join(char for char in str(value) if char.isdigit() or char == '.')
+    try:
+        return format_type(value)
+    except ValueError:
+        return None
+
+
+def to_response_value(value: Any) -> Any:
+    return MISSING_VALUE if value is None else value
+
+
+@dataclass(slots=True)
+class Tile:
+    """
+    Карточка товара из выдачи (сокращенное состояние виджета `tileGridDesktop`).
+
+    Notes
+    -----
+    Создается пакетно из состояния сетки товаров (`aggregation.tiles_from_states`).
+    """
+    sku: Optional[int]
+    url: str
+    name: Optional[str]
+    price: Optional[int]
+    rating: Optional[float]
+    reviews: Optional[int]
+    image: Optional[str] = None
+
+    def to_response(self) -> dict[str, Any]:
+        return dict(
+            url=self.url,
+            name=self.name,
+            price=to_response_value(self.price),
+            rating=to_response_value(self.rating),
+            reviews=to_response_value(self.reviews),
+        )
+
+
+@dataclass(slots=True)
+class PriceSummary:
+    """
+    Сводные цены выдачи.
+    """
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    avg_price: Optional[float] = None
+
+    @classmethod
+    def from_filters(
+            cls,
+            filters: dict[str, Any]
+    ) -> 'PriceSummary':
+        """
+        Извлекает из фильтров минимальную/максимальную цену и считает среднюю.
+
+        Parameters
+        ----------
+        filters : dict[str, Any]
+            Декодированное состояние виджета `filtersDesktop`.
+
+        Returns
+        -------
+        PriceSummary
+            Сводные цены (пустые, если фильтр `currency_price` не найден).
+        """
+        result = cls()
+        for section in filters.get('sections', list()):
+            for filter_ in section.get('filters', list()):
+                if filter_.get('key') == 'currency_price':
+                    filter_data = filter_.get('multipleRangesFilter', dict()).get('rangeFilter', dict())
+                    result.min_price = float(filter_data.get('minValue', '0'))
+                    result.max_price = float(filter_data.get('maxValue', '0'))
+                    result.avg_price = round((result.min_price + result.max_price) / 2, 2)
+        return result
+
+    def to_response(self) -> dict[str, float]:
+        return {
+            name: getattr(self, name)
+            for name in ('min_price', 'max_price', 'avg_price')
+            if getattr(self, name) is not None
+        }
+
+
+@dataclass(slots=True)
+class PriceStats:
+    """
+    Статистика цен по карточкам выдачи (`aggregation.compute_stats`).
+    """
+    count: int
+    min_price: float
+    max_price: float
+    median_price: float
+    percentiles: dict[str, float]
+    trimmed_mean_price: float
+    rating_weighted_price: Optional[float]
+    avg_rating: Optional[float]
+    total_reviews: int
+
+    def to_response(self) -> dict[str, Any]:
+        return dict(
+            count=self.count,
+            min_price=self.min_price,
+            max_price=self.max_price,
+            median_price=self.median_price,
+            **self.percentiles,
+            trimmed_mean_price=self.trimmed_mean_price,
+            rating_weighted_price=self.rating_weighted_price,
+            avg_rating=self.avg_rating,
+            total_reviews=self.total_reviews,
+        )
+
+
+@dataclass(slots=True)
+class ProductDetails:
+    """
+    Детали товара из карточки (`parse_details`): описание и характеристики.
+    """
+    sku: Optional[int]
+    url: Optional[str]
+    name: Optional[str]
+    image: Optional[str]
+    description: Optional[str]
+    characteristics: dict[str, list[str]] = field(default_factory=dict)
+
+    def to_response(self) -> dict[str, Any]:
+        return dict(
+            url=self.url,
+            sku=self.sku,
+            name=self.name,
+            image=self.image,
+            description=self.description,
+            characteristics=self.characteristics,
+        )
+
+
+@dataclass(slots=True)
+class SearchResult:
+    """
+    Агрегированный результат поиска: карточки выдачи, сводные цены (диапазон фильтра `prices`
+    и статистика по карточкам `stats`) и детали первых товаров.
+
+    Notes
+    -----
+    - Один объект сериализуется и в ответ API (`to_response`), и в документ кэша БД (`to_document`).
+    - `columns` — числовые колонки `tiles` из разбора выдачи (`aggregation.tiles_from_states`),
+      по ним считается `stats`; в ответ и документ не попадают.
+    """
+    sorting_type: str
+    tiles: list[Tile] = field(default_factory=list)
+    prices: PriceSummary = field(default_factory=PriceSummary)
+    top: list[ProductDetails] = field(default_factory=list)
+    stats: Optional[PriceStats] = None
+    message: Optional[str] = None
+    stale: bool = False
+    columns: Optional['TileColumns'] = field(default=None, repr=False, compare=False)
+
+    def to_response(self) -> dict[str, Any]:
+        """
+        Возвращает результат в формате `results` ответа `/n8n/ozon/items/search`.
+        """
+        product_top = self.top[0] if self.top else None
+        return dict(
+            sorting_type=self.sorting_type,
+            message=self.message,
+            stale=self.stale,
+            products_data=[tile.to_response() for tile in self.tiles],
+            currency_prices=self.prices.to_response(),
+            price_stats=self.stats.to_response() if self.stats else None,
+            product_name=product_top.name if product_top else None,
+            product_image=product_top.image if product_top else None,
+            description=product_top.description if product_top else None,
+            characteristics=product_top.characteristics if product_top else None,
+            products_top=[details.to_response() for details in self.top],
+        )
+
+    def to_document(self) -> dict[str, Any]:
+        """
+        Возвращает документ для колонки `ozon_search_match.result` (JSONB).
+
+        Notes
+        -----
+        Документ совпадает с `to_response` без пометок источника `message` и `stale`, поэтому
+        попадание в кэш БД отдает его в ответ без восстановления модели.
+        """
+        document = self.to_response()
+        del document["message"], document["stale"]
+        return document
@@ -0,0 +1,147 @@
+import time
+
+from typing import Any
+
+from src.config import settings
+
+
+class CircuitOpenError(Exception):
+    """
+    Исключение для запросов, отклоненных открытым предохранителем (без обращения к серверу).
+    """
+    pass
+
+
+class CircuitBreaker:
+    """
+    Предохранитель (circuit breaker) для одного внешнего эндпоинта.
+
+    Notes
+    -----
+    - `closed`: запросы проходят, подряд идущие ошибки считаются.
+    - `open`: после `failure_threshold` ошибок подряд запросы отклоняются сразу
+      (`CircuitOpenError`) в течение `reset_timeout` секунд.
+    - `half_open`: по истечении `reset_timeout` пропускается один пробный запрос;
+      успех закрывает предохранитель, ошибка снова открывает его, нейтральный ответ
+      (например, 429/404) освобождает пробу для следующего запроса.
+    - Ошибки запросов, начатых до открытия, на открытый предохранитель не влияют.
+    """
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(
+            self,
+            name: str,
+            failure_threshold: int,
+            reset_timeout: float
+    ) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_total = 0
+        self.rejected_total = 0
+        self._opened_at = 0.0
+        self._probe_at = 0.0
+
+    @property
+    def is_open(self) -> bool:
+        """
+        True, если предохранитель открыт и пробный запрос еще не положен (без изменения состояния).
+        """
+        return self.state == self.OPEN and time.monotonic() - self._opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """
+        Решает, можно ли выполнить запрос сейчас.
+
+        Returns
+        -------
+        bool
+            True — запрос можно выполнять (в `half_open` это пробный запрос), иначе False.
+        """
+        now = time.monotonic()
+        if self.state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._probe_at = 0.0
+        if self.state == self.HALF_OPEN and now - self._probe_at >= self.reset_timeout:
+            self._probe_at = now
+            return True
+        if self.state == self.CLOSED:
+            return True
+        self.rejected_total += 1
+        return False
+
+    def record_success(self) -> None:
+        """
+        Фиксирует успешный ответ: сбрасывает счетчик ошибок и закрывает предохранитель.
+        """
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def record_neutral(self) -> None:
+        """
+        Фиксирует ответ, не говорящий о состоянии эндпоинта (например, 429/404):
+        в `half_open` освобождает пробу, чтобы следующий запрос мог ее выполнить.
+        """
+        if self.state == self.HALF_OPEN:
+            self._probe_at = 0.0
+
+    def record_failure(self) -> None:
+        """
+        Фиксирует ошибку; открывает предохранитель при достижении порога или неудачной пробе.
+        В `open` ошибки игнорируются, чтобы не отодвигать пробный запрос.
+        """
+        if self.state == self.OPEN:
+            return
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            self.opened_total += 1
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Возвращает состояние предохранителя для мониторинга.
+
+        Returns
+        -------
+        dict[str, Any]
+            `state`, `failures`, `opened_total`, `rejected_total`, `retry_in` (сек до пробного запроса).
+        """
+        retry_in = None
+        if self.state == self.OPEN:
+            retry_in = round(max(self.reset_timeout - (time.monotonic() - self._opened_at), 0), 3)
+        return dict(
+            state=self.state,
+            failures=self.failures,
+            opened_total=self.opened_total,
+            rejected_total=self.rejected_total,
+            retry_in=retry_in,
+        )
+
+
+breakers: dict[str, CircuitBreaker] = dict()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """
+    Возвращает общий для процесса предохранитель эндпоинта, создавая его с параметрами из `Settings`.
+
+    Parameters
+    ----------
+    name : str
+        Имя эндпоинта (например, `search`, `product`, `details`).
+
+    Returns
+    -------
+    CircuitBreaker
+        Предохранитель, разделяемый всеми запросами к этому эндпоинту.
+    """
+    if name not in breakers:
+        breakers[name] = CircuitBreaker(
+            name=name,
+            failure_threshold=settings.BREAKER_FAILURE_THRESHOLD,
+            reset_timeout=settings.BREAKER_RESET_TIMEOUT,
+        )
+    return breakers[name]
@@ -0,0 +1,237 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import struct
+import tempfile
+import time
+import zlib
+
+from functools import wraps
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: эвикция без межпроцессной блокировки
+    fcntl = None
+
+
+HEADER = struct.Struct('<4sd')
+MAGIC = b'ODC1'
+
+
+class DiskCache:
+    """
+    Локальный дисковый кэш сырых ответов, адресуемый по содержимому ключа.
+
+    Notes
+    -----
+    - Путь файла — sha256 от `(namespace, key)`; файл хранит время записи и сжатое zlib тело.
+    - TTL задается при чтении, поэтому у каждого эндпоинта (namespace) он свой.
+    - Запись атомарна (временный файл + `os.replace`): параллельные воркеры uvicorn
+      никогда не видят частично записанный файл.
+    - mtime файла — время последнего обращения; при превышении `max_bytes` удаляются
+      самые давно использованные файлы (LRU). Эвикцию одновременно выполняет только
+      один процесс (`flock` на `.lock`, где доступно).
+    - Дисковые операции выполняются в пуле потоков и не блокируют event loop.
+    """
+    def __init__(
+            self,
+            directory: Path,
+            max_bytes: int,
+            compress_level: int = 6
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        self.hits = 0
+        self.misses = 0
+        self._size: Optional[int] = None
+
+    def path(
+            self,
+            namespace: str,
+            key: str
+    ) -> Path:
+        digest = hashlib.sha256(f'{namespace}\0{key}'.encode()).hexdigest()
+        return self.directory / namespace / digest[:2] / digest
+
+    def get(
+            self,
+            namespace: str,
+            key: str,
+            ttl: float
+    ) -> Optional[str]:
+        """
+        Читает значение, если оно есть и не старше `ttl` секунд.
+
+        Parameters
+        ----------
+        namespace : str
+            Пространство имен (эндпоинт).
+        key : str
+            Ключ запроса.
+        ttl : float
+            Срок актуальности записи, сек.
+
+        Returns
+        -------
+        Optional[str]
+            Сохраненное значение или None.
+        """
+        path = self.path(namespace, key)
+        try:
+            with open(path, 'rb') as file:
+                magic, stored_at = HEADER.unpack(file.read(HEADER.size))
+                if magic != MAGIC or time.time() - stored_at > ttl:
+                    value = None
+                else:
+                    value = zlib.decompress(file.read()).decode()
+        except (OSError, struct.error, zlib.error):
+            value = None
+        if value is None:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return value
+
+    def set(
+            self,
+            namespace: str,
+            key: str,
+            value: str
+    ) -> None:
+        """
+        Атомарно записывает значение и при необходимости запускает эвикцию.
+
+        Parameters
+        ----------
+        namespace : str
+            Пространство имен (эндпоинт).
+        key : str
+            Ключ запроса.
+        value : str
+            Сохраняемое значение.
+        """
+        path = self.path(namespace, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = HEADER.pack(MAGIC, time.time()) + zlib.compress(value.encode(), self.compress_level)
+        descriptor, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'wb') as file:
+                file.write(data)
+            try:
+                replaced = path.stat().st_size
+            except FileNotFoundError:
+                replaced = 0
+            os.replace(temp_path, path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        if self._size is None:
+            self._size = self.usage()
+        else:
+            self._size += len(data) - replaced
+        if self._size > self.max_bytes:
+            self.evict()
+
+    def usage(self) -> int:
+        """
+        Возвращает суммарный размер файлов кэша, байт.
+        """
+        return sum(entry.stat().st_size for entry in self._entries())
+
+    def evict(self) -> None:
+        """
+        Удаляет самые давно использованные файлы, пока размер кэша не станет не больше
+        90% от `max_bytes`.
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / '.lock', 'wb') as lock:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # эвикцию уже выполняет другой процесс
+            entries = list()
+            for entry in self._entries():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry))
+            size, limit = sum(item[1] for item in entries), self.max_bytes * 0.9
+            for _, entry_size, entry in sorted(entries, key=lambda item: item[0]):
+                if size <= limit:
+                    break
+                try:
+                    os.remove(entry)
+                except FileNotFoundError:
+                    pass
+                size -= entry_size
+            self._size = size
+
+    def _entries(self):
+        if self.directory.exists():
+            for entry in self.directory.glob('*/*/*'):
+                if entry.is_file() and entry.suffix != '.tmp':
+                    yield entry
+
+    def cached(
+            self,
+            namespace: str,
+            ttl: float,
+            enabled: bool = True
+    ) -> Callable:
+        """
+        Декоратор асинхронной функции запроса `function(session, *args, **kwargs) -> str`.
+
+        Parameters
+        ----------
+        namespace : str
+            Пространство имен (эндпоинт) для ключей.
+        ttl : float
+            Срок актуальности записей, сек.
+        enabled : bool
+            Если False — декоратор ничего не кэширует.
+
+        Returns
+        -------
+        Callable
+            Обернутая функция: при попадании в кэш запрос не выполняется; успешный
+            (не пустой) результат сохраняется на диск.
+
+        Notes
+        -----
+        Первый аргумент (HTTP-сессия) в ключ не входит.
+        """
+        def decorator(function: Callable) -> Callable:
+            if not enabled:
+                return function
+
+            @wraps(function)
+            async def wrapper(session, *args, **kwargs) -> str:
+                key = json.dumps([args, kwargs], default=str, sort_keys=True, ensure_ascii=False)
+                if (value := await asyncio.to_thread(self.get, namespace, key, ttl)) is not None:
+                    return value
+                value = await function(session, *args, **kwargs)
+                if value:
+                    try:
+                        await asyncio.to_thread(self.set, namespace, key, value)
+                    except OSError as exception:
+                        logging.warning(f"Не удалось записать дисковый кэш {namespace}: {exception!r}")
+                return value
+
+            return wrapper
+
+        return decorator
+
+    def stats(self) -> dict[str, Optional[int]]:
+        return dict(hits=self.hits, misses=self.misses, size=self._size, max_size=self.max_bytes)
@@ -0,0 +1,41 @@
+import json
+
+from typing import Any
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+if orjson is not None:
+    BACKEND = 'orjson'
+    _loads = orjson.loads
+elif msgspec is not None:
+    BACKEND = 'msgspec'
+    _loads = msgspec.json.Decoder().decode
+else:
+    BACKEND = 'json'
+    _loads = json.loads
+
+
+def loads(data: str | bytes) -> Any:
+    """
+    Декодирует JSON самой быстрой доступной библиотекой (orjson → msgspec → json).
+
+    Parameters
+    ----------
+    data : str | bytes
+        JSON-документ.
+
+    Returns
+    -------
+    Any
+        Декодированный объект.
+    """
+    return _loads(data)
@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import aiohttp
+
+from typing import Callable, Optional
+
+from src.config import settings
+
+
+class HttpClient:
+    """
+    Общий для процесса пул HTTP-соединений (`aiohttp.ClientSession` + `TCPConnector`).
+
+    Notes
+    -----
+    - Сессия создается один раз (при старте приложения или лениво при первом запросе)
+      и переиспользуется всеми запросами: TLS-рукопожатия и DNS-ответы не повторяются.
+    - Лимиты соединений, keep-alive и TTL DNS-кэша задаются в `Settings` (`HTTP_*`).
+    - `cookie_jar` — фабрика хранилища cookie сессии (например, `aiohttp.DummyCookieJar`,
+      если cookie задаются каждому запросу отдельно); по умолчанию — обычный `CookieJar`.
+    """
+    def __init__(
+            self,
+            warmup_url: Optional[str] = None,
+            cookie_jar: Optional[Callable[[], aiohttp.abc.AbstractCookieJar]] = None
+    ) -> None:
+        self.warmup_url = warmup_url
+        self.cookie_jar = cookie_jar
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    @property
+    def closed(self) -> bool:
+        return self._session is None or self._session.closed
+
+    async def start(
+            self,
+            headers: Optional[dict[str, str]] = None
+    ) -> aiohttp.ClientSession:
+        """
+        Создает сессию с настроенным пулом соединений (если она еще не создана).
+
+        Parameters
+        ----------
+        headers : Optional[dict[str, str]]
+            Заголовки по умолчанию для всех запросов сессии.
+
+        Returns
+        -------
+        aiohttp.ClientSession
+            Активная общая сессия.
+        """
+        async with self._lock:
+            if self.closed:
+                connector = aiohttp.TCPConnector(
+                    ssl=False,
+                    limit=settings.HTTP_POOL_LIMIT,
+                    limit_per_host=settings.HTTP_POOL_LIMIT_PER_HOST,
+                    keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT,
+                    ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+                    use_dns_cache=True,
+                )
+                self._session = aiohttp.ClientSession(
+                    headers=headers,
+                    connector=connector,
+                    cookie_jar=self.cookie_jar() if self.cookie_jar else None
+                )
+            return self._session
+
+    async def get_session(
+            self,
+            headers: Optional[dict[str, str]] = None
+    ) -> aiohttp.ClientSession:
+        """
+        Возвращает общую сессию, при необходимости создавая ее.
+
+        Parameters
+        ----------
+        headers : Optional[dict[str, str]]
+            Заголовки по умолчанию; используются только при создании сессии.
+
+        Returns
+        -------
+        aiohttp.ClientSession
+            Активная общая сессия.
+        """
+        if self.closed:
+            return await self.start(headers)
+        return self._session
+
+    async def warm_up(
+            self,
+            connections: Optional[int] = None
+    ) -> None:
+        """
+        Заранее открывает соединения с `warmup_url`, чтобы первый запрос не тратил время
+        на DNS и TLS-рукопожатие.
+
+        Parameters
+        ----------
+        connections : Optional[int]
+            Количество параллельно прогреваемых соединений (по умолчанию `HTTP_WARMUP_CONNECTIONS`).
+        """
+        if not self.warmup_url:
+            return
+        session = await self.get_session()
+        connections = connections or settings.HTTP_WARMUP_CONNECTIONS
+
+        async def touch() -> None:
+            async with session.head(
+                    url=self.warmup_url,
+                    allow_redirects=False,
+                    timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                await response.release()
+
+        results = await asyncio.gather(*(touch() for _ in range(connections)), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                logging.warning(f"Прогрев соединений с {self.warmup_url} не удался: {result!r}")
+
+    async def close(self) -> None:
+        """
+        Закрывает сессию и все соединения пула.
+        """
+        async with self._lock:
+            if not self.closed:
+                await self._session.close()
+            self._session = None
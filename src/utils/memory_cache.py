@@ -0,0 +1,212 @@
+import json
+import logging
+import os
+import tempfile
+import time
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Hashable, Optional
+
+
+class MemoryCache:
+    """
+    Кэш результатов в памяти процесса с TTL и вытеснением давно неиспользуемых записей (LRU).
+
+    Notes
+    -----
+    - TTL задается при записи, поэтому у положительных и отрицательных результатов он свой.
+    - Размер ограничен и количеством записей `max_entries`, и приблизительным объемом
+      `max_bytes` (длина JSON-представления значения).
+    - Значения — JSON-совместимые объекты; они общие для всех читателей, изменять их на месте нельзя.
+    - Срок хранения — по часам `time.time()`, поэтому снимок на диске (`save`/`load`)
+      сохраняет оставшийся TTL между перезапусками.
+    """
+    def __init__(
+            self,
+            max_entries: int,
+            max_bytes: int
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries: OrderedDict[Hashable, tuple[Any, float, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+            self,
+            key: Hashable
+    ) -> Optional[Any]:
+        """
+        Возвращает значение, если оно есть и его TTL не истек.
+
+        Parameters
+        ----------
+        key : Hashable
+            Ключ записи.
+
+        Returns
+        -------
+        Optional[Any]
+            Сохраненное значение или None.
+        """
+        if (entry := self._entries.get(key)) is None:
+            self.misses += 1
+            return None
+        value, expires_at, _ = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            self.expired += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(
+            self,
+            key: Hashable,
+            value: Any,
+            ttl: float
+    ) -> None:
+        """
+        Записывает значение на `ttl` секунд и при необходимости вытесняет давние записи.
+
+        Parameters
+        ----------
+        key : Hashable
+            Ключ записи.
+        value : Any
+            JSON-совместимое значение.
+        ttl : float
+            Срок хранения, сек.
+        """
+        self._store(key, value, time.time() + ttl)
+
+    def delete(
+            self,
+            key: Hashable
+    ) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    def save(
+            self,
+            path: Path
+    ) -> int:
+        """
+        Атомарно сохраняет неистекшие записи в JSON-файл.
+
+        Parameters
+        ----------
+        path : Path
+            Путь снимка.
+
+        Returns
+        -------
+        int
+            Количество сохраненных записей.
+        """
+        now = time.time()
+        entries = [
+            [key, value, expires_at]
+            for key, (value, expires_at, _) in self._entries.items()
+            if expires_at > now
+        ]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        descriptor, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump(entries, file, ensure_ascii=False)
+            os.replace(temp_path, path)
+        except (OSError, TypeError, ValueError):
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return len(entries)
+
+    def load(
+            self,
+            path: Path
+    ) -> int:
+        """
+        Загружает неистекшие записи из снимка (порядок LRU сохраняется).
+
+        Parameters
+        ----------
+        path : Path
+            Путь снимка.
+
+        Returns
+        -------
+        int
+            Количество загруженных записей (0, если снимка нет или он поврежден).
+        """
+        try:
+            with open(path, encoding='utf-8') as file:
+                entries = json.load(file)
+        except FileNotFoundError:
+            return 0
+        except (OSError, ValueError) as exception:
+            logging.warning(f"Не удалось прочитать снимок кэша {path}: {exception!r}")
+            return 0
+        now, loaded = time.time(), 0
+        for key, value, expires_at in entries:
+            if expires_at > now:
+                self._store(to_key(key), value, expires_at)
+                loaded += 1
+        return loaded
+
+    def stats(self) -> dict[str, int]:
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            expired=self.expired,
+            evictions=self.evictions,
+            entries=len(self._entries),
+            max_entries=self.max_entries,
+            size=self.size,
+            max_size=self.max_bytes,
+        )
+
+    def _store(
+            self,
+            key: Hashable,
+            value: Any,
+            expires_at: float
+    ) -> None:
+        size = len(json.dumps(value, ensure_ascii=False, default=str).encode())
+        if key in self._entries:
+            self._remove(key)
+        if size > self.max_bytes:
+            return
+        self._entries[key] = (value, expires_at, size)
+        self.size += size
+        while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def _remove(
+            self,
+            key: Hashable
+    ) -> None:
+        _, _, size = self._entries.pop(key)
+        self.size -= size
+
+
+def to_key(value: Any) -> Hashable:
+    """
+    Восстанавливает ключ-кортеж из JSON-списка снимка.
+    """
+    return tuple(to_key(item) for item in value) if isinstance(value, list) else value
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+
+from concurrent.futures import BrokenExecutor, Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+
+EXECUTOR_MODES = ('inline', 'thread', 'process')
+
+
+class ParseExecutor:
+    """
+    Выполнение CPU-емкого разбора ответов вне event loop.
+
+    Notes
+    -----
+    - `inline` — разбор в event loop (поведение по умолчанию);
+      `thread` — в пуле потоков (имеет смысл для извлекателей, отпускающих GIL);
+      `process` — в пуле процессов: в воркер передается сырой ответ, обратно — компактная модель.
+    - Ответы меньше `min_size` символов разбираются в event loop: передача между процессами
+      для них дороже самого разбора.
+    - Пул создается при первом вызове или в `start` (с прогревом воркеров); процессы
+      запускаются методом `spawn`, чтобы не копировать состояние event loop и сокетов.
+    - Если пул процессов сломан (воркер упал), задача выполняется в event loop, а пул пересоздается.
+    """
+    def __init__(
+            self,
+            mode: str = 'inline',
+            workers: Optional[int] = None,
+            min_size: int = 0
+    ) -> None:
+        if mode not in EXECUTOR_MODES:
+            raise ValueError(f"Неизвестный режим разбора {mode!r}, допустимые: {', '.join(EXECUTOR_MODES)}")
+        self.mode = mode
+        self.workers = workers or min(os.cpu_count() or 1, 4)
+        self.min_size = min_size
+        self.inline = 0
+        self.offloaded = 0
+        self.in_flight = 0
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == 'process':
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='parse')
+        return self._executor
+
+    async def start(self) -> None:
+        """
+        Создает пул и запускает все воркеры, чтобы первый запрос не ждал их старта.
+        """
+        if self.mode == 'inline':
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+
+    async def run(
+            self,
+            function: Callable,
+            *args: Any,
+            size: Optional[int] = None
+    ) -> Any:
+        """
+        Выполняет `function(*args)` согласно режиму.
+
+        Parameters
+        ----------
+        function : Callable
+            Функция разбора уровня модуля (для `process` — сериализуемая pickle).
+        *args : Any
+            Аргументы функции.
+        size : Optional[int]
+            Размер разбираемого ответа; если меньше `min_size`, разбор выполняется в event loop.
+
+        Returns
+        -------
+        Any
+            Результат `function`.
+        """
+        if self.mode == 'inline' or (size is not None and size < self.min_size):
+            self.inline += 1
+            return function(*args)
+
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        try:
+            result = await loop.run_in_executor(self._get_executor(), function, *args)
+        except BrokenExecutor as exception:
+            logging.warning(f"Пул разбора недоступен, разбор в event loop: {exception!r}")
+            self._reset()
+            self.inline += 1
+            return function(*args)
+        finally:
+            self.in_flight -= 1
+        self.offloaded += 1
+        return result
+
+    def _reset(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def close(self) -> None:
+        """
+        Останавливает пул, дожидаясь завершения текущих задач.
+        """
+        if self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.to_thread(executor.shutdown, wait=True)
+
+    def stats(self) -> dict[str, Any]:
+        return dict(
+            mode=self.mode,
+            workers=None if self.mode == 'inline' else self.workers,
+            inline=self.inline,
+            offloaded=self.offloaded,
+            in_flight=self.in_flight,
+        )
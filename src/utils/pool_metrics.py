@@ -0,0 +1,131 @@
+import statistics
+import time
+
+from collections import deque
+from typing import Any, Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
+
+
+class PoolMetrics:
+    """
+    Счетчики пула соединений SQLAlchemy: время получения соединения, занятые соединения,
+    таймауты ожидания и пересоздания соединений.
+
+    Notes
+    -----
+    - Время получения соединения замеряет класс пула `pool_class()` (вокруг `Pool.connect`):
+      в него входят ожидание свободного соединения, открытие нового и pre-ping.
+    - Остальные счетчики обновляются событиями пула (`connect`, `checkout`, `checkin`, `invalidate`),
+      подключенными к движку в `attach`.
+    - Для перцентилей хранятся последние `window` замеров.
+    """
+    def __init__(
+            self,
+            slow_checkout: float,
+            window: int = 1000
+    ) -> None:
+        self.slow_checkout = slow_checkout
+        self.waits: deque[float] = deque(maxlen=window)
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.in_use = 0
+        self.max_in_use = 0
+        self._engine: Optional[AsyncEngine] = None
+
+    def pool_class(
+            self,
+            base: type[Pool] = AsyncAdaptedQueuePool
+    ) -> type[Pool]:
+        """
+        Возвращает подкласс `base`, замеряющий время получения соединения и таймауты.
+
+        Parameters
+        ----------
+        base : type[Pool]
+            Класс пула движка.
+
+        Returns
+        -------
+        type[Pool]
+            Класс для параметра `poolclass` у `create_async_engine`.
+        """
+        metrics = self
+
+        class InstrumentedPool(base):
+            def connect(self):
+                started = time.perf_counter()
+                try:
+                    return super().connect()
+                except exc.TimeoutError:
+                    metrics.timeouts += 1
+                    raise
+                finally:
+                    metrics.record_wait(time.perf_counter() - started)
+
+        InstrumentedPool.__name__ = f'Instrumented{base.__name__}'
+        return InstrumentedPool
+
+    def attach(
+            self,
+            engine: AsyncEngine
+    ) -> None:
+        """
+        Подключает обработчики событий пула движка.
+
+        Parameters
+        ----------
+        engine : AsyncEngine
+            Асинхронный движок SQLAlchemy.
+        """
+        self._engine = engine
+        event.listen(engine.sync_engine, 'connect', self._on_connect)
+        event.listen(engine.sync_engine, 'checkout', self._on_checkout)
+        event.listen(engine.sync_engine, 'checkin', self._on_checkin)
+        event.listen(engine.sync_engine, 'invalidate', self._on_invalidate)
+
+    def record_wait(
+            self,
+            wait: float
+    ) -> None:
+        self.waits.append(wait)
+        if wait >= self.slow_checkout:
+            self.slow_checkouts += 1
+
+    def stats(self) -> dict[str, Any]:
+        waits = sorted(self.waits)
+        pool = self._engine.sync_engine.pool if self._engine is not None else None
+        return dict(
+            size=pool.size() if pool is not None else None,
+            idle=pool.checkedin() if pool is not None else None,
+            overflow=pool.overflow() if pool is not None else None,
+            in_use=self.in_use,
+            max_in_use=self.max_in_use,
+            checkouts=self.checkouts,
+            slow_checkouts=self.slow_checkouts,
+            timeouts=self.timeouts,
+            connects=self.connects,
+            invalidations=self.invalidations,
+            wait_p50_ms=round(statistics.median(waits) * 1000, 3) if waits else None,
+            wait_p99_ms=round(waits[min(int(len(waits) * 0.99), len(waits) - 1)] * 1000, 3) if waits else None,
+            wait_max_ms=round(waits[-1] * 1000, 3) if waits else None,
+        )
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        self.in_use = max(self.in_use - 1, 0)
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
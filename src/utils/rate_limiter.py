@@ -0,0 +1,131 @@
+import asyncio
+import time
+
+from typing import Any
+
+from src.config import settings
+
+
+class AdaptiveRateLimiter:
+    """
+    Общий token bucket с AIMD-регулировкой скорости (additive increase / multiplicative decrease).
+
+    Notes
+    -----
+    - Перед каждым запросом корутина забирает токен (`acquire`); ожидающие обслуживаются по очереди.
+    - Ответ 429 (`on_throttle`) кратно снижает скорость для всех и обнуляет накопленные токены.
+    - Каждый успешный ответ (`on_success`) понемногу возвращает скорость к `max_rate`.
+    """
+    def __init__(
+            self,
+            rate: float,
+            burst: float,
+            min_rate: float,
+            max_rate: float,
+            increase_step: float,
+            decrease_factor: float,
+            decrease_cooldown: float = 1.0
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.throttled_total = 0
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._decreased = 0.0
+        self._waiting = 0
+        self._lock = asyncio.Lock()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._waiting
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        """
+        Дожидается свободного токена с учетом текущей скорости.
+        """
+        self._waiting += 1
+        try:
+            async with self._lock:
+                self._refill()
+                while self._tokens < 1:
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+                    self._refill()
+                self._tokens -= 1
+        finally:
+            self._waiting -= 1
+
+    def on_success(self) -> None:
+        """
+        Аддитивно повышает скорость после успешного ответа.
+        """
+        self._refill()
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttle(self) -> None:
+        """
+        Кратно снижает скорость после ответа 429 (не чаще раза в `decrease_cooldown` секунд,
+        чтобы пачка одновременных 429 не обрушила скорость до минимума).
+        """
+        self.throttled_total += 1
+        now = time.monotonic()
+        if now - self._decreased >= self.decrease_cooldown:
+            self._decreased = now
+            self._refill()
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = 0
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Возвращает текущее состояние лимитера для мониторинга.
+
+        Returns
+        -------
+        dict[str, Any]
+            `rate` (запросов/сек), `tokens`, `queue_depth`, `throttled_total`.
+        """
+        self._refill()
+        return dict(
+            rate=round(self.rate, 3),
+            tokens=round(self._tokens, 3),
+            queue_depth=self.queue_depth,
+            throttled_total=self.throttled_total,
+        )
+
+
+limiters: dict[str, AdaptiveRateLimiter] = dict()
+
+
+def get_limiter(host: str) -> AdaptiveRateLimiter:
+    """
+    Возвращает общий для процесса лимитер хоста, создавая его с параметрами из `Settings`.
+
+    Parameters
+    ----------
+    host : str
+        Имя хоста (например, `www.ozon.ru`).
+
+    Returns
+    -------
+    AdaptiveRateLimiter
+        Лимитер, разделяемый всеми запросами к этому хосту.
+    """
+    if host not in limiters:
+        limiters[host] = AdaptiveRateLimiter(
+            rate=settings.RATE_LIMIT_RPS,
+            burst=settings.RATE_LIMIT_BURST,
+            min_rate=settings.RATE_LIMIT_MIN_RPS,
+            max_rate=settings.RATE_LIMIT_MAX_RPS,
+            increase_step=settings.RATE_LIMIT_INCREASE,
+            decrease_factor=settings.RATE_LIMIT_DECREASE,
+        )
+    return limiters[host]
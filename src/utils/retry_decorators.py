@@ -1,7 +1,22 @@
 import asyncio
+import random
+import time
+import aiohttp
 
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
-from typing import Callable, Optional, Any
+from typing import Callable, Iterator, Optional, Any, Mapping
+
+from src.utils.rate_limiter import AdaptiveRateLimiter
+from src.utils.circuit_breaker import CircuitBreaker, CircuitOpenError
+
+
+# Ошибки самого HTTP-запроса, которые предохранитель считает отказами эндпоинта
+UPSTREAM_ERRORS = (aiohttp.ClientError, asyncio.TimeoutError)
 
 
 class AuthenticationError(Exception):
@@ -32,39 +47,173 @@ class AnotherError(Exception):
     pass
 
 
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Политика повторов: экспоненциальная задержка с full jitter, учет `Retry-After`
+    и общий бюджет времени на вызов.
+
+    Attributes
+    ----------
+    attempts : int
+        Максимальное количество попыток.
+    base_delay : float
+        Базовая задержка, сек: перед попыткой N+1 ждем случайное время из
+        `[0, min(max_delay, base_delay * 2 ** N)]`.
+    max_delay : float
+        Верхняя граница одной задержки, сек. Если сервер просит ждать дольше
+        (`Retry-After`), повторы прекращаются.
+    budget : Optional[float]
+        Общий бюджет времени на вызов (все попытки и паузы), сек. None — без ограничения.
+    """
+    attempts: int = 3
+    base_delay: float = 1.0
+    max_delay: float = 10.0
+    budget: Optional[float] = None
+
+    def deadline(self) -> Optional[float]:
+        """
+        Момент (`time.monotonic()`), после которого новые попытки не начинаются.
+        """
+        return time.monotonic() + self.budget if self.budget is not None else None
+
+    @staticmethod
+    def remaining(deadline: Optional[float]) -> Optional[float]:
+        """
+        Оставшееся до `deadline` время, сек (None — без ограничения).
+        """
+        return max(deadline - time.monotonic(), 0) if deadline is not None else None
+
+    def next_delay(
+            self,
+            attempt: int,
+            deadline: Optional[float],
+            retry_after: Optional[float] = None
+    ) -> Optional[float]:
+        """
+        Рассчитывает паузу перед следующей попыткой.
+
+        Parameters
+        ----------
+        attempt : int
+            Номер завершившейся попытки (с нуля).
+        deadline : Optional[float]
+            Крайний срок вызова из `deadline()`.
+        retry_after : Optional[float]
+            Задержка из заголовка `Retry-After`, сек.
+
+        Returns
+        -------
+        Optional[float]
+            Пауза в секундах или None, если следующей попытки не будет
+            (попытки исчерпаны, сервер просит ждать дольше `max_delay`
+            или пауза не укладывается в бюджет).
+        """
+        if attempt + 1 >= self.attempts:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            if retry_after > self.max_delay:
+                return None
+            delay = max(delay, retry_after)
+        if deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        return delay
+
+
+# Общий крайний срок (`time.monotonic()`) нескольких вызовов `retry_request` (см. `deadline_scope`)
+shared_deadline: ContextVar[Optional[float]] = ContextVar('shared_deadline', default=None)
+
+
+@contextmanager
+def deadline_scope(
+        budget: Optional[float]
+) -> Iterator[Optional[float]]:
+    """
+    Ограничивает общим бюджетом времени все вызовы `retry_request` внутри блока
+    (например, запрос через JSON API и запасной запрос HTML-страницы).
+
+    Parameters
+    ----------
+    budget : Optional[float]
+        Бюджет времени блока, сек. None — только внешний крайний срок, если он задан.
+
+    Yields
+    ------
+    Optional[float]
+        Крайний срок блока (`time.monotonic()`) или None, если он не ограничен.
+    """
+    deadline = time.monotonic() + budget if budget is not None else None
+    if (outer := shared_deadline.get()) is not None:
+        deadline = outer if deadline is None else min(deadline, outer)
+    token = shared_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        shared_deadline.reset(token)
+
+
+def parse_retry_after(
+        headers: Optional[Mapping[str, str]]
+) -> Optional[float]:
+    """
+    Извлекает задержку из заголовка `Retry-After` (секунды или HTTP-дата).
+
+    Parameters
+    ----------
+    headers : Optional[Mapping[str, str]]
+        Заголовки ответа.
+
+    Returns
+    -------
+    Optional[float]
+        Задержка в секундах или None, если заголовок отсутствует или некорректен.
+    """
+    if not headers or not (value := headers.get('Retry-After')):
+        return None
+    if value.strip().isdigit():
+        return float(value)
+    try:
+        retry_time = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_time.tzinfo is None:
+        retry_time = retry_time.replace(tzinfo=timezone.utc)
+    return max((retry_time - datetime.now(timezone.utc)).total_seconds(), 0)
+
+
 def retry_process(
-        attempts: int = 2,
-        delay: int = 15
+        policy: RetryPolicy = RetryPolicy(attempts=2, base_delay=5, max_delay=15)
 ) -> Callable:
     """
     Повторяет вызов асинхронной функции при возникновении исключений.
 
     Parameters
     ----------
-    attempts : int
-        Количество попыток (по умолчанию 2).
-    delay : int
-        Задержка между попытками в секундах.
+    policy : RetryPolicy
+        Политика повторов (количество попыток, задержки, бюджет времени).
 
     Returns
     -------
     Callable
         Обернутая функция, повторяющая выполнение при ошибках.
+
+    Notes
+    -----
+    После последней неудачной попытки исключение возбуждается сразу, без паузы.
     """
     def decorator(function: Callable) -> Callable:
         @wraps(function)
         async def wrapper(*args, **kwargs) -> Optional[Any]:
-            attempt, exception = attempts, None
-            while attempt > 0:
+            deadline, attempt = policy.deadline(), 0
+            while True:
                 try:
-                    result = await function(*args, **kwargs)
-                    return result
-                except Exception as exception_logger:
-                    exception = exception_logger
-                    attempt -= 1
+                    return await asyncio.wait_for(function(*args, **kwargs), policy.remaining(deadline))
+                except Exception as exception:
+                    if (delay := policy.next_delay(attempt, deadline)) is None:
+                        raise exception
+                    attempt += 1
                     await asyncio.sleep(delay)
-            else:
-                raise exception
 
         return wrapper
 
@@ -75,8 +224,9 @@ def retry_request(
         default_value: Any,
         raise_error: bool = False,
         return_bytes: bool = False,
-        attempts: int = 5,
-        delay: int | float = 15
+        policy: RetryPolicy = RetryPolicy(attempts=5, base_delay=1, max_delay=15),
+        limiter: Optional[AdaptiveRateLimiter] = None,
+        breaker: Optional[CircuitBreaker] = None
 ) -> Callable:
     """
     Ретраи HTTP-запросов с обработкой статусов и возвратом значения по умолчанию.
@@ -89,10 +239,14 @@ def retry_request(
         Если True — возбуждать исключение при неуспехе.
     return_bytes : bool
         Зарезервировано для режимов, где требуется вернуть bytes.
-    attempts : int
-        Кол-во попыток (по умолчанию 5).
-    delay : int | float
-        Задержка между попытками, сек.
+    policy : RetryPolicy
+        Политика повторов: количество попыток, экспоненциальная задержка с jitter,
+        общий бюджет времени на вызов.
+    limiter : Optional[AdaptiveRateLimiter]
+        Общий лимитер хоста: каждая попытка ждет токен, 429 снижает скорость, успех — повышает.
+    breaker : Optional[CircuitBreaker]
+        Предохранитель эндпоинта: ошибки соединения и таймауты запроса, 401/403 и 5xx
+        считаются отказами (ожидание токена лимитера — нет); пока он открыт, попытки не выполняются.
 
     Returns
     -------
@@ -101,45 +255,79 @@ def retry_request(
 
     Notes
     -----
+    - Функция возвращает `(url, status, text)` или `(url, status, text, headers)`;
+      из `headers` учитывается `Retry-After`.
     - 200/202/204 считаются успешными.
     - 401/403 -> AuthenticationError.
     - 429 при raise_error=True -> ManyRequestsError.
-    - Иначе — повторы до исчерпания.
+    - Открытый предохранитель -> CircuitOpenError (сразу, без запроса к серверу).
+    - Иначе — повторы до исчерпания попыток или бюджета; после последней попытки пауз нет.
+    - Внутри `deadline_scope` бюджет вызова не выходит за общий крайний срок блока.
     """
     def decorator(function: Callable) -> Callable:
         @wraps(function)
         async def wrapper(*args, **kwargs) -> Any:
-            attempt, exception = attempts, None
+            deadline, attempt, exception = policy.deadline(), 0, None
+            if (scope_deadline := shared_deadline.get()) is not None:
+                deadline = scope_deadline if deadline is None else min(deadline, scope_deadline)
             url, status, text = None, None, None
-            while attempt > 0:
-                attempt -= 1
+            while True:
+                retry_after, requested = None, False
+                if breaker and not breaker.allow():
+                    raise CircuitOpenError(f'Эндпоинт {breaker.name} временно недоступен')
                 try:
-                    if response := await function(*args, **kwargs):
+                    if limiter:
+                        await asyncio.wait_for(limiter.acquire(), policy.remaining(deadline))
+                    requested = True
+                    if response := await asyncio.wait_for(function(*args, **kwargs), policy.remaining(deadline)):
                         response: tuple[str, int, str | bytes] = response
-                        url, status, text = response
+                        url, status, text, *headers = response
                     else:
                         raise AnotherError('Ошибка другого формата')
                 except Exception as exception_logger:
                     exception = exception_logger
-                    await asyncio.sleep(delay)
+                    # Отказ эндпоинта — только ошибка соединения или таймаут самого запроса;
+                    # ожидание токена лимитера и прочие локальные ошибки нейтральны
+                    if breaker and requested and isinstance(exception, UPSTREAM_ERRORS):
+                        breaker.record_failure()
+                    elif breaker:
+                        breaker.record_neutral()
                 else:
+                    exception = None
                     if status in (200, 202, 204):
+                        if limiter:
+                            limiter.on_success()
+                        if breaker:
+                            breaker.record_success()
                         return url, status, text
                     elif status in (401, 403):
+                        if breaker:
+                            breaker.record_failure()
                         raise AuthenticationError('Авторизация устарела / Нет доступа')
                     else:
-                        await asyncio.sleep(delay)
+                        if breaker and status >= 500:
+                            breaker.record_failure()
+                        elif breaker:
+                            breaker.record_neutral()
+                        if limiter and status == 429:
+                            limiter.on_throttle()
+                        retry_after = parse_retry_after(headers[0] if headers else None)
+
+                if (delay := policy.next_delay(attempt, deadline, retry_after)) is None:
+                    break
+                attempt += 1
+                await asyncio.sleep(delay)
+
+            if raise_error and exception:
+                raise exception
+            elif raise_error and status == 429:
+                raise ManyRequestsError('Не получен ответ от сервера')
+            elif raise_error:
+                raise AnotherError(text)
+            elif all([url, status]):
+                return url, status, default_value
             else:
-                if raise_error and exception:
-                    raise exception
-                elif raise_error and status == 429:
-                    raise ManyRequestsError('Не получен ответ от сервера')
-                elif raise_error:
-                    raise AnotherError(text)
-                elif all([url, status]):
-                    return url, status, default_value
-                else:
-                    return 'Ошибка другого формата', '0', exception
+                return 'Ошибка другого формата', '0', exception
 
         return wrapper
 
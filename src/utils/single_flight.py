@@ -0,0 +1,81 @@
+import asyncio
+
+from typing import Any, Awaitable, Callable, Hashable
+
+
+class SingleFlight:
+    """
+    Объединяет одновременные одинаковые вызовы: все вызывающие с одним ключом
+    ожидают одну общую задачу.
+
+    Notes
+    -----
+    - Задача создается первым вызывающим и удаляется из реестра по завершении,
+      поэтому следующий вызов после завершения выполняется заново.
+    - Отмена одного вызывающего не отменяет общую задачу и не влияет на остальных.
+    - Результат общий для всех вызывающих: изменять его на месте нельзя.
+    """
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = dict()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    async def do(
+            self,
+            key: Hashable,
+            factory: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Выполняет `factory()` или присоединяется к уже выполняющемуся вызову с тем же ключом.
+
+        Parameters
+        ----------
+        key : Hashable
+            Ключ объединения (например, `(product_name, sorting_type)` или SKU).
+        factory : Callable[[], Awaitable[Any]]
+            Функция, создающая корутину вычисления.
+
+        Returns
+        -------
+        Any
+            Результат общего вычисления (исключение пробрасывается всем вызывающим).
+        """
+        return await asyncio.shield(self.start(key, factory))
+
+    def start(
+            self,
+            key: Hashable,
+            factory: Callable[[], Awaitable[Any]]
+    ) -> asyncio.Task:
+        """
+        Запускает `factory()` в фоне, если вызов с тем же ключом еще не выполняется.
+
+        Parameters
+        ----------
+        key : Hashable
+            Ключ объединения.
+        factory : Callable[[], Awaitable[Any]]
+            Функция, создающая корутину вычисления.
+
+        Returns
+        -------
+        asyncio.Task
+            Новая или уже выполняющаяся общая задача.
+        """
+        if (task := self._calls.get(key)) is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return task
+
+    def _forget(
+            self,
+            key: Hashable,
+            task: asyncio.Task
+    ) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()